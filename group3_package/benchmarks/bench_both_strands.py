@@ -0,0 +1,47 @@
+"""
+Benchmark: strand-aware greedy SCS (canonical k-mer seeds, mirrored overlaps stored once)
+vs doubling the input (every read and its reverse complement as separate reads).
+
+Reads are reverse complemented at random to simulate both strands.
+
+python benchmarks/bench_both_strands.py --file tests/data/Homo_sapiens_CXCR5_sequence_len100_cov10.fa
+"""
+import argparse
+import random
+import time
+from src.parser import parse
+from src.scs import greedy_scs_heap
+from src.scs_utils import calc_pairwise_overlaps_seed, get_strings_with_id_dict
+from src.strand_utils import calc_pairwise_overlaps_both_strands, reverse_complement
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', required=True, help='FASTA/FASTQ file with reads')
+    parser.add_argument('--min-overlap', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    reads = [r if rng.random() < 0.5 else reverse_complement(r) for r in dict.fromkeys(parse(args.file))]
+    doubled = reads + [reverse_complement(r) for r in reads]
+    print(f'{len(reads)} reads')
+
+    start = time.perf_counter()
+    n_overlaps = len(calc_pairwise_overlaps_seed(get_strings_with_id_dict(doubled), args.min_overlap))
+    print(f'overlaps, doubled input: {time.perf_counter() - start:.2f} s, {n_overlaps} overlaps')
+    start = time.perf_counter()
+    n_overlaps = len(calc_pairwise_overlaps_both_strands(get_strings_with_id_dict(reads), args.min_overlap))
+    print(f'overlaps, both strands: {time.perf_counter() - start:.2f} s, {n_overlaps} overlaps')
+
+    greedy_scs_heap(['ACGTAC', 'TACGGA'], min_overlap=2, both_strands=True)  # compile
+    start = time.perf_counter()
+    result = greedy_scs_heap(doubled, overlaps='seed', min_overlap=args.min_overlap, queue='bucket')
+    print(f'assembly, doubled input: {time.perf_counter() - start:.2f} s, superstring length {len(result)}')
+    start = time.perf_counter()
+    result = greedy_scs_heap(reads, min_overlap=args.min_overlap, queue='bucket', both_strands=True)
+    print(f'assembly, both strands: {time.perf_counter() - start:.2f} s, superstring length {len(result)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: greedy SCS with the Python merge loop (greedy_scs_heap) vs the numba merge loop (greedy_scs_numba).
+
+Numba functions are compiled on a small input before timing.
+
+python benchmarks/bench_greedy_engines.py --file tests/data/Homo_sapiens_CXCR5_sequence_len100_cov10.fa
+"""
+import argparse
+import time
+from src.parser import parse
+from src.scs import greedy_scs_heap, greedy_scs_numba
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', required=True, help='FASTA/FASTQ file with reads')
+    parser.add_argument('--overlaps', default='suffix_array', help='initial overlaps: naive, suffix_array, seed')
+    parser.add_argument('--min-overlap', type=int, default=20)
+    args = parser.parse_args()
+
+    reads = parse(args.file)
+    print(f'{len(reads)} reads')
+
+    # compile
+    warmup = ['ABCDEF', 'DEFGHI', 'GHIJKL']
+    greedy_scs_heap(warmup, overlaps=args.overlaps)
+    greedy_scs_heap(warmup, overlaps=args.overlaps, queue='bucket')
+    greedy_scs_numba(warmup, overlaps=args.overlaps)
+
+    engines = {
+        'heap': lambda: greedy_scs_heap(reads, overlaps=args.overlaps, min_overlap=args.min_overlap),
+        'heap + bucket queue': lambda: greedy_scs_heap(reads, overlaps=args.overlaps, min_overlap=args.min_overlap,
+                                                       queue='bucket'),
+        'numba': lambda: greedy_scs_numba(reads, overlaps=args.overlaps, min_overlap=args.min_overlap),
+        'numba, naive overlaps in numba': lambda: greedy_scs_numba(reads, min_overlap=args.min_overlap),
+    }
+    for name, engine in engines.items():
+        start = time.perf_counter()
+        result = engine()
+        elapsed = time.perf_counter() - start
+        assert all(read in result for read in reads)
+        print(f'{name}: {elapsed:.2f} s, superstring length {len(result)}')
+
+
+if __name__ == '__main__':
+    main()
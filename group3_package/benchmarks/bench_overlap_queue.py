@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: MaxHeap vs BucketQueue on synthetic overlap triples.
+
+Simulates the greedy SCS access pattern: build the queue, then repeatedly pop the maximum,
+delete some items and push new ones.
+
+python benchmarks/bench_overlap_queue.py --n-items 1000000 --max-overlap 100
+"""
+import argparse
+import time
+import numpy as np
+from src.heap_utils import create_max_heap, create_bucket_queue
+
+
+def synthetic_items(n_items, max_overlap, seed=0):
+    """Items with distinct (str_id_1, str_id_2) pairs: str_id_1 is the item index."""
+    rng = np.random.default_rng(seed)
+    second_ids = rng.permutation(n_items)
+    overlaps = rng.integers(0, max_overlap + 1, size=n_items)
+    return list(zip(range(n_items), second_ids.tolist(), overlaps.tolist()))
+
+
+def run(create_queue, items, n_ops, max_overlap):
+    rng = np.random.default_rng(1)
+    # new pairs, distinct from each other and from the initial items
+    new_items = list(zip(range(len(items), len(items) + n_ops),
+                         rng.integers(0, len(items), n_ops).tolist(),
+                         rng.integers(0, max_overlap + 1, n_ops).tolist()))
+    # deletion candidates in random order, only those still in the queue are deleted
+    candidates = [(items[i][0], items[i][1]) for i in rng.permutation(len(items)).tolist()]
+
+    start = time.perf_counter()
+    queue = create_queue(items)
+    build_time = time.perf_counter() - start
+
+    # pairs in the queue (same bookkeeping cost for both queues)
+    live = set(candidates)
+    next_candidate = 0
+    start = time.perf_counter()
+    for i in range(n_ops):
+        if queue.is_empty():
+            break
+        popped = queue.pop_max()
+        live.discard((popped[0], popped[1]))
+        while next_candidate < len(candidates) and candidates[next_candidate] not in live:
+            next_candidate += 1
+        if next_candidate < len(candidates):
+            queue.delete(candidates[next_candidate])
+            live.discard(candidates[next_candidate])
+        queue.push(new_items[i])
+        live.add((new_items[i][0], new_items[i][1]))
+    ops_time = time.perf_counter() - start
+    return build_time, ops_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n-items', type=int, default=1000000)
+    parser.add_argument('--max-overlap', type=int, default=100)
+    parser.add_argument('--n-ops', type=int, default=100000)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.n_items, args.max_overlap)
+    # compile
+    run(create_max_heap, items[:100], 10, args.max_overlap)
+    run(create_bucket_queue, items[:100], 10, args.max_overlap)
+
+    for name, create_queue in [('MaxHeap', create_max_heap), ('BucketQueue', create_bucket_queue)]:
+        build_time, ops_time = run(create_queue, items, args.n_ops, args.max_overlap)
+        print(f'{name:12s} build: {build_time:7.3f}s  {args.n_ops} x (pop_max + delete + push): {ops_time:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
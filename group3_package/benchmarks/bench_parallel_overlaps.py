@@ -0,0 +1,41 @@
+"""
+Scaling benchmark: parallel initial overlap calculation (shared memory) with 1/2/4/8 workers.
+
+The sequential 'naive' calculation is the baseline.
+
+python benchmarks/bench_parallel_overlaps.py --file tests/data/Homo_sapiens_CXCR5_sequence_len100_cov10.fa
+"""
+import argparse
+import time
+from src.parser import parse
+from src.scs_utils import calc_pairwise_overlaps, calc_pairwise_overlaps_parallel_heap, get_strings_with_id_dict
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', required=True, help='FASTA/FASTQ file with reads')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--min-overlap', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+
+    strings_dict = get_strings_with_id_dict(list(set(parse(args.file))))
+    print(f'{len(strings_dict)} reads')
+
+    start = time.perf_counter()
+    expected = {el for el in calc_pairwise_overlaps(strings_dict, 'naive', min_overlap=args.min_overlap)
+                if el[2] > 0}
+    baseline = time.perf_counter() - start
+    print(f'sequential: {baseline:.2f} s')
+
+    for num_cpu in args.workers:
+        start = time.perf_counter()
+        result = calc_pairwise_overlaps_parallel_heap(strings_dict, num_cpu, min_length=args.min_overlap,
+                                                      chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        assert set(result) == expected
+        print(f'{num_cpu} workers: {elapsed:.2f} s, speedup {baseline / elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    main()
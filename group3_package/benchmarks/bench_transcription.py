@@ -0,0 +1,55 @@
+"""
+Benchmark: transcription with str.translate tables vs the previous loop with string concatenation
+(quadratic in the worst case, only run up to --max-loop-length).
+
+Random DNA of 10 kb to --max-length bases, the streaming variant transcribes chunks of --chunk-size bases.
+
+python benchmarks/bench_transcription.py --max-length 50000000
+"""
+import argparse
+import random
+import time
+from src.translation import transcribe, transcribe_chunks, iter_chunks
+
+
+def transcribe_loop(dna):
+    # previous implementation
+    to_rna = {"A": "U", "T": "A", "C": "G", "G": "C"}
+    rna_comp = ""
+    for base in dna:
+        rna_comp = rna_comp + to_rna[base]
+    rna = dna.replace("T", "U")
+    return rna_comp, rna
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-length', type=int, default=50_000_000)
+    parser.add_argument('--max-loop-length', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=1 << 20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lengths = [10 ** k for k in range(4, 9) if 10 ** k < args.max_length] + [args.max_length]
+    for length in lengths:
+        dna = ''.join(rng.choices('ACGT', k=length))
+        line = f'{length:>10} bases:'
+
+        start = time.perf_counter()
+        transcribe(dna)
+        line += f' translate {time.perf_counter() - start:8.4f} s'
+
+        start = time.perf_counter()
+        for _ in transcribe_chunks(iter_chunks(dna, args.chunk_size)):
+            pass
+        line += f', chunks {time.perf_counter() - start:8.4f} s'
+
+        if length <= args.max_loop_length:
+            start = time.perf_counter()
+            transcribe_loop(dna)
+            line += f', loop {time.perf_counter() - start:8.4f} s'
+        print(line)
+
+if __name__ == '__main__':
+    main()
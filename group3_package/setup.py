@@ -5,7 +5,7 @@
 from setuptools import setup, find_packages
 
 requirements = ['click', 'pip', 'requests','tqdm', 'fastapi', 'uvicorn',
-                'aiofiles', 'python-multipart', 'typing', 'numpy==1.22.4', 'numba==0.56.4', 'biopython', 'selenium']
+                'aiofiles', 'python-multipart', 'httpx', 'typing', 'numpy==1.22.4', 'numba==0.56.4', 'biopython', 'selenium']
 
 
 test_requirements = ['pytest>=3', ]
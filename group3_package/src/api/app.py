@@ -1,13 +1,13 @@
 import uvicorn
-from fastapi import FastAPI, UploadFile
+from fastapi import FastAPI, HTTPException, UploadFile
 import aiofiles
 from pathlib import Path
+from typing import Optional
 import models
 import os
-from src.parser import parse
-from src.translation import transcribe, translate, request_blastp
-from src.scs import greedy_scs_heap
-from src.blast import blast_website
+import uuid
+from src.api.jobs import Job, JobManager, QueueFull
+from src.blast_cache import BlastCache, DEFAULT_BLAST_CACHE
 import sys
 from fastapi.middleware.cors import CORSMiddleware
 import argparse
@@ -29,134 +29,133 @@ apiapp.add_middleware(
 parser = argparse.ArgumentParser()
 parser.add_argument("--port", type=int, default=8888, help="port number for the API")
 parser.add_argument("--num_cores", type=int, default=1, help="number of cores to use")
+parser.add_argument("--min_overlap", type=int, default=20, help="minimum overlap of reads in the same contig")
+parser.add_argument("--protein_index", type=str, default=None, help="directory of a local protein index, used instead of BLAST")
+parser.add_argument("--blast_cache", type=str, default=DEFAULT_BLAST_CACHE, help="SQLite cache of BLAST results, empty: no cache")
+parser.add_argument("--read_cache_dir", type=str, default=None, help="directory of the binary read cache, re-uploaded files are not parsed again")
+parser.add_argument("--max_running_jobs", type=int, default=1, help="jobs processed at the same time (worker processes), each may use num_cores")
+parser.add_argument("--max_queued_jobs", type=int, default=4, help="jobs waiting for a worker, more uploads are rejected (503)")
 args = parser.parse_args()
 
 PORT = args.port
 NUM_CORES=args.num_cores
+MIN_OVERLAP=args.min_overlap
+READ_CACHE_DIR=args.read_cache_dir
+# local protein search instead of BLAST, see src build-protein-index
+PROTEIN_INDEX=args.protein_index
+# same cache as the CLI by default
+BLAST_CACHE_PATH=args.blast_cache
+# worker processes and queue depth bound the memory of the container
+MAX_RUNNING_JOBS=args.max_running_jobs
+MAX_QUEUED_JOBS=args.max_queued_jobs
 
-class DNASequenceTracker:
-    def __init__(self):
-        self.file_uploaded = False
-        self.dna_sequences = None
-        self.assembled_dna = None
-        self.mRNA_sequence = None
-        self.amino_acids = None
-        self.amino_acids_and_proteins = None
-    
-    def reset(self):
-        self.__init__()
-
-    def get_dna_sequence(self):
-        if self.file_uploaded:
-            if self.assembled_dna:
-                return {'dna_file_uploaded': True, 'assembled_dna':self.assembled_dna}
-            else:
-                self.assembled_dna = greedy_scs_heap(strings=self.dna_sequences, num_cpu=NUM_CORES)
-                return {'dna_file_uploaded': True, 'assembled_dna':self.assembled_dna}
-        else:
-            return {'dna_file_uploaded': False}
-    
-    def get_mRNA_sequence(self):
-        if self.file_uploaded:
-            if self.assembled_dna:
-                if self.mRNA_sequence:
-                    return {'dna_file_uploaded': True, 'dna_sequence_assembled': True, 'mRNA': self.mRNA_sequence}
-                else:
-                    self.mRNA_sequence = transcribe(self.assembled_dna)[1]
-                    return {'dna_file_uploaded': True, 'dna_sequence_assembled': True, 'mRNA': self.mRNA_sequence}
-            else:
-                return {'dna_file_uploaded': True, 'dna_sequence_assembled': False}
-        else:
-            return {'dna_file_uploaded': False}
-    
-    def get_amino_acids(self):
-        if self.file_uploaded:
-            if self.assembled_dna:
-                if self.mRNA_sequence:
-                    if self.amino_acids_and_proteins:
-                        return {'dna_file_uploaded': True, 'dna_sequence_assembled': True, 'mRNA_assembled': True, 'amino_acids_and_proteins': self.amino_acids_and_proteins}
-                    else:
-                        self.amino_acids = translate(self.mRNA_sequence)
-                        try:
-                            # loop through the amino acids and get the result from blast. Only save a a result is returned from blat
-                            self.amino_acids_and_proteins = {}
-                            amino_acids = ""
-                            for amino_acid in self.amino_acids:
-                                # define a minimum amino acid length:
-                                if len(amino_acid) > 105:
-                                    #------------------------------
-                                    # amino_acids = amino_acids + f"\n{amino_acid}"
-                                    self.amino_acids_and_proteins[amino_acid] = request_blastp(amino_acid)
-                                else:
-                                    continue
-                                    #--------------------------------
-                            # self.amino_acids_and_proteins = blast_website(self.amino_acids)
-                            return {'dna_file_uploaded': True, 'dna_sequence_assembled': True, 'mRNA_assembled': True, 'amino_acids_and_proteins': self.amino_acids_and_proteins}
-   
-                        except Exception as e:
-                            return {'dna_file_uploaded': True, 'dna_sequence_assembled': True, 'mRNA_assembled': True, 'error': "BLAST API Error"}
-                else:
-                    return {'dna_file_uploaded': True, 'dna_sequence_assembled': True, 'mRNA_assembled': False}
-
-            else:
-                return {'dna_file_uploaded': True, 'dna_sequence_assembled': False}
-        else:
-            return {'dna_file_uploaded': False}
-
-            
-
-    async def upload_file(self, dnaFile: UploadFile):
-        try:
-            # clear stored sequences when a new file is uploaded
-            self.dna_sequences = None
-            self.assembled_dna = None
-            self.mRNA_sequence = None
-            self.amino_acids = None
-            tmp_dir = os.path.join(os.getcwd(), 'tmp')
-            Path(tmp_dir).mkdir(parents=True, exist_ok=True)
-            tmp_file_location = os.path.join(tmp_dir, dnaFile.filename)
-            async with aiofiles.open(tmp_file_location, 'w') as out_file:
-                raw_content = await dnaFile.read()
-                content = raw_content.decode("utf-8")
-                await out_file.write(content)
-            parsed_seqs = parse(tmp_file_location)
-            os.remove(tmp_file_location)
-            self.dna_sequences = parsed_seqs
-            self.file_uploaded = True
-            return {'successfully_uploaded': True}
-        except Exception as e:
-            return {'successfully_uploaded': False, 'error': e}
+job_manager = JobManager(max_running=MAX_RUNNING_JOBS, max_queued=MAX_QUEUED_JOBS, min_overlap=MIN_OVERLAP,
+                         num_cpu=NUM_CORES, read_cache_dir=READ_CACHE_DIR, protein_index=PROTEIN_INDEX,
+                         blast_cache=BLAST_CACHE_PATH)
+# job shown by the endpoints without job_id, the state of every upload is kept in its own job
+latest_job_id = None
+
+
+def job_or_latest(job_id: Optional[str]) -> Optional[Job]:
+    """Job of the id, the latest uploaded job without id (single page frontend)."""
+    if job_id is None:
+        job_id = latest_job_id
+    return job_manager.get(job_id) if job_id is not None else None
 
-# for now we only expect 1 user, just use this object to keep track of the data
-# if we wanted to scale to multiple users, we would need to keep track in a database, or data structure stored in memory (risky)
-dna_sequence_tracker = DNASequenceTracker()
 
+def job_not_found(job_id: str):
+    raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+
+@apiapp.on_event("shutdown")
+def shutdown_jobs():
+    job_manager.shutdown()
 
 @apiapp.get("/reset", response_model=models.Reset)
 def reset_data():
-    # For now we only expect 1 user. This endpoint will be called to reset the data whenever the user refreshes the website.
-    dna_sequence_tracker.reset()
+    # This endpoint will be called whenever the user refreshes the website, the jobs of other users are kept.
+    global latest_job_id
+    latest_job_id = None
     return {"data_reset": True}
 
 @apiapp.get("/amino_acids", response_model=models.AminoAcids)
-def get_amino_acids():
-    """Get the list of amino acids"""
-    return dna_sequence_tracker.get_amino_acids()
+def get_amino_acids(job_id: Optional[str] = None):
+    """Get the proteins of the amino acids of a job (does not wait for the job)"""
+    job = job_or_latest(job_id)
+    if job is None:
+        return {'dna_file_uploaded': False}
+    response = {'dna_file_uploaded': True, 'job_id': job.id, 'status': job.status,
+                'dna_sequence_assembled': 'assembled_dna' in job.result,
+                'mRNA_assembled': 'mRNA' in job.result,
+                'amino_acids_and_proteins': job.result.get('amino_acids_and_proteins')}
+    if job.status == 'failed':
+        response['error'] = job.error
+    return response
 
 @apiapp.get("/mRNA", response_model=models.MRNA)
-def get_mrna():
-    """Get the transcribed mRNA sequence"""
-    return dna_sequence_tracker.get_mRNA_sequence()
+def get_mrna(job_id: Optional[str] = None):
+    """Get the transcribed mRNA sequence of a job (does not wait for the job)"""
+    job = job_or_latest(job_id)
+    if job is None:
+        return {'dna_file_uploaded': False}
+    return {'dna_file_uploaded': True, 'job_id': job.id, 'status': job.status,
+            'dna_sequence_assembled': 'assembled_dna' in job.result, 'mRNA': job.result.get('mRNA')}
 
 @apiapp.get("/dnaSequence", response_model=models.DNASequence)
-def get_dna_sequence():
-    """Get the aligned DNA sequence from the uploaded dna strand files."""
-    return dna_sequence_tracker.get_dna_sequence()
+def get_dna_sequence(job_id: Optional[str] = None):
+    """Get the aligned DNA sequence of a job (does not wait for the job)"""
+    job = job_or_latest(job_id)
+    if job is None:
+        return {'dna_file_uploaded': False}
+    return {'dna_file_uploaded': True, 'job_id': job.id, 'status': job.status,
+            'assembled_dna': job.result.get('assembled_dna')}
+
+@apiapp.get("/blast_cache", response_model=models.BlastCacheStats)
+def get_blast_cache_stats():
+    """Hits and misses of the BLAST result cache"""
+    if not BLAST_CACHE_PATH:
+        return {"enabled": False}
+    return {"enabled": True, **BlastCache(BLAST_CACHE_PATH).stats()}
 
 @apiapp.post("/upload", response_model=models.Upload)
 async def upload_file(dnaFile: UploadFile):
-    """handle uploaded file from user and parse the sequences and store them into dna_sequence_tracker"""
-    return await dna_sequence_tracker.upload_file(dnaFile)
+    """save the uploaded file of the user and start a job (assembly, transcription, protein search) for it"""
+    global latest_job_id
+    tmp_file_location = None
+    try:
+        tmp_dir = os.path.join(os.getcwd(), 'tmp')
+        Path(tmp_dir).mkdir(parents=True, exist_ok=True)
+        # unique name, files of several users may be waiting for a worker
+        tmp_file_location = os.path.join(tmp_dir, f'{uuid.uuid4().hex}_{os.path.basename(dnaFile.filename)}')
+        async with aiofiles.open(tmp_file_location, 'wb') as out_file:
+            await out_file.write(await dnaFile.read())
+        job = job_manager.submit(tmp_file_location)
+    except QueueFull:
+        os.remove(tmp_file_location)
+        raise HTTPException(status_code=503, detail="Too many jobs, try again later")
+    except Exception as e:
+        if tmp_file_location is not None and os.path.exists(tmp_file_location):
+            os.remove(tmp_file_location)
+        return {'successfully_uploaded': False, 'error': str(e)}
+    latest_job_id = job.id
+    return {'successfully_uploaded': True, 'job_id': job.id}
+
+@apiapp.get("/jobs/{job_id}", response_model=models.Job)
+def get_job(job_id: str):
+    """Status of a job and the results of its finished stages"""
+    job = job_manager.get(job_id)
+    if job is None:
+        job_not_found(job_id)
+    return job.to_dict()
+
+@apiapp.delete("/jobs/{job_id}", response_model=models.Job)
+def cancel_job(job_id: str):
+    """Cancel a queued job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        job_not_found(job_id)
+    job_manager.cancel(job_id)
+    return job.to_dict()
 
 
 
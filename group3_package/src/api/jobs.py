@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+from src.parser import parse
+from src.scs import assemble_components
+from src.translation import transcribe
+from src.orf_utils import find_orfs, collapse_orfs
+from src.protein_index import ProteinIndex
+from src.blast_cache import BlastCache
+from src.blast_client import blast_proteins
+
+"""
+Background jobs of the API.
+
+An uploaded file becomes a job, which runs in two stages on a bounded process pool:
+1. assembly: parse the reads, assemble the connected components (contigs), transcribe them (mRNA),
+2. search: ORFs of the contigs, protein of each ORF longer than MIN_PROTEIN_LENGTH (local index or BLAST).
+Results of a stage are available as soon as it is finished. At most max_running + max_queued jobs
+are unfinished at a time (more uploads are rejected), finished jobs are kept up to max_kept.
+"""
+
+MIN_PROTEIN_LENGTH = 105  # amino acids
+
+
+class QueueFull(Exception):
+    pass
+
+
+def assemble_job(path: str, min_overlap: int, num_cpu: int, read_cache_dir: Optional[str]) -> dict:
+    """Stage 1 (in a worker process), the uploaded file is removed after parsing."""
+    try:
+        reads = parse(path, packed=True, cache_dir=read_cache_dir)
+    finally:
+        os.remove(path)
+    # one contig per connected component of the overlap graph, components are assembled in parallel
+    contigs = assemble_components(reads, min_overlap=min_overlap, num_cpu=num_cpu)
+    return {'contigs': contigs,
+            'assembled_dna': '\n'.join(contigs),
+            'mRNA': '\n'.join(transcribe(contig)[1] for contig in contigs)}
+
+
+def search_job(contigs: List[str], protein_index: Optional[str], blast_cache: Optional[str]) -> dict:
+    """Stage 2 (in a worker process)."""
+    # proteins of the ORFs in the six frames of every contig
+    orfs = [orf for contig in contigs for orf in find_orfs(contig)]
+    amino_acids = [orf.protein for orf in orfs]
+
+    # nested and duplicate proteins are searched once
+    representatives, members = collapse_orfs(orfs)
+    searched = [(orf, orf_indexes) for orf, orf_indexes in zip(representatives, members)
+                if len(orf.protein) > MIN_PROTEIN_LENGTH]
+    queries = [orf.protein for orf, _ in searched]
+    if protein_index is not None:
+        index = ProteinIndex.load(protein_index)
+        proteins = [index.identify(amino_acid) for amino_acid in queries]
+    else:
+        cache = BlastCache(blast_cache) if blast_cache else None
+        proteins = blast_proteins(queries, cache=cache)
+
+    # result of the representative for all ORFs it stands for
+    amino_acids_and_proteins = {}
+    for (_, orf_indexes), protein in zip(searched, proteins):
+        for i in orf_indexes:
+            if len(amino_acids[i]) > MIN_PROTEIN_LENGTH:
+                amino_acids_and_proteins[amino_acids[i]] = protein
+    return {'amino_acids': amino_acids, 'amino_acids_and_proteins': amino_acids_and_proteins}
+
+
+class Job:
+    """
+    State of one uploaded file.
+
+    status: str
+        'queued', 'running', 'done', 'failed' or 'cancelled'.
+
+    stage: str
+        'assembly' or 'search' (stage of a queued or running job).
+
+    result: dict
+        Results of the finished stages (assemble_job, search_job).
+
+    upload: str
+        Uploaded reads file, removed by assemble_job (or when the job is cancelled before it runs).
+    """
+
+    def __init__(self, job_id: str, upload: str = None):
+        self.id = job_id
+        self.upload = upload
+        self.created = time.time()
+        self.finished = None
+        self.stage = 'assembly'
+        self.final_status = None
+        self.error = None
+        self.result = {}
+        self.future: Optional[Future] = None
+
+    @property
+    def status(self) -> str:
+        if self.final_status is not None:
+            return self.final_status
+        if self.stage == 'search' or (self.future is not None and self.future.running()):
+            return 'running'
+        return 'queued'
+
+    def to_dict(self) -> dict:
+        result = {key: value for key, value in self.result.items() if key != 'contigs'}
+        return {'job_id': self.id, 'status': self.status, 'stage': self.stage, 'error': self.error, **result}
+
+
+class JobManager:
+    """
+    Jobs of the API on a process pool.
+
+    max_running: int, default=1
+        Worker processes (jobs processed at the same time), keeps the memory bounded.
+
+    max_queued: int, default=4
+        Unfinished jobs waiting for a worker, submit raises QueueFull above.
+
+    max_kept: int, default=100
+        Finished jobs kept for /jobs/{id}, the oldest are forgotten.
+
+    min_overlap, num_cpu, read_cache_dir, protein_index, blast_cache:
+        Settings of the stages, see assemble_job and search_job.
+    """
+
+    def __init__(self, max_running: int = 1, max_queued: int = 4, max_kept: int = 100, min_overlap: int = 20,
+                 num_cpu: int = 1, read_cache_dir: str = None, protein_index: str = None, blast_cache: str = None):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_kept = max_kept
+        self.min_overlap = min_overlap
+        self.num_cpu = num_cpu
+        self.read_cache_dir = read_cache_dir
+        self.protein_index = protein_index
+        self.blast_cache = blast_cache
+        self.executor = ProcessPoolExecutor(max_running)
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, path: str) -> Job:
+        """New job for the reads file (removed by the job)."""
+        with self._lock:
+            n_unfinished = sum(job.final_status is None for job in self.jobs.values())
+            if n_unfinished >= self.max_running + self.max_queued:
+                raise QueueFull(f'{n_unfinished} jobs are not finished')
+            job = Job(uuid.uuid4().hex, upload=path)
+            self.jobs[job.id] = job
+            self._forget_finished()
+        job.future = self.executor.submit(assemble_job, path, self.min_overlap, self.num_cpu, self.read_cache_dir)
+        job.future.add_done_callback(lambda future: self._assembled(job, future))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job, running jobs are not interrupted."""
+        job = self.jobs.get(job_id)
+        return job is not None and job.future is not None and job.future.cancel()
+
+    def _finish(self, job: Job, future: Future) -> bool:
+        """Store the stage result, False if the job ended (cancelled or failed)."""
+        if future.cancelled():
+            job.final_status = 'cancelled'
+            # assemble_job did not run, so it did not remove the upload
+            if job.stage == 'assembly' and job.upload is not None and os.path.exists(job.upload):
+                os.remove(job.upload)
+        elif future.exception() is not None:
+            job.final_status = 'failed'
+            job.error = repr(future.exception())
+        else:
+            job.result.update(future.result())
+            return True
+        job.finished = time.time()
+        return False
+
+    def _assembled(self, job: Job, future: Future):
+        if not self._finish(job, future):
+            return
+        job.stage = 'search'
+        try:
+            job.future = self.executor.submit(search_job, job.result['contigs'], self.protein_index,
+                                              self.blast_cache)
+        except RuntimeError as e:  # executor shut down
+            job.final_status, job.error, job.finished = 'failed', repr(e), time.time()
+            return
+        job.future.add_done_callback(lambda search_future: self._searched(job, search_future))
+
+    def _searched(self, job: Job, future: Future):
+        if self._finish(job, future):
+            job.final_status = 'done'
+            job.finished = time.time()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.final_status is not None]
+        for job_id in finished[:max(len(finished) - self.max_kept, 0)]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
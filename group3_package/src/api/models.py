@@ -6,19 +6,44 @@ class Reset(BaseModel):
 
 class AminoAcids(BaseModel):
     dna_file_uploaded: bool
+    job_id: Optional[str]
+    status: Optional[str]
     dna_sequence_assembled: Optional[bool]
     mRNA_assembled: Optional[bool]
     amino_acids_and_proteins: Optional[dict]
+    error: Optional[str]
 
 class MRNA(BaseModel):
     dna_file_uploaded: bool
+    job_id: Optional[str]
+    status: Optional[str]
     dna_sequence_assembled: Optional[bool]
     mRNA: Optional[str]
 
 class DNASequence(BaseModel):
     dna_file_uploaded: bool
+    job_id: Optional[str]
+    status: Optional[str]
     assembled_dna: Optional[str]
 
 class Upload(BaseModel):
     successfully_uploaded: bool
+    job_id: Optional[str]
+    error: Optional[str]
+
+class Job(BaseModel):
+    job_id: str
+    status: str
+    stage: str
     error: Optional[str]
+    assembled_dna: Optional[str]
+    mRNA: Optional[str]
+    amino_acids: Optional[list]
+    amino_acids_and_proteins: Optional[dict]
+
+class BlastCacheStats(BaseModel):
+    enabled: bool
+    hits: Optional[int]
+    misses: Optional[int]
+    saved_seconds: Optional[float]
+    entries: Optional[int]
@@ -1,4 +1,4 @@
-from time import sleep
+from time import perf_counter, sleep
 import io
 import json
 import requests
@@ -6,13 +6,47 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from typing import List
+from .blast_cache import BlastCache, blast_key
 
 
-def blast_website(amino_acid_seqs: List[str], docker=True) -> List[str]:
+def blast_website(amino_acid_seqs: List[str], docker=True, cache: BlastCache = None) -> List[str]:
     """
     Get list of proteins from amino acid sequences.
     BLAST, use the website.
 
+    cache: BlastCache, default=None
+        Results of previous searches, one entry per sequence. Only the sequences not in the cache
+        are searched (in one browser session).
+
+    Returns the hit titles of all sequences, in the order of the sequences.
+    """
+    keys = [blast_key(seq, program='blast_website') for seq in amino_acid_seqs]
+    results = {}
+    if cache is not None:
+        for key in dict.fromkeys(keys):
+            result = cache.get(key)
+            if result is not None:
+                results[key] = result
+
+    todo = {key: seq for key, seq in zip(keys, amino_acid_seqs) if key not in results}
+    if todo:
+        start = perf_counter()
+        hits = search_website(list(todo.values()), docker)
+        seconds = (perf_counter() - start) / len(todo)
+        for key, query_hits in zip(todo, hits):
+            if query_hits is None:  # failed lookup: no hits this time, not cached
+                results[key] = []
+                continue
+            results[key] = query_hits
+            if cache is not None:
+                cache.put(key, query_hits, seconds)
+    return [title for key in keys for title in results[key]]
+
+
+def search_website(amino_acid_seqs: List[str], docker=True) -> List[List[str]]:
+    """
+    Hit titles of each amino acid sequence (one search with all sequences on the BLAST website),
+    None for a sequence without a valid report. Browser and download errors are raised.
     """
     # Open browser
     if docker:
@@ -64,10 +98,12 @@ def blast_website(amino_acid_seqs: List[str], docker=True) -> List[str]:
     r = requests.get(download_url)
     result = json.load(io.BytesIO(r.content))
 
-    # Parse json
-    try:
-        hits_array = result['BlastOutput2'][0]['report']['results']['search']['hits']
-        prots = [el['description'][0]['title'] for el in hits_array]
-    except:
-        prots = []
+    # Parse json, one report per query, None if the report of a query is missing or malformed
+    prots = []
+    for i in range(len(amino_acid_seqs)):
+        try:
+            hits_array = result['BlastOutput2'][i]['report']['results']['search']['hits']
+            prots.append([el['description'][0]['title'] for el in hits_array])
+        except (KeyError, IndexError, TypeError):
+            prots.append(None)
     return prots
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+"""
+Persistent cache of BLAST results (SQLite).
+
+Results are keyed by the SHA-256 of the query and the search parameters, stored as JSON together with
+the time the remote search took. Entries older than ttl seconds are not used, above max_entries the least
+recently used entries are removed. Hit and miss counters (and the remote time saved by hits) are stored in
+the same database, so they are shared by all processes using the cache (CLI and API).
+"""
+
+DEFAULT_BLAST_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'group3', 'blast_cache.sqlite')
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def blast_key(query: Any, **params) -> str:
+    """SHA-256 of the query (str or list of str) and the parameters."""
+    return hashlib.sha256(json.dumps([query, params], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class BlastCache:
+    """
+    SQLite cache of BLAST results.
+
+    path: str, default=DEFAULT_BLAST_CACHE
+        Database file, created if it does not exist.
+
+    ttl: float, default=30 days
+        Seconds an entry is valid.
+
+    max_entries: int, default=100000
+        Maximum number of entries.
+    """
+
+    def __init__(self, path: str = DEFAULT_BLAST_CACHE, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL, '
+                         'created REAL NOT NULL, last_used REAL NOT NULL, seconds REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+            conn.execute('CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value REAL NOT NULL)')
+            conn.executemany('INSERT OR IGNORE INTO stats VALUES (?, 0)',
+                             [('hits',), ('misses',), ('saved_seconds',)])
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # one connection per operation (one transaction): the cache is used from several processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result, None if there is no valid entry (counted as a miss)."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT result, seconds FROM results WHERE key = ? AND created >= ?',
+                               (key, now - self.ttl)).fetchone()
+            if row is None:
+                conn.execute('DELETE FROM results WHERE key = ?', (key,))  # expired
+                conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'misses'")
+                return None
+            conn.execute('UPDATE results SET last_used = ? WHERE key = ?', (now, key))
+            conn.execute("UPDATE stats SET value = value + 1 WHERE name = 'hits'")
+            conn.execute("UPDATE stats SET value = value + ? WHERE name = 'saved_seconds'", (row[1],))
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Any, seconds: float = 0.):
+        """Store a result (JSON serializable) and the seconds the remote search took."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                         (key, json.dumps(result), now, now, seconds))
+            conn.execute('DELETE FROM results WHERE created < ?', (now - self.ttl,))
+            conn.execute('DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used DESC '
+                         'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Cached result, or the result of fetch() which is then cached."""
+        result = self.get(key)
+        if result is not None:
+            return result
+        start = time.perf_counter()
+        result = fetch()
+        self.put(key, result, time.perf_counter() - start)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Hits, misses, remote seconds saved by the hits and the number of entries."""
+        with self._connect() as conn:
+            stats = dict(conn.execute('SELECT name, value FROM stats').fetchall())
+            stats['entries'] = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        stats['hits'], stats['misses'] = int(stats['hits']), int(stats['misses'])
+        return stats
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM results')
+            conn.execute('UPDATE stats SET value = 0')
@@ -0,0 +1,239 @@
+import asyncio
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+import httpx
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from .blast_cache import BlastCache, blast_key, DEFAULT_BLAST_CACHE
+try:
+    import fcntl
+except ImportError:  # Windows: the rate limit is per process
+    fcntl = None
+
+"""
+Asynchronous client for the NCBI BLAST URL API (Put/Get RID protocol).
+
+Queries are submitted in batches, each batch as one multi-FASTA job (CMD=Put returns a request id, RID).
+The job status is polled (CMD=Get, FORMAT_OBJECT=SearchInfo) with growing intervals until it is READY,
+then the XML report is downloaded and parsed. Every request to the server takes a token from a
+token bucket shared by all clients and processes of the user (state in a locked file), so the server
+is not contacted more often than once every 10 seconds, also with many batches in flight or several
+API workers and CLI runs at the same time.
+https://blast.ncbi.nlm.nih.gov/Blast.cgi?CMD=Web&PAGE_TYPE=BlastDocs&DOC_TYPE=DeveloperInfo
+"""
+
+BLAST_URL = 'https://blast.ncbi.nlm.nih.gov/Blast.cgi'
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter for coroutines (of any event loop and thread).
+
+    rate: float
+        Tokens added per second.
+
+    capacity: float
+        Maximum number of tokens (burst size).
+
+    path: str, default=None
+        File with the state of the bucket, shared by all processes using the same file (exclusive file lock,
+        POSIX). None: the bucket is local to the process.
+
+    Description
+    -----------
+    A caller takes a token immediately, the number of tokens may become negative: the caller then
+    waits until the bucket is refilled to 0, so callers are served in the order of their calls.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1., path: str = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.path = path
+        self.tokens = capacity
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float, updated: float) -> Tuple[float, float, float]:
+        """State after taking a token and seconds to wait."""
+        now = time.time()
+        tokens = min(self.capacity, tokens + max(now - updated, 0.) * self.rate) - 1
+        return tokens, now, max(0., -tokens / self.rate)
+
+    def reserve(self) -> float:
+        """Take a token, returns seconds to wait before it may be used."""
+        with self._lock:
+            if self.path is None or fcntl is None:
+                self.tokens, self.updated, delay = self._take(self.tokens, self.updated)
+                return delay
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT), 'r+') as file:
+                fcntl.flock(file, fcntl.LOCK_EX)  # released when the file is closed
+                state = file.read().split()
+                tokens, updated = (float(state[0]), float(state[1])) if len(state) == 2 \
+                    else (self.capacity, time.time())
+                tokens, updated, delay = self._take(tokens, updated)
+                file.seek(0)
+                file.truncate()
+                file.write(f'{tokens!r} {updated!r}')
+            return delay
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# "Do not contact the server more often than once every 10 seconds."
+# Shared by all processes of the user (CLI runs, API workers).
+NCBI_RATE_LIMIT = TokenBucket(rate=0.1, path=os.path.join(os.path.dirname(DEFAULT_BLAST_CACHE), 'ncbi_rate_limit'))
+
+
+class BlastHit(NamedTuple):
+    definition: str
+    accession: str
+    bit_score: float
+    evalue: float
+
+
+def parse_qblast_info(text: str) -> Dict[str, str]:
+    """Key = value pairs of the QBlastInfo blocks of a response (RID, RTOE, Status, ThereAreHits)."""
+    return dict(re.findall(r'^\s*(\w+)\s*=\s*(\S+)\s*$', text, flags=re.MULTILINE))
+
+
+def parse_blast_xml(text: str, n_queries: int) -> List[List[BlastHit]]:
+    """
+    Hits of each query of a BLAST XML report, queries in submission order
+    (query definitions 'q<index>', see BlastClient.submit, otherwise the order of the iterations).
+    """
+    root = ET.fromstring(text)
+    results = [[] for _ in range(n_queries)]
+    for iteration_number, iteration in enumerate(root.iter('Iteration')):
+        query_def = iteration.findtext('Iteration_query-def', default='')
+        match = re.fullmatch(r'q(\d+)', query_def.strip())
+        query_index = int(match.group(1)) if match else iteration_number
+        if query_index >= n_queries:
+            continue
+        for hit in iteration.iter('Hit'):
+            hsp = hit.find('Hit_hsps/Hsp')
+            results[query_index].append(BlastHit(
+                definition=hit.findtext('Hit_def', default=''),
+                accession=hit.findtext('Hit_accession', default=''),
+                bit_score=float(hsp.findtext('Hsp_bit-score', default='nan')) if hsp is not None else float('nan'),
+                evalue=float(hsp.findtext('Hsp_evalue', default='nan')) if hsp is not None else float('nan'),
+            ))
+    return results
+
+
+class BlastClient:
+    """
+    BLAST URL API client.
+
+    url: str, default=BLAST_URL
+        Blast.cgi endpoint (f.e. a local mock server in tests).
+
+    program, database: str, default='blastp', 'nr'
+
+    rate_limit: TokenBucket, default=NCBI_RATE_LIMIT
+        Shared by all requests to the server.
+
+    batch_size: int, default=20
+        Queries per job.
+
+    poll_interval: float, default=60
+        First wait for a job (at least the estimated time RTOE from the server), multiplied by poll_backoff
+        after each poll up to max_poll_interval ("Do not poll for any single RID more often than once a minute").
+
+    timeout: float, default=1800
+        Seconds for a job, then TimeoutError.
+    """
+
+    def __init__(self, url: str = BLAST_URL, program: str = 'blastp', database: str = 'nr',
+                 rate_limit: TokenBucket = NCBI_RATE_LIMIT, batch_size: int = 20, poll_interval: float = 60.,
+                 poll_backoff: float = 1.5, max_poll_interval: float = 300., timeout: float = 1800.):
+        self.url = url
+        self.program = program
+        self.database = database
+        self.rate_limit = rate_limit
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.poll_backoff = poll_backoff
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+
+    async def _request(self, client: httpx.AsyncClient, method: str, params: dict) -> str:
+        await self.rate_limit.acquire()
+        if method == 'POST':
+            response = await client.post(self.url, data=params)
+        else:
+            response = await client.get(self.url, params=params)
+        response.raise_for_status()
+        return response.text
+
+    async def submit(self, client: httpx.AsyncClient, queries: List[str]) -> Tuple[str, float]:
+        """Submit one job with the queries (multi-FASTA, query i is named q<i>), returns RID and RTOE (seconds)."""
+        fasta = ''.join(f'>q{i}\n{query}\n' for i, query in enumerate(queries))
+        text = await self._request(client, 'POST', {'CMD': 'Put', 'PROGRAM': self.program,
+                                                    'DATABASE': self.database, 'QUERY': fasta})
+        info = parse_qblast_info(text)
+        if 'RID' not in info:
+            raise RuntimeError(f'BLAST submission failed: {text[:200]}')
+        return info['RID'], float(info.get('RTOE', 0))
+
+    async def wait(self, client: httpx.AsyncClient, rid: str, rtoe: float = 0.):
+        """Poll the job status until it is READY."""
+        start = time.monotonic()
+        interval = max(self.poll_interval, rtoe)
+        while True:
+            await asyncio.sleep(min(interval, self.max_poll_interval))
+            text = await self._request(client, 'GET', {'CMD': 'Get', 'FORMAT_OBJECT': 'SearchInfo', 'RID': rid})
+            status = parse_qblast_info(text).get('Status', 'UNKNOWN')
+            if status == 'READY':
+                return
+            if status != 'WAITING':
+                raise RuntimeError(f'BLAST search {rid} failed: {status}')
+            if time.monotonic() - start > self.timeout:
+                raise TimeoutError(f'BLAST search {rid} not ready after {self.timeout} s')
+            interval = min(interval * self.poll_backoff, self.max_poll_interval)
+
+    async def search_batch(self, client: httpx.AsyncClient, queries: List[str]) -> List[List[BlastHit]]:
+        rid, rtoe = await self.submit(client, queries)
+        await self.wait(client, rid, rtoe)
+        text = await self._request(client, 'GET', {'CMD': 'Get', 'FORMAT_TYPE': 'XML', 'RID': rid})
+        return parse_blast_xml(text, len(queries))
+
+    async def search(self, queries: List[str]) -> List[List[BlastHit]]:
+        """Hits of each query, batches are searched concurrently."""
+        batches = [queries[i:i + self.batch_size] for i in range(0, len(queries), self.batch_size)]
+        async with httpx.AsyncClient(timeout=60) as client:
+            results = await asyncio.gather(*[self.search_batch(client, batch) for batch in batches])
+        return [hits for batch_hits in results for hits in batch_hits]
+
+
+def blast_proteins(amino_acid_seqs: List[str], cache: Optional[BlastCache] = None,
+                   client: BlastClient = None) -> List[Union[str, int]]:
+    """
+    Best hit of each amino acid sequence, -1 if there is none (same output as translation.request_blastp).
+    Sequences found in the cache are not searched again, the others are searched as batched jobs.
+    """
+    client = client if client is not None else BlastClient()
+    keys = [blast_key(seq, program=client.program, database=client.database) for seq in amino_acid_seqs]
+    results = {}
+    if cache is not None:
+        for key in dict.fromkeys(keys):
+            result = cache.get(key)
+            if result is not None:
+                results[key] = result
+
+    todo = {key: seq for key, seq in zip(keys, amino_acid_seqs) if key not in results}
+    if todo:
+        start = time.perf_counter()
+        hits = asyncio.run(client.search(list(todo.values())))
+        seconds = (time.perf_counter() - start) / len(todo)
+        for key, query_hits in zip(todo, hits):
+            results[key] = query_hits[0].definition if query_hits else -1
+            if cache is not None:
+                cache.put(key, results[key], seconds)
+    return [results[key] for key in keys]
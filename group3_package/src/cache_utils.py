@@ -0,0 +1,137 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Optional
+
+"""
+Size-bounded on-disk cache of numpy arrays.
+
+Every entry is a directory <cache_dir>/<key> with one .npy file per array, arrays are loaded
+memory-mapped (read-only). Python objects (f.e. checkpoints) are entries with one pickle file.
+Keys are content hashes, so a changed input gets a new key and the stale entry is never read again:
+it is evicted once the cache is over its size limit.
+The modification time of an entry directory is its last use, entries are evicted least recently used first.
+"""
+
+CACHE_MAX_BYTES = 1 << 30
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 of the file content (hex), the file is read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def strings_digest(strings: Iterable[str]) -> str:
+    """SHA-256 of the strings in the given order (hex)."""
+    digest = hashlib.sha256()
+    for s in strings:
+        digest.update(s.encode('ascii'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class DiskCache:
+    """
+    Directory of cache entries with LRU eviction.
+
+    cache_dir: str
+        Created if it does not exist.
+
+    max_bytes: int, default=1 GiB
+        Total size of the entries after a save, the entry just saved is always kept.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isdir(self._path(key))
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-mapped arrays of the entry, None if there is no entry with the key."""
+        path = self._path(key)
+        try:
+            names = [name for name in os.listdir(path) if name.endswith('.npy')]
+            arrays = {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r') for name in names}
+            os.utime(path)  # last use
+        except FileNotFoundError:  # no entry or evicted by another process
+            return None
+        return arrays
+
+    def save(self, key: str, arrays: Dict[str, np.ndarray]):
+        """Write the arrays as the entry key (replaces an existing entry), then evict old entries."""
+        def write(path):
+            for name, array in arrays.items():
+                np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(array))
+        self._write_entry(key, write)
+
+    def load_object(self, key: str) -> Optional[Any]:
+        """Pickled object of the entry, None if there is no entry with the key."""
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, 'object.pkl'), 'rb') as file:
+                obj = pickle.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return obj
+
+    def save_object(self, key: str, obj: Any):
+        """Pickle the object as the entry key (replaces an existing entry), then evict old entries."""
+        def write(path):
+            with open(os.path.join(path, 'object.pkl'), 'wb') as file:
+                pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_entry(key, write)
+
+    def _write_entry(self, key: str, write: Callable[[str], None]):
+        """
+        The entry is written to a temporary directory and renamed, so readers never see a partial entry
+        (a process killed while writing leaves only a temporary directory).
+        """
+        tmp_path = tempfile.mkdtemp(prefix='.tmp-', dir=self.cache_dir)
+        try:
+            write(tmp_path)
+            path = self._path(key)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def entries(self) -> Dict[str, int]:
+        """Key: size in bytes, least recently used first."""
+        entries = [entry for entry in os.scandir(self.cache_dir)
+                   if entry.is_dir() and not entry.name.startswith('.tmp-')]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        return {entry.name: _dir_size(entry.path) for entry in entries}
+
+    def evict(self, keep: str = None):
+        """Remove least recently used entries until the cache fits into max_bytes."""
+        entries = self.entries()
+        total = sum(entries.values())
+        for key, size in entries.items():
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= size
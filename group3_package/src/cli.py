@@ -1,9 +1,15 @@
 import click
+from functools import partial
 
 from src.parser import parse
 from src.scs import greedy_scs_heap, scs
 from src import scs as dna_assembly
+from src.debruijn import assemble_debruijn
 from src.translation import transcribe, translate, request_blastp
+from src.orf_utils import find_orfs, collapse_orfs
+from src.protein_index import ProteinIndex
+from src.blast_cache import BlastCache, DEFAULT_BLAST_CACHE
+from src.blast_client import blast_proteins
 from src import blast
 
 
@@ -24,15 +30,15 @@ def run_parser(fastq_file):
 def quick_assemble(input_list):
     """Takes reasonable time"""
     print(greedy_scs_heap(parse(input_list)))
-    greedy_scs_heap(parse(input_list))
 
 
 @cli.command()
 @click.option('-l', '--input-list', default=None, required=True, help="fastq file")
-def slow_assemble(input_list):
-    """solution guaranteed"""
-    print(scs(parse(input_list)))
-    scs(parse(input_list))
+@click.option('-t', '--time-limit', default=None, type=float,
+              help="seconds for branch-and-bound, then the best superstring so far is printed")
+def slow_assemble(input_list, time_limit):
+    """solution guaranteed (unless the time limit is reached)"""
+    print(scs(parse(input_list), time_limit=time_limit))
 
 
 @cli.command()
@@ -68,55 +74,116 @@ def translate_rna(input_mrna: str, output: str):
 
 @cli.command()
 @click.option('-s', '--sequence', default=None, required=True, help="sequence of amino acid string")
-def blast_request(sequence: str):
+@click.option('--blast-cache', default=DEFAULT_BLAST_CACHE, help="SQLite cache of BLAST results")
+@click.option('--no-blast-cache', is_flag=True, default=False, help="Always search remotely")
+def blast_request(sequence: str, blast_cache: str, no_blast_cache: bool):
     """Requests results in BLAST from sequence of possible amino-acid to get Predicted Protein
     time requests to once every 10 second, as per blast API documentation
     :param
     Input: amino acid sequence:str
     Output: Predicted Protein:str
     """
-    print(request_blastp(sequence))
+    print(request_blastp(sequence, cache=None if no_blast_cache else BlastCache(blast_cache)))
+
+
+@cli.command()
+@click.option('--blast-cache', default=DEFAULT_BLAST_CACHE, help="SQLite cache of BLAST results")
+def blast_cache_stats(blast_cache: str):
+    """Hits and misses of the BLAST result cache, remote search time saved by the hits"""
+    stats = BlastCache(blast_cache).stats()
+    print(f"{stats['entries']} entries, {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['saved_seconds']:.0f} s of remote searches saved")
+
+
+@cli.command()
+@click.option('-f', '--fasta', required=True, help="protein FASTA file (f.e. a proteome from UniProt)")
+@click.option('-o', '--output', required=True, help="index directory")
+@click.option('-k', '--kmer', default=3, type=int, help="k-mer length of the seeds")
+def build_protein_index(fasta: str, output: str, kmer: int):
+    """Build a local protein index for run --protein-index (offline search instead of BLAST)"""
+    index = ProteinIndex.build(fasta, k=kmer)
+    index.save(output)
+    print(f'Indexed {len(index)} proteins ({len(index.sequences)} amino acids).')
 
 
 @cli.command()
 @click.option('--file', required=True, help="FASTA/FASTQ file")
-@click.option('--algo', default='heap', help="heap, dict, matrix, scs")
+@click.option('--algo', default='heap', help="heap, dict, matrix, numba, scs, debruijn")
+@click.option('--overlaps', default='naive',
+              help="Initial pairwise overlaps for heap, dict, matrix, numba: naive, suffix_array, seed")
+@click.option('--min-overlap', default=1, type=int, help="Minimum overlap length (f.e. 20 with --overlaps seed)")
+@click.option('--kmer', default=31, type=int, help="k-mer length for debruijn (at most 31)")
+@click.option('--drop-contained/--keep-contained', default=True,
+              help="Remove reads contained in other reads before heap, dict, matrix, numba")
+@click.option('--both-strands', is_flag=True, default=False,
+              help="heap: reads come from both strands (reverse complement aware overlaps)")
+@click.option('--components', is_flag=True, default=False,
+              help="Assemble connected components of the overlap graph (at --min-overlap) separately")
+@click.option('--num-cpu', default=1, type=int, help="Number of processes for --components (-1: all CPUs)")
+@click.option('--cache-dir', default=None, help="Cache directory: packed reads, for heap also overlaps and merge checkpoints (repeated runs resume)")
+@click.option('--min-protein', default=20, type=int, help="Minimum length of ORF proteins (amino acids)")
+@click.option('--protein-index', default=None,
+              help="Directory of a local protein index (see build-protein-index), used instead of BLAST")
+@click.option('--blast-cache', default=DEFAULT_BLAST_CACHE, help="SQLite cache of BLAST results")
+@click.option('--no-blast-cache', is_flag=True, default=False, help="Always search remotely")
 @click.option('--chrome', is_flag=True, default=False, help="Use selenium + Chrome browser for BLAST (otherwise API)")
-def run(file: str, algo: str, chrome: bool):
+def run(file: str, algo: str, overlaps: str, min_overlap: int, kmer: int, drop_contained: bool, both_strands: bool,
+        components: bool, num_cpu: int, cache_dir: str, min_protein: int, protein_index: str, blast_cache: str,
+        no_blast_cache: bool, chrome: bool):
     """
     Determine the list of proteins from dna reads.
     """
+    # the greedy algorithms work on strings: packed reads only for the read cache (memory-mapped)
+    # and for de Bruijn, which reads the 2-bit codes directly
+    packed = cache_dir is not None or algo == 'debruijn'
     if algo == 'heap':
-        algo = dna_assembly.greedy_scs_heap
+        algo = partial(dna_assembly.greedy_scs_heap, overlaps=overlaps, min_overlap=min_overlap,
+                       drop_contained=drop_contained, both_strands=both_strands, cache_dir=cache_dir)
     elif algo == 'dict':
-        algo = dna_assembly.greedy_scs_dict
+        algo = partial(dna_assembly.greedy_scs_dict, overlaps=overlaps, min_overlap=min_overlap,
+                       drop_contained=drop_contained)
     elif algo == 'matrix':
-        algo = dna_assembly.greedy_scs_matrix
+        algo = partial(dna_assembly.greedy_scs_matrix, overlaps=overlaps, min_overlap=min_overlap,
+                       drop_contained=drop_contained)
+    elif algo == 'numba':
+        algo = partial(dna_assembly.greedy_scs_numba, overlaps=overlaps, min_overlap=min_overlap,
+                       drop_contained=drop_contained)
     elif algo == 'scs':
         algo = dna_assembly.scs
+    elif algo == 'debruijn':
+        algo = partial(assemble_debruijn, k=kmer)
     else:
         raise RuntimeError(f'Wrong algo value {algo}')
-
-    dna_seqs = parse(file)
-    one_dna = algo(dna_seqs)
-    rna_mrna_seqs = transcribe(one_dna)
-
-    amino_seqs = []
-    for rna_mrna_seq in rna_mrna_seqs:
-        amino_seqs += translate(rna_mrna_seq)
-
-    amino_seqs = [s for s in amino_seqs if len(s) >= 20]
-
-    if chrome:
-        proteins = blast.blast_website(amino_seqs, docker=False)
+    if components:
+        algo = partial(dna_assembly.assemble_components, assemble=algo, min_overlap=min_overlap, num_cpu=num_cpu)
+
+    dna_seqs = parse(file, packed=packed, cache_dir=cache_dir)
+    contigs = algo(dna_seqs)
+    if isinstance(contigs, str):  # SCS algorithms return one string
+        contigs = [contigs]
+
+    # proteins of the ORFs in the six frames of every contig, nested and duplicate proteins are searched once
+    orfs = [orf for contig in contigs for orf in find_orfs(contig, min_length=min_protein)]
+    representatives, _ = collapse_orfs(orfs)
+    print(f'{len(orfs)} ORFs, {len(representatives)} after collapsing nested and duplicate proteins.')
+    amino_seqs = [orf.protein for orf in representatives]
+
+    cache = None if no_blast_cache else BlastCache(blast_cache)  # consulted before remote searches
+    if protein_index is not None:
+        index = ProteinIndex.load(protein_index)
+        for amino_seq in amino_seqs:
+            print(index.identify(amino_seq))
+    elif chrome:
+        proteins = blast.blast_website(amino_seqs, docker=False, cache=cache)
         print(f'Found {len(proteins)}')
         print('Top 10:')
         for p in proteins[:10]:
             print(p)
     else:
         print('Warning: Chrome not used, might be slow.')
-        for amino_seq in amino_seqs:
-            print(request_blastp(amino_seq))
+        # batched BLAST jobs instead of one request per sequence
+        for protein in blast_proteins(amino_seqs, cache=cache):
+            print(protein)
 
 
 if __name__ == '__main__':
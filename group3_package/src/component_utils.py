@@ -0,0 +1,95 @@
+import numpy as np
+from numba import njit
+from typing import Dict, List
+from .scs_utils import calc_pairwise_overlaps
+
+"""
+Partitioning of reads into connected components of the overlap graph.
+
+Reads are nodes, there is an edge between two reads if they overlap by at least min_overlap
+(in any direction). Components are found with union-find (path halving, union by size).
+Reads of different components never overlap, so each component can be assembled on its own.
+"""
+
+
+@njit
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]  # path halving
+        i = parent[i]
+    return i
+
+
+@njit
+def connected_components(n: int, edges: np.ndarray) -> np.ndarray:
+    """
+    Connected components with union-find.
+
+    Parameters
+    ----------
+    n: int
+        Number of nodes.
+
+    edges: np.ndarray of int64, shape (n_edges, 2)
+        Node indexes.
+
+    Returns
+    -------
+    labels: np.ndarray of int64
+        Component label of each node, labels are 0..n_components - 1 in order of the first node.
+    """
+    parent = np.arange(n)
+    size = np.ones(n, dtype=np.int64)
+    for k in range(len(edges)):
+        root1 = _find(parent, edges[k, 0])
+        root2 = _find(parent, edges[k, 1])
+        if root1 == root2:
+            continue
+        if size[root1] < size[root2]:
+            root1, root2 = root2, root1
+        parent[root2] = root1
+        size[root1] += size[root2]
+
+    labels = np.full(n, -1, dtype=np.int64)
+    root_label = np.full(n, -1, dtype=np.int64)
+    n_components = 0
+    for i in range(n):
+        root = _find(parent, i)
+        if root_label[root] == -1:
+            root_label[root] = n_components
+            n_components += 1
+        labels[i] = root_label[root]
+    return labels
+
+
+def split_into_components(strings: List[str], min_overlap: int,
+                          overlaps: str = 'suffix_array') -> List[List[str]]:
+    """
+    Group strings by connected components of the overlap graph.
+
+    Parameters
+    ----------
+    strings: list of str
+        Input strings (reads), no duplicates.
+
+    min_overlap: int
+        Minimum overlap length for an edge.
+
+    overlaps: str, default='suffix_array'
+        Method for the pairwise overlap calculation, see scs_utils.calc_pairwise_overlaps.
+
+    Returns
+    -------
+    components: list of lists of str
+        Largest component first.
+    """
+    strings_dict: Dict[int, str] = dict(enumerate(strings))
+    overlap_array = np.array(calc_pairwise_overlaps(strings_dict, overlaps, min_overlap=min_overlap,
+                                                    desc='Overlap graph.'), dtype=np.int64).reshape(-1, 3)
+    edges = overlap_array[overlap_array[:, 2] >= min_overlap, :2]
+    labels = connected_components(len(strings), edges)
+
+    components = [[] for _ in range(labels.max(initial=-1) + 1)]
+    for label, s in zip(labels.tolist(), strings):
+        components[label].append(s)
+    return sorted(components, key=len, reverse=True)
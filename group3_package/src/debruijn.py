@@ -0,0 +1,255 @@
+import numpy as np
+from numba import njit
+from typing import List, Tuple, Union
+from .read_store import ReadStore, ENCODE_TABLE, DECODE_TABLE
+
+"""
+De Bruijn graph assembly.
+
+k-mers are 2-bit packed into int64 (A=0, C=1, G=2, T=3, k <= 31) and counted in an
+open addressing hash table made of numpy arrays, so memory per distinct k-mer is constant
+(no Python object per k-mer). The table grows with the number of distinct k-mers, not with the coverage. Nodes of the graph are (k-1)-mers, edges are k-mers.
+Non-branching paths (unitigs) are compacted into contigs.
+Reads are used as given (only the forward strand).
+"""
+
+MAX_K = 31
+EMPTY = -1
+INITIAL_KEYS = 1 << 16  # distinct k-mers the counting table is sized for at first
+
+
+def encode_reads(reads: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads to one array of 2-bit codes (4 for bases other than ACGT).
+
+    Returns
+    -------
+    codes: np.ndarray of uint8
+        Codes of all reads concatenated.
+
+    offsets: np.ndarray of int64
+        Read i is codes[offsets[i]: offsets[i + 1]].
+    """
+    lengths = np.array([len(r) for r in reads], dtype=np.int64)
+    offsets = np.zeros(len(reads) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    codes = ENCODE_TABLE[np.frombuffer(''.join(reads).encode('ascii'), dtype=np.uint8)]
+    return codes, offsets
+
+
+def decode(codes: np.ndarray) -> str:
+    """2-bit codes to a DNA string."""
+    return DECODE_TABLE[codes].tobytes().decode('ascii')
+
+
+@njit
+def _find_slot(keys, key):
+    """Slot of the key or of the empty slot where it should be inserted (linear probing)."""
+    mask = len(keys) - 1
+    # Fibonacci hashing
+    slot = np.int64((np.uint64(key) * np.uint64(11400714819323198485)) >> np.uint64(32)) & mask
+    while keys[slot] != EMPTY and keys[slot] != key:
+        slot = (slot + 1) & mask
+    return slot
+
+
+@njit
+def _lookup(keys, key):
+    """Slot of the key, -1 if the key is not in the table."""
+    slot = _find_slot(keys, key)
+    if keys[slot] == EMPTY:
+        return -1
+    return slot
+
+
+def _table_capacity(n_keys: int) -> int:
+    """Power of 2, load factor <= 0.5."""
+    return 1 << int(np.ceil(np.log2(2 * n_keys + 1)))
+
+
+@njit
+def _build_table(kmers, capacity):
+    """Hash table with the given distinct k-mers."""
+    keys = np.full(capacity, EMPTY, dtype=np.int64)
+    for kmer in kmers:
+        keys[_find_slot(keys, kmer)] = kmer
+    return keys
+
+
+@njit
+def _grow(keys, counts):
+    """Table of twice the capacity with the same k-mers and counts."""
+    new_keys = np.full(2 * len(keys), EMPTY, dtype=np.int64)
+    new_counts = np.zeros(2 * len(keys), dtype=np.int32)
+    for slot in range(len(keys)):
+        if keys[slot] != EMPTY:
+            new_slot = _find_slot(new_keys, keys[slot])
+            new_keys[new_slot] = keys[slot]
+            new_counts[new_slot] = counts[slot]
+    return new_keys, new_counts
+
+
+@njit
+def _count_kmers(codes, offsets, k, capacity):
+    """
+    Count all k-mers (not containing code 4) of all reads in a hash table.
+    The table starts with the given capacity and is doubled when the load factor exceeds 0.5.
+    """
+    keys = np.full(capacity, EMPTY, dtype=np.int64)
+    counts = np.zeros(capacity, dtype=np.int32)
+    mask = (1 << (2 * k)) - 1
+    n_distinct = 0
+    for r in range(len(offsets) - 1):
+        kmer = 0
+        valid = 0  # number of valid bases at the end of the current window
+        for pos in range(offsets[r], offsets[r + 1]):
+            code = codes[pos]
+            if code > 3:
+                valid = 0
+                kmer = 0
+                continue
+            kmer = ((kmer << 2) | code) & mask
+            valid += 1
+            if valid >= k:
+                slot = _find_slot(keys, kmer)
+                if keys[slot] == EMPTY:
+                    if 2 * (n_distinct + 1) > len(keys):
+                        keys, counts = _grow(keys, counts)
+                        slot = _find_slot(keys, kmer)
+                    keys[slot] = kmer
+                    n_distinct += 1
+                counts[slot] += 1
+    return keys, counts, n_distinct
+
+
+@njit
+def _successor(keys, kmer, k):
+    """Slot of the only successor k-mer, -1 if there are 0 or more than 1."""
+    mask = (1 << (2 * k)) - 1
+    found = -1
+    for code in range(4):
+        slot = _lookup(keys, ((kmer << 2) | code) & mask)
+        if slot != -1:
+            if found != -1:
+                return -1
+            found = slot
+    return found
+
+
+@njit
+def _n_predecessors(keys, kmer, k):
+    n = 0
+    shift = 2 * (k - 1)
+    for code in range(4):
+        if _lookup(keys, (kmer >> 2) | (code << shift)) != -1:
+            n += 1
+    return n
+
+
+@njit
+def _compact_unitigs(keys, k):
+    """
+    Walk non-branching paths of the graph.
+
+    An edge x -> y is inside a unitig if x has only one successor (y) and y has only one predecessor (x).
+
+    Returns
+    -------
+    contig_codes: np.ndarray of uint8
+        Codes of all contigs concatenated.
+
+    contig_offsets: np.ndarray of int64
+        Contig i is contig_codes[contig_offsets[i]: contig_offsets[i + 1]].
+    """
+    capacity = len(keys)
+    # slot of the next k-mer in the unitig, -1 if the unitig ends here
+    next_slot = np.full(capacity, -1, dtype=np.int64)
+    has_prev = np.zeros(capacity, dtype=np.bool_)
+    n_kmers = 0
+    for slot in range(capacity):
+        if keys[slot] == EMPTY:
+            continue
+        n_kmers += 1
+        succ = _successor(keys, keys[slot], k)
+        if succ != -1 and _n_predecessors(keys, keys[succ], k) == 1:
+            next_slot[slot] = succ
+            has_prev[succ] = True
+
+    visited = np.zeros(capacity, dtype=np.bool_)
+    contig_codes = np.empty(n_kmers * k, dtype=np.uint8)
+    contig_offsets = np.zeros(n_kmers + 1, dtype=np.int64)
+    n_contigs = 0
+    pos = 0
+    # first pass: unitigs with a start, second pass: remaining cycles
+    for cycles in range(2):
+        for start in range(capacity):
+            if keys[start] == EMPTY or visited[start] or (has_prev[start] and cycles == 0):
+                continue
+            kmer = keys[start]
+            for i in range(k):
+                contig_codes[pos] = (kmer >> (2 * (k - 1 - i))) & 3
+                pos += 1
+            visited[start] = True
+            slot = next_slot[start]
+            while slot != -1 and not visited[slot]:
+                contig_codes[pos] = keys[slot] & 3
+                pos += 1
+                visited[slot] = True
+                slot = next_slot[slot]
+            n_contigs += 1
+            contig_offsets[n_contigs] = pos
+    return contig_codes[:pos], contig_offsets[:n_contigs + 1]
+
+
+def count_kmers(codes: np.ndarray, offsets: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count k-mers in an integer hash table.
+
+    Returns
+    -------
+    keys: np.ndarray of int64
+        Hash table slots: 2-bit packed k-mer or -1 (empty slot).
+
+    counts: np.ndarray of int32
+        Number of occurrences of the k-mer in each slot.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f'k must be between 1 and {MAX_K}, got {k}')
+    # distinct k-mers are far fewer than k-mers with high coverage: the table starts small and grows
+    n_max = max(len(codes) - (len(offsets) - 1) * (k - 1), 1)
+    keys, counts, _ = _count_kmers(codes, offsets, k, _table_capacity(min(n_max, INITIAL_KEYS, 4 ** k)))
+    return keys, counts
+
+
+def assemble_debruijn(reads: Union[List[str], ReadStore], k: int = 31, min_count: int = 1) -> List[str]:
+    """
+    De Bruijn graph assembly.
+
+    Parameters
+    ----------
+    reads: list of str or ReadStore
+        Input DNA reads (packed reads are used without converting them to strings).
+
+    k: int, default=31
+        k-mer length (edge of the graph), at most 31.
+
+    min_count: int, default=1
+        k-mers seen less often are treated as sequencing errors and removed.
+
+    Returns
+    -------
+    contigs: list of str
+        Unitigs, the longest first.
+    """
+    if isinstance(reads, ReadStore):
+        codes, offsets = reads.to_codes()
+    else:
+        codes, offsets = encode_reads(reads)
+    keys, counts = count_kmers(codes, offsets, k)
+    if min_count > 1:
+        # rebuild instead of removing in place, removal would break linear probing chains
+        survivors = keys[(keys != EMPTY) & (counts >= min_count)]
+        keys = _build_table(survivors, _table_capacity(len(survivors)))
+    contig_codes, contig_offsets = _compact_unitigs(keys, k)
+    contigs = [decode(contig_codes[contig_offsets[i]:contig_offsets[i + 1]]) for i in range(len(contig_offsets) - 1)]
+    return sorted(contigs, key=len, reverse=True)
@@ -0,0 +1,191 @@
+import heapq
+import numpy as np
+from numba import njit
+
+"""
+Greedy SCS merge loop compiled with numba (nopython mode).
+
+Reads are uint8 arrays (ASCII codes). Contigs are read layouts (see layout_utils.ContigLayouts)
+with their heads and tails in 2d arrays, a merged contig reuses the slot of its first contig.
+Overlaps are kept in a heap of (-overlap_len, slot_1, slot_2, version_1, version_2): an item is
+stale if one of its slots was merged since it was pushed (version changed or slot is inactive).
+"""
+
+
+@njit
+def _overlap(a, a_len, b, b_len, min_length):
+    """Longest suffix of a[:a_len] that is a prefix of b[:b_len], 0 if shorter than min_length."""
+    for k in range(min(a_len, b_len), min_length - 1, -1):
+        start = a_len - k
+        match = True
+        for i in range(k):
+            if a[start + i] != b[i]:
+                match = False
+                break
+        if match:
+            return k
+    return 0
+
+
+@njit
+def naive_overlaps(text, offsets, min_length):
+    """
+    Overlap of every pair of reads.
+
+    Returns
+    -------
+    overlaps: np.ndarray of int64, shape (n_overlaps, 3)
+        Rows (read_index_1, read_index_2, overlap_length), only pairs with overlap > 0.
+    """
+    n = len(offsets) - 1
+    out = np.empty((max(16, n), 3), dtype=np.int64)
+    n_out = 0
+    for i in range(n):
+        a = text[offsets[i]:offsets[i + 1]]
+        for j in range(n):
+            if i == j:
+                continue
+            b = text[offsets[j]:offsets[j + 1]]
+            ov = _overlap(a, len(a), b, len(b), min_length)
+            if ov > 0:
+                if n_out == len(out):
+                    new_out = np.empty((2 * len(out), 3), dtype=np.int64)
+                    new_out[:n_out] = out[:n_out]
+                    out = new_out
+                out[n_out, 0] = i
+                out[n_out, 1] = j
+                out[n_out, 2] = ov
+                n_out += 1
+    return out[:n_out]
+
+
+@njit
+def _merge_windows(heads, head_len, tails, tail_len, lengths, a, b, ov, window):
+    """Head and tail of contig a + contig b[ov:], written to slot a."""
+    length_a = lengths[a]
+    if length_a < window:
+        # head_a is the whole contig a, append b[ov:] (it is inside head_b)
+        n_add = min(window - length_a, head_len[b] - ov)
+        for i in range(max(n_add, 0)):
+            heads[a, length_a + i] = heads[b, ov + i]
+        head_len[a] = length_a + max(n_add, 0)
+
+    rest_b = lengths[b] - ov
+    if rest_b >= window:
+        tails[a, :tail_len[b]] = tails[b, :tail_len[b]]
+        tail_len[a] = tail_len[b]
+    else:
+        # last window characters of tail_a + b[ov:]
+        new_tail = np.empty(tail_len[a] + rest_b, dtype=tails.dtype)
+        new_tail[:tail_len[a]] = tails[a, :tail_len[a]]
+        new_tail[tail_len[a]:] = tails[b, tail_len[b] - rest_b:tail_len[b]]
+        n_keep = min(len(new_tail), window)
+        tails[a, :n_keep] = new_tail[len(new_tail) - n_keep:]
+        tail_len[a] = n_keep
+
+
+@njit
+def greedy_merge(text, offsets, overlaps, min_length):
+    """
+    Greedy SCS on reads text[offsets[i]: offsets[i + 1]] with the given initial overlaps.
+
+    Parameters
+    ----------
+    text, offsets: np.ndarray
+        Reads concatenated (uint8) and their offsets (int64).
+
+    overlaps: np.ndarray of int64, shape (n_overlaps, 3)
+        Initial overlaps (read_index_1, read_index_2, overlap_length), missing pairs have overlap 0.
+
+    min_length: int
+        Minimum overlap length.
+
+    Returns
+    -------
+    superstring: np.ndarray of uint8
+        Contigs concatenated (in slot order).
+    """
+    n = len(offsets) - 1
+    window = 0
+    for i in range(n):
+        window = max(window, offsets[i + 1] - offsets[i])
+
+    # layouts
+    first = np.arange(n)
+    last = np.arange(n)
+    lengths = np.empty(n, dtype=np.int64)
+    last_offset = np.zeros(n, dtype=np.int64)
+    next_read = np.full(n, -1, dtype=np.int64)
+    shift = np.zeros(n, dtype=np.int64)
+    heads = np.empty((n, window), dtype=np.uint8)
+    tails = np.empty((n, window), dtype=np.uint8)
+    head_len = np.empty(n, dtype=np.int64)
+    tail_len = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        read_len = offsets[i + 1] - offsets[i]
+        lengths[i] = read_len
+        heads[i, :read_len] = text[offsets[i]:offsets[i + 1]]
+        tails[i, :read_len] = text[offsets[i]:offsets[i + 1]]
+        head_len[i] = read_len
+        tail_len[i] = read_len
+
+    active = np.ones(n, dtype=np.bool_)
+    version = np.zeros(n, dtype=np.int64)
+
+    heap = [(-overlaps[k, 2], overlaps[k, 0], overlaps[k, 1], 0, 0) for k in range(len(overlaps))]
+    heapq.heapify(heap)
+
+    n_active = n
+    while n_active > 1 and len(heap) > 0:
+        neg_ov, a, b, version_a, version_b = heapq.heappop(heap)
+        if not (active[a] and active[b] and version[a] == version_a and version[b] == version_b):
+            continue
+        ov = -neg_ov
+
+        # contig a + contig b[ov:] -> slot a, slot b is freed
+        next_read[last[a]] = first[b]
+        shift[first[b]] = lengths[a] - ov - last_offset[a]
+        _merge_windows(heads, head_len, tails, tail_len, lengths, a, b, ov, window)
+        last_offset[a] = lengths[a] - ov + last_offset[b]
+        lengths[a] = lengths[a] - ov + lengths[b]
+        last[a] = last[b]
+        active[b] = False
+        version[a] += 1
+        n_active -= 1
+
+        # overlaps of the new contig with the others
+        for k in range(n):
+            if not active[k] or k == a:
+                continue
+            ov1 = _overlap(tails[a], tail_len[a], heads[k], head_len[k], min_length)
+            if ov1 > 0:
+                heapq.heappush(heap, (-ov1, a, k, version[a], version[k]))
+            ov2 = _overlap(tails[k], tail_len[k], heads[a], head_len[a], min_length)
+            if ov2 > 0:
+                heapq.heappush(heap, (-ov2, k, a, version[k], version[a]))
+
+    # contig sequences from layouts
+    total = 0
+    for i in range(n):
+        if active[i]:
+            total += lengths[i]
+    out = np.empty(total, dtype=np.uint8)
+    pos = 0
+    for i in range(n):
+        if not active[i]:
+            continue
+        read = first[i]
+        offset = 0
+        covered = 0  # end of the contig produced so far
+        while True:
+            read_end = offset + offsets[read + 1] - offsets[read]
+            if read_end > covered:
+                n_new = read_end - covered
+                out[pos:pos + n_new] = text[offsets[read + 1] - n_new:offsets[read + 1]]
+                pos += n_new
+                covered = read_end
+            if read == last[i]:
+                break
+            read = next_read[read]
+            offset += shift[read]
+    return out[:pos]
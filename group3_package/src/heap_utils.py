@@ -78,9 +78,14 @@ def heappush(heap, item):
     siftdown_max(heap, 0, len(heap) - 1)
 
 
+item_type = nb.types.UniTuple(nb.int64, 3)
+pair_type = nb.types.UniTuple(nb.int64, 2)
+
 spec_maxheap = [
-    ('heap', nb.types.ListType(nb.types.UniTuple(nb.int64, 3))),
-    ('deleted_items', nb.types.DictType(nb.types.UniTuple(nb.types.int64, 2), nb.types.boolean))
+    ('heap', nb.types.ListType(item_type)),
+    ('deleted_items', nb.types.DictType(pair_type, nb.types.boolean)),
+    ('n_dead', nb.int64),
+    ('compaction_fraction', nb.float64)
 ]
 
 
@@ -96,35 +101,78 @@ class MaxHeap:
     deleted_items: Dict
         Empty dict for storing deleted items.
 
+    compaction_fraction: float
+        The heap is compacted when deleted items make up more than this fraction of it.
+
     Description
     -----------
     Lazy deletion implemented: an item to delete is only marked deleted.
     When an element is popped, it is checked, whether it is "deleted", if yes, pop operation
     is further called until a non-deleted element is returned.
+    Only items that are in the heap should be deleted.
+
+    Deleted items still occupy the heap (n_dead counts them). Once there are too many of them,
+    the heap is rebuilt from the live items and the deleted items are forgotten.
     """
 
-    def __init__(self, input_list, deleted_items):
+    def __init__(self, input_list, deleted_items, compaction_fraction):
         self.heap = input_list
         heapify_max(self.heap)
         self.deleted_items = deleted_items
+        self.n_dead = 0
+        self.compaction_fraction = compaction_fraction
 
     def pop_max(self) -> Tuple[int, int, int]:
         while True:
             el = heappop_max(self.heap)
             if (el[0], el[1]) not in self.deleted_items:
                 break
+            self._forget((el[0], el[1]))
         return el
 
     def delete(self, item: Tuple[int, int]) -> 'MaxHeap':
-        self.deleted_items[item] = True
+        if item not in self.deleted_items:
+            self.deleted_items[item] = True
+            self.n_dead += 1
+            if self.n_dead > self.compaction_fraction * len(self.heap):
+                self.compact()
         return self
 
     def push(self, item: Tuple[int, int, int]) -> 'MaxHeap':
         heappush(self.heap, item)
         return self
 
+    def is_empty(self) -> bool:
+        # drop deleted items from the top, so that pop_max can be called if False
+        while len(self.heap) > 0:
+            el = self.heap[0]
+            if (el[0], el[1]) not in self.deleted_items:
+                return False
+            heappop_max(self.heap)
+            self._forget((el[0], el[1]))
+        return True
+
+    def n_live(self) -> int:
+        return len(self.heap) - self.n_dead
+
+    def compact(self):
+        """Rebuild the heap without deleted items."""
+        live = nb.typed.List.empty_list(item_type)
+        for el in self.heap:
+            if (el[0], el[1]) not in self.deleted_items:
+                live.append(el)
+        heapify_max(live)
+        self.heap = live
+        self.deleted_items.clear()
+        self.n_dead = 0
+
+    def _forget(self, item):
+        # a deleted item left the heap
+        del self.deleted_items[item]
+        self.n_dead -= 1
 
-def create_max_heap(item_list: List[Tuple[int, int, int]]) -> MaxHeap:
+
+def create_max_heap(item_list: List[Tuple[int, int, int]], compaction_fraction: float = 0.5) -> MaxHeap:
     """
     Create a max heap.
 
@@ -133,12 +181,163 @@ def create_max_heap(item_list: List[Tuple[int, int, int]]) -> MaxHeap:
     item_list: list of tuples of str
         Each item is a tuple of 3 int: (str_id_1, str_id_2, overlap_length).
 
+    compaction_fraction: float, default=0.5
+        Rebuild the heap when deleted items are more than this fraction of it.
+
+    """
+    # to store deleted items
+    deleted_items = nb.typed.Dict.empty(
+        key_type=nb.types.UniTuple(nb.types.int64, 2),
+        value_type=nb.types.boolean)
+
+    if len(item_list) > 0:
+        numba_item_list = nb.typed.List(item_list)
+    else:
+        numba_item_list = nb.typed.List.empty_list(item_type)
+
+    return MaxHeap(numba_item_list, deleted_items, compaction_fraction)
+
+
+spec_bucket_queue = [
+    ('buckets', nb.types.ListType(nb.types.ListType(pair_type))),
+    ('top', nb.int64),
+    ('size', nb.int64),
+    ('deleted_items', nb.types.DictType(pair_type, nb.types.boolean)),
+    ('n_dead', nb.int64),
+    ('compaction_fraction', nb.float64)
+]
+
+
+@jitclass(spec_bucket_queue)
+class BucketQueue:
+    """
+    Bucket priority queue with the same interface as MaxHeap.
+
+    buckets: list of lists of tuples of int
+        buckets[overlap_length] contains items (str_id_1, str_id_2) with this overlap length.
+
+    size: int
+        Number of items in all buckets.
+
+    deleted_items: Dict
+        Empty dict for storing deleted items.
+
+    compaction_fraction: float
+        The buckets are compacted when deleted items make up more than this fraction of them.
+
+    Description
+    -----------
+    Overlap lengths are small non-negative integers, so there is one bucket per length
+    and a pointer to the highest non-empty bucket: push is O(1), pop_max is amortized O(1)
+    (the pointer only moves down, except when a larger overlap is pushed).
+    Lazy deletion and compaction are the same as in MaxHeap.
+    """
+
+    def __init__(self, buckets, size, deleted_items, compaction_fraction):
+        self.buckets = buckets
+        self.top = len(buckets) - 1
+        self.size = size
+        self.deleted_items = deleted_items
+        self.n_dead = 0
+        self.compaction_fraction = compaction_fraction
+
+    def _move_top(self):
+        while self.top >= 0 and len(self.buckets[self.top]) == 0:
+            self.top -= 1
+
+    def pop_max(self) -> Tuple[int, int, int]:
+        while True:
+            self._move_top()
+            if self.top < 0:
+                raise IndexError('pop from empty queue')
+            el = self.buckets[self.top].pop()
+            self.size -= 1
+            if el not in self.deleted_items:
+                break
+            self._forget(el)
+        return el[0], el[1], self.top
+
+    def delete(self, item: Tuple[int, int]) -> 'BucketQueue':
+        if item not in self.deleted_items:
+            self.deleted_items[item] = True
+            self.n_dead += 1
+            if self.n_dead > self.compaction_fraction * self.size:
+                self.compact()
+        return self
+
+    def push(self, item: Tuple[int, int, int]) -> 'BucketQueue':
+        overlap_len = item[2]
+        while len(self.buckets) <= overlap_len:
+            self.buckets.append(nb.typed.List.empty_list(pair_type))
+        self.buckets[overlap_len].append((item[0], item[1]))
+        self.size += 1
+        if overlap_len > self.top:
+            self.top = overlap_len
+        return self
+
+    def is_empty(self) -> bool:
+        while True:
+            self._move_top()
+            if self.top < 0:
+                return True
+            bucket = self.buckets[self.top]
+            el = bucket[len(bucket) - 1]
+            if el not in self.deleted_items:
+                return False
+            bucket.pop()
+            self.size -= 1
+            self._forget(el)
+
+    def n_live(self) -> int:
+        return self.size - self.n_dead
+
+    def compact(self):
+        """Rebuild the buckets without deleted items."""
+        for i in range(len(self.buckets)):
+            live = nb.typed.List.empty_list(pair_type)
+            for el in self.buckets[i]:
+                if el not in self.deleted_items:
+                    live.append(el)
+            self.buckets[i] = live
+        self.size -= self.n_dead
+        self.deleted_items.clear()
+        self.n_dead = 0
+
+    def _forget(self, item):
+        # a deleted item left the queue
+        del self.deleted_items[item]
+        self.n_dead -= 1
+
+
+@njit
+def _fill_buckets(buckets, items):
+    for i in range(len(items)):
+        buckets[items[i, 2]].append((items[i, 0], items[i, 1]))
+
+
+def create_bucket_queue(item_list: List[Tuple[int, int, int]], compaction_fraction: float = 0.5) -> BucketQueue:
+    """
+    Create a bucket queue.
+
+    Parameters
+    ----------
+    item_list: list of tuples of str
+        Each item is a tuple of 3 int: (str_id_1, str_id_2, overlap_length).
+
+    compaction_fraction: float, default=0.5
+        Rebuild the buckets when deleted items are more than this fraction of them.
+
     """
     # to store deleted items
     deleted_items = nb.typed.Dict.empty(
         key_type=nb.types.UniTuple(nb.types.int64, 2),
         value_type=nb.types.boolean)
 
-    numba_item_list = nb.typed.List(item_list)
+    items = np.array(item_list, dtype=np.int64).reshape(-1, 3)
+    n_buckets = int(items[:, 2].max()) + 1 if len(items) > 0 else 0
+    buckets = nb.typed.List.empty_list(nb.types.ListType(pair_type))
+    for _ in range(n_buckets):
+        buckets.append(nb.typed.List.empty_list(pair_type))
+    _fill_buckets(buckets, items)
 
-    return MaxHeap(numba_item_list, deleted_items)
+    return BucketQueue(buckets, len(items), deleted_items, compaction_fraction)
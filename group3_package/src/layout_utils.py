@@ -0,0 +1,102 @@
+from typing import Dict, Iterator, List, Tuple
+
+"""
+Contigs represented as layouts of reads.
+
+A contig is a chain of reads with offsets, only its first and last `window` characters
+(head and tail) are stored as strings. The sequence is produced once, at the end of the assembly.
+Merging two contigs is O(window), independent of the contig lengths.
+"""
+
+
+class ContigLayouts:
+    """
+    Layouts of all contigs of an assembly.
+
+    reads: dict of (int: str)
+        Key: read id, value: read. Each read is a contig at the beginning, with the same id.
+
+    window: int, default=None
+        Length of the stored head and tail. Default: the maximum read length.
+        Overlaps between contigs are found on heads and tails, so they are at most window long.
+
+    Description
+    -----------
+    next_read[read_id]: next read in the same contig
+    shift[read_id]: offset of the read minus the offset of the previous read in the contig
+    contigs[contig_id]: (first_read, last_read, length, offset of last_read, head, tail)
+    """
+
+    def __init__(self, reads: Dict[int, str], window: int = None):
+        self.reads = reads
+        self.window = window if window is not None else max((len(s) for s in reads.values()), default=0)
+        self.next_read = {}
+        self.shift = {}
+        self.contigs = {id_: (id_, id_, len(s), 0, s[:self.window], s[max(len(s) - self.window, 0):])
+                        for id_, s in reads.items()}
+
+    def __len__(self) -> int:
+        return len(self.contigs)
+
+    def state(self) -> tuple:
+        """Layouts without the reads (f.e. for a checkpoint), see from_state."""
+        return self.window, self.next_read, self.shift, self.contigs
+
+    @classmethod
+    def from_state(cls, reads: Dict[int, str], state: tuple) -> 'ContigLayouts':
+        layouts = cls.__new__(cls)
+        layouts.reads = reads
+        layouts.window, layouts.next_read, layouts.shift, layouts.contigs = state
+        return layouts
+
+    def ids(self) -> List[int]:
+        return list(self.contigs.keys())
+
+    def head(self, contig_id: int) -> str:
+        return self.contigs[contig_id][4]
+
+    def tail(self, contig_id: int) -> str:
+        return self.contigs[contig_id][5]
+
+    def merge(self, id1: int, id2: int, overlap_len: int, new_id: int):
+        """
+        Replace contigs id1 and id2 with contig new_id = contig1 + contig2[overlap_len:].
+        """
+        first1, last1, length1, last_offset1, head1, tail1 = self.contigs.pop(id1)
+        first2, last2, length2, last_offset2, head2, tail2 = self.contigs.pop(id2)
+
+        start2 = length1 - overlap_len  # offset of contig 2 in the new contig
+        self.next_read[last1] = first2
+        self.shift[first2] = start2 - last_offset1
+
+        # contig2[overlap_len:] is inside head2 / tail2 when it is needed
+        head = head1 if length1 >= self.window else (head1 + head2[overlap_len:])[:self.window]
+        rest2_len = length2 - overlap_len
+        if rest2_len >= self.window:
+            tail = tail2
+        else:
+            tail = tail1 + tail2[len(tail2) - rest2_len:]
+            tail = tail[max(len(tail) - self.window, 0):]
+
+        self.contigs[new_id] = (first1, last2, start2 + length2, start2 + last_offset2, head, tail)
+
+    def layout(self, contig_id: int) -> Iterator[Tuple[int, int]]:
+        """Reads of the contig and their offsets: (read_id, offset)."""
+        read_id, last_read = self.contigs[contig_id][:2]
+        offset = 0
+        while True:
+            yield read_id, offset
+            if read_id == last_read:
+                break
+            read_id = self.next_read[read_id]
+            offset += self.shift[read_id]
+
+    def sequence(self, contig_id: int) -> str:
+        parts = []
+        covered = 0  # end of the sequence produced so far
+        for read_id, offset in self.layout(contig_id):
+            read = self.reads[read_id]
+            if offset + len(read) > covered:
+                parts.append(read[covered - offset:])
+                covered = offset + len(read)
+        return ''.join(parts)
@@ -0,0 +1,184 @@
+import numpy as np
+from typing import List, NamedTuple, Tuple
+from .protein_index import ProteinIndex, SCORES, encode_protein
+
+"""
+Open reading frames (ORFs) in all six frames of a DNA (or RNA) sequence.
+
+Each frame is translated once: bases are 2-bit codes (T/U=0, C=1, A=2, G=3), a codon is the
+integer 16 * b1 + 4 * b2 + b3 and is translated with a 64 entry lookup table (NumPy, vectorized).
+Every in-frame AUG starts an ORF which ends before the next in-frame stop codon (or at the end of the frame),
+so ORFs starting at nested AUGs share the stop codon and their proteins are suffixes of the same translation.
+Before a protein search, collapse_orfs reduces the ORFs to one representative per group of nested
+or (nearly) identical proteins.
+"""
+
+# standard genetic code, codons in TCAG order (TTT, TTC, TTA, TTG, TCT, ...), '*': stop, 'X': codon with unknown bases
+CODON_TABLE = np.frombuffer(b'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGGX', dtype=np.uint8)
+UNKNOWN_CODON = 64
+START_CODON = 2 * 16 + 0 * 4 + 3  # ATG
+STOP = ord('*')
+
+UNKNOWN_BASE = 4
+BASE_CODES = np.full(256, UNKNOWN_BASE, dtype=np.uint8)
+for _code, _bases in enumerate(['TtUu', 'Cc', 'Aa', 'Gg']):
+    for _base in _bases:
+        BASE_CODES[ord(_base)] = _code
+
+
+class ORF(NamedTuple):
+    """
+    protein: str
+        Amino acids from the start codon (M) to the last codon before the stop codon. The M is kept
+        (translation.translate drops it), so proteins match database proteins from their first residue.
+
+    strand: str
+        '+': the given sequence, '-': its reverse complement.
+
+    frame: int
+        0, 1 or 2, offset of the first codon on the strand.
+
+    start, end: int
+        Coding region in coordinates of the given sequence (0-based, end exclusive, stop codon not included),
+        start < end also on the '-' strand.
+
+    has_stop: bool
+        False if the ORF runs to the end of the sequence.
+    """
+    protein: str
+    strand: str
+    frame: int
+    start: int
+    end: int
+    has_stop: bool
+
+
+def codon_indexes(codes: np.ndarray) -> np.ndarray:
+    """Codon index (0..63, UNKNOWN_CODON if a base is unknown) of every complete codon of the base codes."""
+    codes = codes[:len(codes) // 3 * 3].reshape(-1, 3).astype(np.int64)
+    indexes = 16 * codes[:, 0] + 4 * codes[:, 1] + codes[:, 2]
+    indexes[(codes == UNKNOWN_BASE).any(axis=1)] = UNKNOWN_CODON
+    return indexes
+
+
+def _frame_orfs(codes: np.ndarray, strand: str, frame: int, seq_len: int, min_length: int) -> List[ORF]:
+    indexes = codon_indexes(codes[frame:])
+    amino_acids = CODON_TABLE[indexes]
+    protein = amino_acids.tobytes().decode('ascii')
+
+    starts = np.flatnonzero(indexes == START_CODON)
+    stops = np.flatnonzero(amino_acids == STOP)
+    # first stop codon after each start codon, len(indexes): no stop
+    ends = np.append(stops, len(indexes))[np.searchsorted(stops, starts)]
+    keep = ends - starts >= min_length
+    orfs = []
+    for start, end in zip(starts[keep].tolist(), ends[keep].tolist()):
+        nt_start, nt_end = frame + 3 * start, frame + 3 * end
+        if strand == '-':
+            nt_start, nt_end = seq_len - nt_end, seq_len - nt_start
+        orfs.append(ORF(protein[start:end], strand, frame, nt_start, nt_end, end < len(indexes)))
+    return orfs
+
+
+def find_orfs(seq: str, min_length: int = 1, strands: str = '+-') -> List[ORF]:
+    """
+    ORFs of the six frames of a sequence.
+
+    Parameters
+    ----------
+    seq: str
+        DNA or RNA sequence (T and U are the same base, other characters are unknown bases).
+
+    min_length: int, default=1
+        Minimum protein length (amino acids, including the start M).
+
+    strands: str, default='+-'
+        '+': frames of the given sequence, '-': frames of its reverse complement.
+
+    Returns
+    -------
+    orfs: list of ORF
+        Ordered by strand, frame and start codon position on the strand.
+    """
+    codes = BASE_CODES[np.frombuffer(seq.encode('ascii'), dtype=np.uint8)]
+    orfs = []
+    for strand in strands:
+        if strand == '+':
+            strand_codes = codes
+        elif strand == '-':
+            strand_codes = codes[::-1] ^ 2  # complement: T <-> A, C <-> G
+            strand_codes[strand_codes > 3] = UNKNOWN_BASE
+        else:
+            raise RuntimeError(f'Wrong strands value {strands}')
+        for frame in range(3):
+            orfs += _frame_orfs(strand_codes, strand, frame, len(seq), min_length)
+    return orfs
+
+
+def _collapse_suffixes(proteins: List[str]) -> List[int]:
+    """
+    Index of the representative of every protein: a longer protein ending with it (nested ORF, same stop codon)
+    or itself. Reversed proteins are sorted, a reversed protein is a prefix of another one if and only if
+    it is a prefix of the next one in sorted order.
+    """
+    reversed_proteins = [p[::-1] for p in proteins]
+    order = sorted(range(len(proteins)), key=lambda i: (reversed_proteins[i], -i))
+    representative = list(range(len(proteins)))
+    for pos in range(len(order) - 2, -1, -1):
+        i, j = order[pos], order[pos + 1]
+        if reversed_proteins[j].startswith(reversed_proteins[i]):
+            representative[i] = representative[j]
+    return representative
+
+
+def collapse_orfs(orfs: List[ORF], min_similarity: float = 0.9, k: int = 3) -> Tuple[List[ORF], List[List[int]]]:
+    """
+    Reduce ORFs to representatives for a protein search.
+
+    1. Nested ORFs (the protein is a suffix of a longer protein) and exact duplicates (f.e. from several
+       contigs) are represented by the longest protein.
+    2. Near duplicates: representatives are clustered greedily, longest first. A protein joins the cluster of
+       a longer one if their best ungapped alignment (see protein_index.ProteinIndex) scores at least
+       min_similarity of its own BLOSUM62 self score. min_similarity > 1: no near-duplicate clustering.
+
+    Parameters
+    ----------
+    orfs: list of ORF
+
+    min_similarity: float, default=0.9
+
+    k: int, default=3
+        k-mer length of the seeds.
+
+    Returns
+    -------
+    representatives: list of ORF
+        Longest first.
+
+    members: list of lists of int
+        For each representative, indexes (in orfs) of all ORFs it represents (including itself).
+    """
+    proteins = [orf.protein for orf in orfs]
+    representative = _collapse_suffixes(proteins)
+    heads = sorted(set(representative), key=lambda i: (-len(proteins[i]), i))
+
+    cluster = {i: i for i in heads}
+    if min_similarity <= 1 and len(heads) > 1:
+        index = ProteinIndex.build([(str(i), proteins[i]) for i in heads], k=k)
+        position = {i: pos for pos, i in enumerate(heads)}
+        for i in heads:
+            if cluster[i] != i:  # already in the cluster of a longer protein
+                continue
+            for hit in index.search(proteins[i], max_hits=len(heads), min_seeds=1):
+                j = int(hit.name)
+                # only heads after i (not longer and not processed yet, so without members of their own)
+                if cluster[j] != j or position[j] <= position[i]:
+                    continue
+                self_score = SCORES[encode_protein(proteins[j]), encode_protein(proteins[j])].sum()
+                if hit.score >= min_similarity * self_score:
+                    cluster[j] = i
+
+    members = {i: [] for i in heads if cluster[i] == i}
+    for orf_index, head in enumerate(representative):
+        members[cluster[head]].append(orf_index)
+    return [orfs[i] for i in members], list(members.values())
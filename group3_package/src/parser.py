@@ -1,22 +1,164 @@
-import os
+import gzip
+from typing import BinaryIO, Iterator, Tuple
+from .cache_utils import DiskCache, file_digest
+from .read_store import ReadStore
 
+"""
+Streaming FASTA/FASTQ parser.
 
-def parse(path):
-    """Open and return given fastq or fasta file
-    :param
-    Input: path to fastq or/fasta file
-    Output: list of sequences"""
+Files are read in fixed-size chunks, records are yielded one by one, so memory is bounded
+by the chunk size and the longest record. Sequences must be ASCII, other bytes of headers are replaced. Gzip compression and the format (FASTA/FASTQ) are
+recognized from the content, not from the file extension.
+Packed reads can be cached on disk (see cache_utils), keyed by the hash of the file content.
+"""
+
+GZIP_MAGIC = b'\x1f\x8b'
+CHUNK_SIZE = 1 << 20
+READ_CACHE_VERSION = 1  # change when the ReadStore arrays change
+
+
+def _open(path: str) -> BinaryIO:
+    """Open a plain or gzip compressed file in binary mode."""
+    with open(path, 'rb') as file:
+        magic = file.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _iter_lines(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Non-empty lines of the stream (without line endings), read in chunks of chunk_size bytes.
+    Pieces of a line spanning several chunks are joined once, when the line ends (linear time for long lines).
+    """
+    pieces = []  # unterminated line
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = chunk.split(b'\n')
+        if len(lines) == 1:
+            pieces.append(chunk)
+            continue
+        if pieces:
+            pieces.append(lines[0])
+            lines[0] = b''.join(pieces)
+            pieces = []
+        last = lines.pop()  # incomplete last line
+        if last:
+            pieces.append(last)
+        for line in lines:
+            line = line.rstrip(b'\r')
+            if line:
+                yield line
+    line = b''.join(pieces).rstrip(b'\r')
+    if line:
+        yield line
+
+
+def _header(line: bytes) -> str:
+    """Name of a header line, bytes other than ASCII are replaced (free text)."""
+    return line[1:].decode('ascii', errors='replace').strip()
+
+
+def _fasta_records(lines: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    name = None
+    seq_parts = []
+    for line in lines:
+        if line.startswith(b'>'):
+            if name is not None:
+                yield name, b''.join(seq_parts).decode('ascii')
+            name = _header(line)
+            seq_parts = []
+        else:
+            seq_parts.append(line.strip())
+    if name is not None:
+        yield name, b''.join(seq_parts).decode('ascii')
+
+
+def _fastq_records(lines: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    # 4 lines per record: @name, sequence, +[name], qualities
+    for header in lines:
+        if not header.startswith(b'@'):
+            raise ValueError(f'FASTQ record should start with "@", got {header[:50].decode("ascii", errors="replace")}')
+        seq = next(lines, None)
+        plus = next(lines, None)
+        qual = next(lines, None)
+        if qual is None or not plus.startswith(b'+'):
+            raise ValueError(f'Incomplete FASTQ record {_header(header)[:50]}')
+        yield _header(header), seq.strip().decode('ascii')
 
-    ext = path.split(".")[-1]
 
-    if ext == "fastq":
-        with open(path, 'r') as file:
-            file = file.read().split("\n")
-            parsed_seqs = file[1::4]
+def iter_records(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """
+    Records of a FASTA or FASTQ file (plain or gzip compressed).
 
-    elif ext in ["fasta", "fa"]:
-        with open(path, 'r') as file:
-            file = file.read().split(">")
-            parsed_seqs = [seq.split("\n", 1)[1].replace("\n", "") for seq in file[1:]]
+    Parameters
+    ----------
+    path: str
+        Path to the file, the extension is not used.
+
+    chunk_size: int, default=1 MiB
+        Number of bytes read at once.
+
+    Yields
+    ------
+    name, sequence: str
+    """
+    with _open(path) as stream:
+        lines = _iter_lines(stream, chunk_size)
+        first = next(lines, None)
+        if first is None:
+            return
+        lines = _chain(first, lines)
+        if first.startswith(b'>'):
+            yield from _fasta_records(lines)
+        elif first.startswith(b'@'):
+            yield from _fastq_records(lines)
+        else:
+            raise ValueError(f'Unknown file format (neither FASTA nor FASTQ): {path}')
+
+
+def _chain(first: bytes, lines: Iterator[bytes]) -> Iterator[bytes]:
+    yield first
+    yield from lines
+
+
+def iter_sequences(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Sequences of a FASTA or FASTQ file, see iter_records."""
+    for _, seq in iter_records(path, chunk_size):
+        yield seq
+
+
+def load_packed(path: str, cache_dir: str) -> ReadStore:
+    """
+    Packed reads of the file, from the cache if the file content was parsed before.
+    Cached arrays are memory-mapped (read-only), otherwise the file is parsed and the reads are cached.
+    """
+    cache = DiskCache(cache_dir)
+    key = f'reads-v{READ_CACHE_VERSION}-{file_digest(path)}'
+    arrays = cache.load(key)
+    if arrays is not None:
+        return ReadStore(**arrays)
+    store = ReadStore.from_strings(iter_sequences(path))
+    cache.save(key, {'packed': store.packed, 'offsets': store.offsets, 'lengths': store.lengths,
+                     'n_positions': store.n_positions})
+    return store
+
+
+def parse(path, packed=False, cache_dir=None):
+    """Open and return given fastq or fasta file
+    :param
+    Input: path to fastq or/fasta file (plain or gzip compressed, format is detected from the content)
+           packed: return a ReadStore (2-bit packed reads) instead of a list,
+                   the reads are packed while the file is read
+           cache_dir: directory of the binary read cache (see load_packed), None: no cache.
+                      Cached reads are packed, so bases other than ACGT are read back as N
+    Output: list of sequences (or ReadStore)"""
 
-    return parsed_seqs
+    if cache_dir is not None:
+        store = load_packed(path, cache_dir)
+        return store if packed else store.to_list()
+    if packed:
+        return ReadStore.from_strings(iter_sequences(path))
+    return list(iter_sequences(path))
@@ -0,0 +1,248 @@
+import json
+import os
+import numpy as np
+from numba import njit
+from typing import List, NamedTuple, Tuple, Union
+from Bio.Align import substitution_matrices
+from .parser import iter_records
+
+"""
+Local protein search, an offline replacement for BLAST.
+
+Proteins of a FASTA file are concatenated into one array of amino acid codes. The index is an
+inverted list of k-mers (CSR: kmer_offsets[key]: kmer_offsets[key + 1] are the positions of the k-mer key),
+k-mers with non-standard amino acids are not indexed. All arrays are .npy files, loaded memory-mapped.
+
+A query is searched with seed-and-extend: exact k-mer hits of the query are grouped by diagonal
+(position in the database - position in the query), diagonals with at least min_seeds hits are extended
+to the best ungapped local alignment with BLOSUM62 scores (maximum subarray on the diagonal).
+"""
+
+BLOSUM62 = substitution_matrices.load('BLOSUM62')
+AMINO_ACIDS = BLOSUM62.alphabet  # 'ARNDCQEGHILKMFPSTWYVBZX*', the first 20 are the standard amino acids
+N_STANDARD = 20
+UNKNOWN_AMINO_ACID = AMINO_ACIDS.index('X')
+SCORES = np.array(BLOSUM62, dtype=np.int64)
+
+# ASCII -> amino acid code
+ENCODE_TABLE = np.full(256, UNKNOWN_AMINO_ACID, dtype=np.uint8)
+for _code, _amino_acid in enumerate(AMINO_ACIDS):
+    ENCODE_TABLE[ord(_amino_acid)] = _code
+    ENCODE_TABLE[ord(_amino_acid.lower())] = _code
+
+
+class Hit(NamedTuple):
+    """
+    name: str
+        FASTA header of the protein.
+
+    score: int
+        BLOSUM62 score of the best ungapped alignment.
+
+    query_start, query_end, subject_start, subject_end: int
+        Aligned region of the query and of the protein (0-based, end exclusive).
+    """
+    name: str
+    score: int
+    query_start: int
+    query_end: int
+    subject_start: int
+    subject_end: int
+
+
+def encode_protein(seq: str) -> np.ndarray:
+    return ENCODE_TABLE[np.frombuffer(seq.encode('ascii'), dtype=np.uint8)]
+
+
+def kmer_keys(codes: np.ndarray, k: int) -> np.ndarray:
+    """Key (base 20) of the k-mer starting at every position, -1 if it has a non-standard amino acid."""
+    n_kmers = max(len(codes) - k + 1, 0)
+    keys = np.zeros(n_kmers, dtype=np.int64)
+    valid = np.ones(n_kmers, dtype=np.bool_)
+    for j in range(k):
+        window = codes[j:j + n_kmers].astype(np.int64)
+        keys = keys * N_STANDARD + window
+        valid &= window < N_STANDARD
+    keys[~valid] = -1
+    return keys
+
+
+@njit
+def _extend_diagonals(query, sequences, seq_offsets, proteins, diagonals, scores):
+    """
+    Best ungapped local alignment on each diagonal of a protein (maximum subarray of the substitution scores).
+
+    Returns
+    -------
+    result: np.ndarray of int64, shape (n_diagonals, 3)
+        (score, query start, query end).
+    """
+    result = np.zeros((len(diagonals), 3), dtype=np.int64)
+    for d in range(len(diagonals)):
+        diag = diagonals[d]
+        # query positions aligned inside the protein
+        first = max(0, seq_offsets[proteins[d]] - diag)
+        last = min(len(query), seq_offsets[proteins[d] + 1] - diag)
+
+        best, best_start, best_end = 0, 0, 0
+        current, current_start = 0, first
+        for i in range(first, last):
+            if current <= 0:
+                current, current_start = 0, i
+            current += scores[query[i], sequences[diag + i]]
+            if current > best:
+                best, best_start, best_end = current, current_start, i + 1
+        result[d, 0] = best
+        result[d, 1] = best_start
+        result[d, 2] = best_end
+    return result
+
+
+class ProteinIndex:
+    """
+    k-mer index of proteins.
+
+    sequences: np.ndarray of uint8
+        Amino acid codes (see AMINO_ACIDS) of all proteins, protein i is sequences[seq_offsets[i]: seq_offsets[i + 1]].
+
+    seq_offsets: np.ndarray of int64
+        Length n_proteins + 1.
+
+    kmer_offsets: np.ndarray of int64
+        Length 20^k + 1, positions of k-mer key are kmer_positions[kmer_offsets[key]: kmer_offsets[key + 1]].
+
+    kmer_positions: np.ndarray of int64
+        Positions (in sequences) of the k-mers, sorted by k-mer key, then by position.
+
+    names: list of str
+        FASTA headers of the proteins.
+
+    k: int
+        k-mer length.
+    """
+
+    def __init__(self, sequences: np.ndarray, seq_offsets: np.ndarray, kmer_offsets: np.ndarray,
+                 kmer_positions: np.ndarray, names: List[str], k: int):
+        self.sequences = sequences
+        self.seq_offsets = seq_offsets
+        self.kmer_offsets = kmer_offsets
+        self.kmer_positions = kmer_positions
+        self.names = names
+        self.k = k
+
+    @classmethod
+    def build(cls, proteins: Union[str, List[Tuple[str, str]]], k: int = 3) -> 'ProteinIndex':
+        """
+        Index proteins of a FASTA file (path) or a list of (name, sequence).
+        """
+        records = iter_records(proteins) if isinstance(proteins, str) else proteins
+        names, parts = [], []
+        for name, seq in records:
+            names.append(name)
+            parts.append(encode_protein(seq.rstrip('*')))
+        lengths = np.array([len(p) for p in parts], dtype=np.int64)
+        seq_offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=seq_offsets[1:])
+        sequences = np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8)
+
+        keys = kmer_keys(sequences, k)
+        # k-mers crossing the end of a protein
+        ends = seq_offsets[1:][lengths > 0]
+        for j in range(1, k):
+            crossing = ends - j
+            keys[crossing[(crossing >= 0) & (crossing < len(keys))]] = -1
+        positions = np.flatnonzero(keys >= 0)
+        order = np.argsort(keys[positions], kind='stable')
+        kmer_positions = positions[order]
+        kmer_offsets = np.zeros(N_STANDARD ** k + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys[positions], minlength=N_STANDARD ** k), out=kmer_offsets[1:])
+        return cls(sequences, seq_offsets, kmer_offsets, kmer_positions, names, k)
+
+    def save(self, path: str):
+        """Write the index to the directory path (created if it does not exist)."""
+        os.makedirs(path, exist_ok=True)
+        for name in ['sequences', 'seq_offsets', 'kmer_offsets', 'kmer_positions']:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'index.json'), 'w') as file:
+            json.dump({'k': self.k, 'names': self.names}, file)
+
+    @classmethod
+    def load(cls, path: str) -> 'ProteinIndex':
+        """Index saved with save, arrays are memory-mapped."""
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                  for name in ['sequences', 'seq_offsets', 'kmer_offsets', 'kmer_positions']}
+        with open(os.path.join(path, 'index.json')) as file:
+            meta = json.load(file)
+        return cls(names=meta['names'], k=meta['k'], **arrays)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def protein(self, i: int) -> str:
+        codes = self.sequences[self.seq_offsets[i]: self.seq_offsets[i + 1]]
+        return np.frombuffer(AMINO_ACIDS.encode('ascii'), dtype=np.uint8)[codes].tobytes().decode('ascii')
+
+    def search(self, query: str, max_hits: int = 10, min_seeds: int = 2, min_score: int = 30) -> List[Hit]:
+        """
+        Proteins with the best ungapped alignments to the query.
+
+        Parameters
+        ----------
+        query: str
+            Amino acid sequence.
+
+        max_hits: int, default=10
+            Number of returned proteins.
+
+        min_seeds: int, default=2
+            Minimum number of k-mer hits on a diagonal to extend it.
+
+        min_score: int, default=30
+            Minimum BLOSUM62 score of a hit.
+
+        Returns
+        -------
+        hits: list of Hit
+            Best hit per protein, highest score first.
+        """
+        codes = encode_protein(query)
+        keys = kmer_keys(codes, self.k)
+        query_positions = np.flatnonzero(keys >= 0)
+        if len(query_positions) == 0 or len(self) == 0:
+            return []
+        starts = np.asarray(self.kmer_offsets[keys[query_positions]])
+        counts = np.asarray(self.kmer_offsets[keys[query_positions] + 1]) - starts
+        # database positions of all seeds
+        seed_index = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        seed_positions = np.asarray(self.kmer_positions)[seed_index]
+        diagonals = seed_positions - np.repeat(query_positions, counts)
+        proteins = np.searchsorted(self.seq_offsets, seed_positions, side='right') - 1
+        # seeds grouped by (protein, diagonal)
+        group_keys = proteins * (len(self.sequences) + len(codes)) + diagonals + len(codes)
+        group_keys, first_seed, n_seeds = np.unique(group_keys, return_index=True, return_counts=True)
+        candidates = first_seed[n_seeds >= min(min_seeds, len(query_positions))]
+        if len(candidates) == 0:
+            return []
+        proteins, diagonals = proteins[candidates], diagonals[candidates]
+
+        extended = _extend_diagonals(codes, np.asarray(self.sequences), np.asarray(self.seq_offsets),
+                                     proteins, diagonals, SCORES)
+        order = np.argsort(-extended[:, 0], kind='stable')
+        hits, seen = [], set()
+        for i in order.tolist():
+            score, query_start, query_end = extended[i].tolist()
+            protein = int(proteins[i])
+            if score < min_score or len(hits) == max_hits:
+                break
+            if protein in seen:
+                continue
+            seen.add(protein)
+            subject_start = int(diagonals[i]) + query_start - int(self.seq_offsets[protein])
+            hits.append(Hit(self.names[protein], score, query_start, query_end,
+                            subject_start, subject_start + query_end - query_start))
+        return hits
+
+    def identify(self, query: str) -> Union[str, int]:
+        """Name of the best hit, -1 if there is none (same output as translation.request_blastp)."""
+        hits = self.search(query, max_hits=1)
+        return hits[0].name if hits else -1
@@ -0,0 +1,177 @@
+import numpy as np
+from typing import Iterable, Iterator, List, Tuple
+
+"""
+Packed storage for DNA reads.
+
+Bases are 2-bit codes (A=0, C=1, G=2, T=3), 4 bases per byte. Every read starts at a byte boundary,
+so the packed bytes of a read are a view of one contiguous buffer. Bases other than ACGT are stored
+as N: their positions are kept in a separate (sparse) array. Decoded reads are upper case, with N for
+every base other than ACGT.
+
+The store is compact storage of parsed reads (and of the read cache). Consumers that work on codes
+(to_codes: sa_utils.find_all_overlaps and find_contained, de Bruijn) use it without strings; the greedy
+assemblers merge strings, so they decode the reads (vectorized, in batches).
+"""
+
+N_CODE = 4
+
+# ASCII -> 2-bit code, N_CODE for not ACGT
+ENCODE_TABLE = np.full(256, N_CODE, dtype=np.uint8)
+for _code, _base in enumerate('ACGT'):
+    ENCODE_TABLE[ord(_base)] = _code
+    ENCODE_TABLE[ord(_base.lower())] = _code
+# code -> ASCII
+DECODE_TABLE = np.frombuffer(b'ACGTN', dtype=np.uint8)
+# reads decoded at once while iterating
+DECODE_BATCH = 65536
+
+
+def pack_codes(codes: np.ndarray) -> np.ndarray:
+    """Pack 2-bit codes (length divisible by 4), first base in the highest bits."""
+    codes = (codes & 3).reshape(-1, 4)
+    return (codes[:, 0] << 6) | (codes[:, 1] << 4) | (codes[:, 2] << 2) | codes[:, 3]
+
+
+def unpack_codes(packed: np.ndarray) -> np.ndarray:
+    """Inverse of pack_codes."""
+    codes = np.empty((len(packed), 4), dtype=np.uint8)
+    codes[:, 0] = packed >> 6
+    codes[:, 1] = (packed >> 4) & 3
+    codes[:, 2] = (packed >> 2) & 3
+    codes[:, 3] = packed & 3
+    return codes.reshape(-1)
+
+
+def _padded_positions(padded_starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Position of every base in an array where read i starts at padded_starts[i]."""
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return np.arange(lengths.sum(), dtype=np.int64) + np.repeat(padded_starts - starts, lengths)
+
+
+class ReadStore:
+    """
+    Reads packed into one uint8 buffer.
+
+    packed: np.ndarray of uint8
+        4 bases per byte, read i is packed[offsets[i]: offsets[i + 1]].
+
+    offsets: np.ndarray of int64
+        Byte offsets of the reads (length n_reads + 1).
+
+    lengths: np.ndarray of int32
+        Number of bases of each read.
+
+    n_positions: np.ndarray of int64
+        Sorted positions of N bases, position = 4 * byte offset of the read + index in the read.
+    """
+
+    def __init__(self, packed: np.ndarray, offsets: np.ndarray, lengths: np.ndarray, n_positions: np.ndarray = None):
+        self.packed = packed
+        self.offsets = offsets
+        self.lengths = lengths
+        self.n_positions = np.empty(0, dtype=np.int64) if n_positions is None else n_positions
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str], batch_size: int = 65536) -> 'ReadStore':
+        """
+        Pack reads. Reads are consumed in batches, so a generator is never materialized as a list.
+        """
+        packed_parts, lengths_parts, n_parts = [], [], []
+        n_bytes = 0
+        batch = []
+        for s in strings:
+            batch.append(s)
+            if len(batch) == batch_size:
+                n_bytes = cls._pack_batch(batch, n_bytes, packed_parts, lengths_parts, n_parts)
+                batch = []
+        if batch:
+            cls._pack_batch(batch, n_bytes, packed_parts, lengths_parts, n_parts)
+
+        lengths = np.concatenate(lengths_parts) if lengths_parts else np.empty(0, dtype=np.int32)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum((lengths.astype(np.int64) + 3) // 4, out=offsets[1:])
+        packed = np.concatenate(packed_parts) if packed_parts else np.empty(0, dtype=np.uint8)
+        n_positions = np.concatenate(n_parts) if n_parts else np.empty(0, dtype=np.int64)
+        return cls(packed, offsets, lengths, n_positions)
+
+    @staticmethod
+    def _pack_batch(batch: List[str], n_bytes: int, packed_parts: list, lengths_parts: list, n_parts: list) -> int:
+        """Pack a batch of reads, each read is padded to whole bytes. Returns total number of bytes."""
+        lengths = np.array([len(s) for s in batch], dtype=np.int32)
+        padded_starts = np.zeros(len(batch) + 1, dtype=np.int64)
+        np.cumsum((lengths.astype(np.int64) + 3) // 4 * 4, out=padded_starts[1:])
+        codes = np.zeros(padded_starts[-1], dtype=np.uint8)
+        codes[_padded_positions(padded_starts[:-1], lengths)] = \
+            ENCODE_TABLE[np.frombuffer(''.join(batch).encode('ascii'), dtype=np.uint8)]
+
+        n_mask = codes == N_CODE
+        if n_mask.any():
+            n_parts.append(np.flatnonzero(n_mask) + 4 * n_bytes)
+        packed_parts.append(pack_codes(codes))
+        lengths_parts.append(lengths)
+        return n_bytes + len(codes) // 4
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, i: int) -> str:
+        return DECODE_TABLE[self.codes(i)].tobytes().decode('ascii')
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, len(self), DECODE_BATCH):
+            yield from self.decode(start, min(start + DECODE_BATCH, len(self)))
+
+    def decode(self, start: int = 0, stop: int = None) -> List[str]:
+        """
+        Reads start..stop as strings (upper case, N for bases other than ACGT), one vectorized unpacking.
+        """
+        stop = len(self) if stop is None else stop
+        if stop <= start:
+            return []
+        first_byte, last_byte = self.offsets[start], self.offsets[stop]
+        codes = unpack_codes(self.packed[first_byte: last_byte])
+        lo, hi = np.searchsorted(self.n_positions, [4 * first_byte, 4 * last_byte])
+        codes[self.n_positions[lo:hi] - 4 * first_byte] = N_CODE
+        lengths = self.lengths[start:stop]
+        codes = codes[_padded_positions(4 * (self.offsets[start:stop] - first_byte), lengths)]
+        text = DECODE_TABLE[codes].tobytes().decode('ascii')
+        ends = np.cumsum(lengths, dtype=np.int64).tolist()
+        return [text[end - length: end] for end, length in zip(ends, lengths.tolist())]
+
+    def packed_view(self, i: int) -> np.ndarray:
+        """Packed bytes of read i (view, no copy)."""
+        return self.packed[self.offsets[i]: self.offsets[i + 1]]
+
+    def codes(self, i: int) -> np.ndarray:
+        """Codes of read i (N_CODE for N)."""
+        codes = unpack_codes(self.packed_view(i))[:self.lengths[i]]
+        start = 4 * self.offsets[i]
+        lo, hi = np.searchsorted(self.n_positions, [start, start + self.lengths[i]])
+        codes[self.n_positions[lo:hi] - start] = N_CODE
+        return codes
+
+    def to_codes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Codes of all reads concatenated (one vectorized unpacking, no strings).
+
+        Returns
+        -------
+        codes: np.ndarray of uint8
+            Read i is codes[offsets[i]: offsets[i + 1]].
+
+        offsets: np.ndarray of int64
+        """
+        codes = unpack_codes(self.packed)
+        codes[self.n_positions] = N_CODE
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=offsets[1:])
+        return codes[_padded_positions(4 * self.offsets[:-1], self.lengths)], offsets
+
+    def to_list(self) -> List[str]:
+        return self.decode()
+
+    @property
+    def nbytes(self) -> int:
+        return self.packed.nbytes + self.offsets.nbytes + self.lengths.nbytes + self.n_positions.nbytes
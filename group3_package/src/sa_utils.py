@@ -0,0 +1,298 @@
+import numpy as np
+from numba import njit
+from typing import List, Dict, Tuple, Union
+from .read_store import ReadStore
+
+"""
+All-pairs suffix-prefix overlaps with a generalized suffix array
+(Gusfield's all-pairs suffix-prefix problem solved on a suffix array instead of a suffix tree,
+see Ohlebusch & Gog, "Efficient algorithms for the all-pairs suffix-prefix problem").
+"""
+
+
+def encode_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate strings into one uint8 array (no separators).
+
+    Returns
+    -------
+    text: np.ndarray of uint8
+        Concatenated characters.
+
+    offsets: np.ndarray of int64
+        Start of string i is offsets[i], end is offsets[i + 1].
+    """
+    lengths = np.array([len(s) for s in strings], dtype=np.int64)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    text = np.frombuffer(''.join(strings).encode('ascii'), dtype=np.uint8)
+    return text, offsets
+
+
+def build_suffix_array(text: np.ndarray, offsets: np.ndarray, return_rank: bool = False) -> tuple:
+    """
+    Generalized suffix array over a set of strings (prefix doubling, O(N log N log L)).
+
+    Each suffix ends at the end of its own string, an ended suffix is smaller than any character.
+    Suffixes with equal content are ordered: non-string-starts first, then by string index.
+
+    Parameters
+    ----------
+    text, offsets: np.ndarray
+        Output of encode_strings.
+
+    return_rank: bool, default=False
+        Also return the rank of the suffix content.
+
+    Returns
+    -------
+    sa: np.ndarray of int64
+        Positions in text in sorted suffix order.
+
+    str_index: np.ndarray of int64
+        String index for each position in text.
+
+    rank: np.ndarray of int64, if return_rank
+        Rank of the content of the suffix at each position in text (equal for suffixes with equal content).
+    """
+    n_total = len(text)
+    lengths = np.diff(offsets)
+    str_index = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    str_end = offsets[1:][str_index]
+    positions = np.arange(n_total, dtype=np.int64)
+
+    rank = text.astype(np.int64) + 1  # 0 is reserved for "suffix ended"
+    max_len = int(lengths.max()) if len(lengths) else 0
+    h = 1
+    while h < max_len:
+        shifted = positions + h
+        second = np.zeros(n_total, dtype=np.int64)
+        inside = shifted < str_end
+        second[inside] = rank[shifted[inside]]
+        order = np.lexsort((second, rank))
+        sorted_rank = rank[order]
+        sorted_second = second[order]
+        new_group = np.empty(n_total, dtype=bool)
+        new_group[:1] = True
+        new_group[1:] = (sorted_rank[1:] != sorted_rank[:-1]) | (sorted_second[1:] != sorted_second[:-1])
+        rank = np.empty(n_total, dtype=np.int64)
+        rank[order] = np.cumsum(new_group)
+        h *= 2
+
+    is_start = positions == offsets[:-1][str_index]
+    sa = np.lexsort((str_index, is_start, rank))
+    if return_rank:
+        return sa, str_index, rank
+    return sa, str_index
+
+
+@njit
+def _lcp_array(text, sa, rank, str_end):
+    """
+    lcp[k] = longest common prefix of suffixes sa[k - 1] and sa[k] (lcp[0] = 0), Kasai's algorithm, O(N).
+
+    Suffixes with equal content (equal rank) are adjacent, the lcp inside such a group is the suffix length.
+    The first suffix of a group is compared with the group before it, this lcp decreases by at most 1
+    from a position to the next one of the same string, so it is carried over as the start of the comparison.
+    """
+    n = len(sa)
+    lcp = np.zeros(n, dtype=np.int64)
+    inverse = np.empty(n, dtype=np.int64)
+    group_start = np.empty(n, dtype=np.int64)  # index in sa of the first suffix with the same content
+    for k in range(n):
+        inverse[sa[k]] = k
+        if k > 0 and rank[sa[k]] == rank[sa[k - 1]]:
+            group_start[k] = group_start[k - 1]
+        else:
+            group_start[k] = k
+
+    h = 0
+    for p in range(n):
+        if p > 0 and str_end[p - 1] != str_end[p]:  # start of a string
+            h = 0
+        k = inverse[p]
+        g = group_start[k]
+        if g == 0:
+            h = 0
+        else:
+            q = sa[g - 1]
+            while p + h < str_end[p] and q + h < str_end[q] and text[p + h] == text[q + h]:
+                h += 1
+        lcp[k] = h if k == g else str_end[p] - p
+        if h > 0:
+            h -= 1
+    return lcp
+
+
+@njit
+def _scan_overlaps(sa, lcp, str_index, str_end, offsets, min_length):
+    """
+    Scan the suffix array once and report the maximal overlap of every overlapping pair.
+
+    Every suffix of string i is a candidate overlap for all strings starting with it.
+    Those strings directly follow the suffix in the suffix array while lcp >= suffix length,
+    so candidates are kept on a stack (overlap lengths are non-decreasing from bottom to top).
+    Each string i has its own chain of stack entries, the top of the chain is its longest candidate.
+    When a string start is met, the top of each active chain is one maximal overlap.
+    """
+    n_str = len(offsets) - 1
+    n_sa = len(sa)
+
+    stack_len = np.empty(n_sa, dtype=np.int64)
+    stack_str = np.empty(n_sa, dtype=np.int64)
+    stack_prev = np.empty(n_sa, dtype=np.int64)  # previous entry of the same string
+    top = 0
+
+    chain_top = np.full(n_str, -1, dtype=np.int64)
+    active = np.empty(n_str, dtype=np.int64)
+    active_pos = np.full(n_str, -1, dtype=np.int64)
+    n_active = 0
+
+    out_capacity = max(16, n_str)
+    out = np.empty((out_capacity, 3), dtype=np.int64)
+    n_out = 0
+
+    for k in range(n_sa):
+        # close candidates that are not prefixes of the current suffix
+        while top > 0 and stack_len[top - 1] > lcp[k]:
+            top -= 1
+            i = stack_str[top]
+            chain_top[i] = stack_prev[top]
+            if chain_top[i] == -1:
+                last = active[n_active - 1]
+                active[active_pos[i]] = last
+                active_pos[last] = active_pos[i]
+                active_pos[i] = -1
+                n_active -= 1
+
+        pos = sa[k]
+        j = str_index[pos]
+        if pos == offsets[j]:  # string start: report overlaps (i, j)
+            for a in range(n_active):
+                i = active[a]
+                if i == j:
+                    continue
+                if n_out == out_capacity:
+                    out_capacity *= 2
+                    new_out = np.empty((out_capacity, 3), dtype=np.int64)
+                    new_out[:n_out] = out[:n_out]
+                    out = new_out
+                out[n_out, 0] = i
+                out[n_out, 1] = j
+                out[n_out, 2] = stack_len[chain_top[i]]
+                n_out += 1
+
+        suffix_len = str_end[pos] - pos
+        if suffix_len >= min_length:
+            stack_len[top] = suffix_len
+            stack_str[top] = j
+            stack_prev[top] = chain_top[j]
+            if chain_top[j] == -1:
+                active[n_active] = j
+                active_pos[j] = n_active
+                n_active += 1
+            chain_top[j] = top
+            top += 1
+
+    return out[:n_out]
+
+
+def find_all_overlaps(strings: Union[List[str], ReadStore], min_length: int = 1) -> np.ndarray:
+    """
+    Maximal suffix-prefix overlap for every pair of strings that overlap.
+
+    The result is the same as calling scs_utils.find_overlap_length(strings[i], strings[j], min_length)
+    for all i != j, but pairs without an overlap are not reported.
+
+    Parameters
+    ----------
+    strings: list of str or ReadStore
+        Input strings (reads), no duplicates. Packed reads are used without converting them to strings.
+
+    min_length: int, default=1
+        Minimum length of the overlap.
+
+    Returns
+    -------
+    overlaps: np.ndarray of int64, shape (n_overlaps, 3)
+        Rows (string_index_1, string_index_2, overlap_length): end of string 1 overlaps with start of string 2.
+    """
+    if len(strings) < 2:
+        return np.empty((0, 3), dtype=np.int64)
+    if isinstance(strings, ReadStore):
+        text, offsets = strings.to_codes()
+    else:
+        text, offsets = encode_strings(strings)
+    sa, str_index, rank = build_suffix_array(text, offsets, return_rank=True)
+    str_end = offsets[1:][str_index]
+    lcp = _lcp_array(text, sa, rank, str_end)
+    return _scan_overlaps(sa, lcp, str_index, str_end, offsets, max(min_length, 1))
+
+
+def find_contained(strings: Union[List[str], ReadStore]) -> np.ndarray:
+    """
+    Strings that are substrings of other strings.
+
+    String j is contained in another string if a suffix of the other string starts with j.
+    Such suffixes directly precede or follow the start of j in the suffix array,
+    so it is enough to compare the lcp with both neighbours to the length of j.
+
+    Parameters
+    ----------
+    strings: list of str or ReadStore
+        Input strings (reads), no duplicates (a duplicate would be contained in its copy).
+
+    Returns
+    -------
+    contained: np.ndarray of bool
+        contained[j] is True if string j is a substring of another string.
+    """
+    if isinstance(strings, ReadStore):
+        text, offsets = strings.to_codes()
+    else:
+        text, offsets = encode_strings(strings)
+    lengths = np.diff(offsets)
+    if len(lengths) < 2:
+        return np.zeros(len(lengths), dtype=bool)
+    contained = lengths == 0
+    sa, str_index, rank = build_suffix_array(text, offsets, return_rank=True)
+    str_end = offsets[1:][str_index]
+    lcp = _lcp_array(text, sa, rank, str_end)
+    lcp_next = np.append(lcp[1:], 0)
+
+    ranks = np.flatnonzero(sa == offsets[:-1][str_index[sa]])  # suffix array ranks of string starts
+    j = str_index[sa[ranks]]
+    contained[j] = (lcp[ranks] >= lengths[j]) | (lcp_next[ranks] >= lengths[j])
+    return contained
+
+
+def remove_contained(strings: List[str]) -> List[str]:
+    """Drop duplicates and strings that are substrings of other strings (order is kept)."""
+    strings = list(dict.fromkeys(strings))
+    return [s for s, is_contained in zip(strings, find_contained(strings)) if not is_contained]
+
+
+def calc_pairwise_overlaps_suffix_array(strings_dict: Dict[int, str],
+                                        min_length: int = 1) -> List[Tuple[int, int, int]]:
+    """
+    Initial pairwise overlap calculation with a suffix array.
+
+    Only pairs with overlap >= min_length are returned (other pairs have overlap 0).
+
+    Parameters
+    ----------
+    strings_dict: dict of (int: str)
+        Key: string id, value: string.
+
+    min_length: int, default=1
+        Minimum length of the overlap.
+
+    Returns
+    -------
+    overlap_list: list of tuples of int
+        Each item is (str_id_1, str_id_2, overlap_length).
+    """
+    ids = np.array(list(strings_dict.keys()), dtype=np.int64)
+    overlaps = find_all_overlaps(list(strings_dict.values()), min_length=min_length)
+    overlaps[:, :2] = ids[overlaps[:, :2]]
+    return list(map(tuple, overlaps.tolist()))
@@ -1,66 +1,104 @@
 import itertools
-import math
+import multiprocessing as mp
+import time
 from tqdm import tqdm
-from typing import List
+from typing import Callable, List, Tuple, Union
 import numpy as np
-from .heap_utils import create_max_heap
-from .scs_utils import find_overlap_length, get_strings_with_id_dict, calc_pairwise_overlaps_parallel_heap, \
-    add_row_col_to_end, remove_rows_cols
-
-
-def scs(strings: List[str]) -> str:
+from .cache_utils import DiskCache, strings_digest
+from .heap_utils import create_max_heap, create_bucket_queue
+from .layout_utils import ContigLayouts
+from .greedy_numba_utils import naive_overlaps, greedy_merge
+from .sa_utils import encode_strings, remove_contained
+from .component_utils import split_into_components
+from .strand_utils import canonical_kmer, canonical_pair, oriented_strings, drop_contained_reads_both_strands, \
+    calc_pairwise_overlaps_both_strands
+from .scs_exact_utils import held_karp, branch_and_bound
+from .scs_utils import find_overlap_length, get_strings_with_id_dict, calc_pairwise_overlaps, drop_contained_reads
+
+
+def scs(strings: List[str], time_limit: float = None, max_dp_strings: int = 20) -> str:
     """
     Shortest common superstring algorithm.
-    (Correct solution guaranteed, but takes long time).
+    (Correct solution guaranteed, unless the time limit is reached).
+
+    Strings contained in other strings are removed, then the order with the maximum sum of overlaps
+    is found with Held-Karp dynamic programming (at most max_dp_strings strings)
+    or with branch-and-bound started from the greedy order (see scs_exact_utils).
 
     Parameters
     ----------
     strings: list of str
         Input strings (reads).
 
+    time_limit: float, default=None
+        Seconds for branch-and-bound, then the best superstring found so far is returned. None: no limit.
+
+    max_dp_strings: int, default=20
+        Held-Karp memory grows as 2^n, larger sets are solved with branch-and-bound.
+
     Returns
     -------
     shortest_sup: str
         Shortest common superstring.
     """
-    strings = list(set(strings))
-    shortest_sup = None
-    for perm in tqdm(itertools.permutations(strings),
-                     desc='Shortest Common Superstring',
-                     total=math.factorial(len(strings))):  # perm - current string ordering
-        current_sup = perm[0]
-        for i in range(len(strings) - 1):
-            overlap_len = find_overlap_length(perm[i], perm[i + 1], min_length=1)
-            current_sup += perm[i + 1][overlap_len:]
-        if shortest_sup is None or len(current_sup) < len(shortest_sup):
-            shortest_sup = current_sup
+    strings = remove_contained(strings)
+    if len(strings) == 0:
+        return ''
+
+    text, offsets = encode_strings(strings)
+    overlap_matrix = np.zeros((len(strings), len(strings)), dtype=np.int64)
+    overlap_array = naive_overlaps(text, offsets, 1)
+    overlap_matrix[overlap_array[:, 0], overlap_array[:, 1]] = overlap_array[:, 2]
+
+    if len(strings) <= max_dp_strings:
+        path = held_karp(overlap_matrix)
+    else:
+        path, _ = branch_and_bound(overlap_matrix, time_limit=time_limit)
+
+    shortest_sup = strings[path[0]]
+    for i, j in zip(path[:-1], path[1:]):
+        shortest_sup += strings[j][overlap_matrix[i, j]:]
     return shortest_sup
 
 
-def greedy_scs_dict(strings: List[str]):
+def greedy_scs_dict(strings: List[str], overlaps: str = 'naive', min_overlap: int = 1, drop_contained: bool = True):
     """
     Greedy shortest common superstring algorithm.
     (Correct solution NOT guaranteed, but takes reasonable time).
 
     Overlaps are stored in a dict.
+
+    overlaps: str, default='naive'
+        Method for the initial pairwise overlap calculation ('naive', 'suffix_array', 'seed'),
+        see scs_utils.calc_pairwise_overlaps.
+
+    min_overlap: int, default=1
+        Minimum overlap length, shorter overlaps are treated as 0.
+
+    drop_contained: bool, default=True
+        Remove reads contained in other reads before the overlap calculation, see scs_utils.drop_contained_reads.
     """
     strings = list(set(strings))
+    if drop_contained:
+        strings = drop_contained_reads(strings)
 
     strings_dict = get_strings_with_id_dict(strings)  # str_id: str
-    overlap_dict = {}  # (str_id1, str_id2): overlap_len
     id_counter = itertools.count(start=len(strings))  # used to get new id for new merged string
 
     # Initial pairwise overlap calculation
-    for (id1, s1), (id2, s2) in tqdm(itertools.permutations(strings_dict.items(), r=2),
-                                     desc='Greedy SCS. Initialization.',
-                                     total=len(strings) ** 2 - len(strings)):
-        overlap_len = find_overlap_length(s1, s2)
-        overlap_dict[(id1, id2)] = overlap_len
+    # (str_id1, str_id2): overlap_len, missing pairs have overlap 0
+    overlap_dict = {(id1, id2): overlap_len
+                    for id1, id2, overlap_len in calc_pairwise_overlaps(strings_dict, overlaps,
+                                                                        min_overlap=min_overlap,
+                                                                        desc='Greedy SCS. Initialization.')}
 
     # Find two strings with th ebiggest overlap and merge them. Repeat.
     # At each iteration number of strings in strings_dict decreases by 1, so, (len(strings) - 1) iterations.
     for _ in tqdm(range(len(strings) - 1),
                   desc='Greedy SCS. String merging.'):
+        if not overlap_dict:  # no overlaps left, remaining strings are concatenated
+            break
+
         # Find max overlap and corresponding string IDs.
         (merge_id1, merge_id2), max_overlap = max(overlap_dict.items(), key=lambda x: x[1])
 
@@ -75,11 +113,14 @@ def greedy_scs_dict(strings: List[str]):
         # calculate overlaps between new string and the old ones
         new_overlaps_list = []
         for (id_, s_) in strings_dict.items():
+            # old overlaps are lower bounds for the new ones
+            min_length1 = max(overlap_dict.get((merge_id2, id_), 0), min_overlap)
+            min_length2 = max(overlap_dict.get((id_, merge_id1), 0), min_overlap)
             new_overlaps_list.append(((new_id, id_),
-                                      find_overlap_length(new_string, s_, min_length=overlap_dict[merge_id2, id_]))
+                                      find_overlap_length(new_string, s_, min_length=min_length1))
                                      )
             new_overlaps_list.append(((id_, new_id),
-                                      find_overlap_length(s_, new_string, min_length=overlap_dict[id_, merge_id1]))
+                                      find_overlap_length(s_, new_string, min_length=min_length2))
                                      )
 
         # add new overlaps to the storage
@@ -87,158 +128,428 @@ def greedy_scs_dict(strings: List[str]):
             overlap_dict[k] = v
 
         # Delete overlap history of merged strings
-        del overlap_dict[(merge_id1, merge_id2)]
-        del overlap_dict[(merge_id2, merge_id1)]
+        overlap_dict.pop((merge_id1, merge_id2), None)
+        overlap_dict.pop((merge_id2, merge_id1), None)
         for id_ in strings_dict.keys():
-            del overlap_dict[(id_, merge_id1)]
-            del overlap_dict[(merge_id1, id_)]
-            del overlap_dict[(id_, merge_id2)]
-            del overlap_dict[(merge_id2, id_)]
+            overlap_dict.pop((id_, merge_id1), None)
+            overlap_dict.pop((merge_id1, id_), None)
+            overlap_dict.pop((id_, merge_id2), None)
+            overlap_dict.pop((merge_id2, id_), None)
 
         # Add new string to the string set
         strings_dict[new_id] = new_string
 
-    assert len(strings_dict) == 1
-    return list(strings_dict.values())[0]
+    return ''.join(strings_dict.values())
+
+
+GREEDY_CACHE_VERSION = 1  # change when the cached overlaps or the checkpoint state change
+
+
+def cached_pairwise_overlaps(strings_dict: dict, overlaps: str, num_cpu: int, min_overlap: int, cache: DiskCache,
+                             key: str, desc: str) -> List[Tuple[int, int, int]]:
+    """
+    calc_pairwise_overlaps, the overlap triples are stored in the cache (int32 array, shape (n_overlaps, 3))
+    and loaded memory-mapped when the key is known.
+    """
+    arrays = cache.load(key)
+    if arrays is not None:
+        return [tuple(item) for item in arrays['overlaps'].tolist()]
+    overlap_items_list = calc_pairwise_overlaps(strings_dict, overlaps, num_cpu, min_overlap, desc=desc)
+    cache.save(key, {'overlaps': np.array(overlap_items_list, dtype=np.int32).reshape(-1, 3)})
+    return overlap_items_list
 
 
-def greedy_scs_heap(strings: List[str], num_cpu: int = 1):
+def greedy_scs_heap(strings: List[str], num_cpu: int = 1, overlaps: str = 'naive', min_overlap: int = 1,
+                    queue: str = 'heap', drop_contained: bool = True, both_strands: bool = False,
+                    cache_dir: str = None, checkpoint_interval: float = 300.):
     """
     Greedy shortest common superstring algorithm.
     (Correct solution NOT guaranteed, but takes reasonable time).
 
     Overlaps are stored in a numba max_heap.
+    Contigs are stored as read layouts (layout_utils.ContigLayouts), overlaps between contigs are
+    found on their heads and tails, so they are at most as long as the longest read.
+
+    overlaps: str, default='naive'
+        Method for the initial pairwise overlap calculation ('naive', 'suffix_array', 'seed'),
+        see scs_utils.calc_pairwise_overlaps.
+
+    min_overlap: int, default=1
+        Minimum overlap length, shorter overlaps are treated as 0.
+
+    queue: str, default='heap'
+        'heap': heap_utils.MaxHeap, 'bucket': heap_utils.BucketQueue (O(1) operations).
+
+    drop_contained: bool, default=True
+        Remove reads contained in other reads before the overlap calculation, see scs_utils.drop_contained_reads.
+
+    both_strands: bool, default=False
+        Reads come from both DNA strands, each read can be used as given or reverse complemented,
+        see greedy_scs_heap_both_strands (num_cpu, overlaps and the cache are not used).
+
+    cache_dir: str, default=None
+        Directory of the cache (see cache_utils.DiskCache), None: no cache.
+        The initial overlaps are cached by the hash of the read set, the merge state is checkpointed
+        every checkpoint_interval seconds and at the end. A run with the same reads resumes from the
+        last checkpoint (a finished run only builds the contig sequences again).
+
+    checkpoint_interval: float, default=300.
+        Seconds between two checkpoints.
     """
-    strings = list(set(strings))
+    if both_strands:
+        return greedy_scs_heap_both_strands(strings, min_overlap, queue, drop_contained)
 
-    strings_dict = get_strings_with_id_dict(strings)  # str_id: str
-    overlap_dict = {}  # (str_id1, str_id2): overlap_len
-    overlap_items_list = []  # tuple(str_id1, str_id2, overlap_len)
-    id_counter = itertools.count(start=len(strings))  # used to get new id for new merged string
+    strings = sorted(set(strings))  # read ids do not depend on the input order
+    if drop_contained:
+        strings = drop_contained_reads(strings)
 
-    # Initial pairwise overlap calculation
-    if num_cpu == 1:
-        for (id1, s1), (id2, s2) in tqdm(itertools.permutations(strings_dict.items(), r=2),
-                                         desc='Greedy SCS + heap. Initialization.',
-                                         total=len(strings) ** 2 - len(strings)):
-            overlap_len = find_overlap_length(s1, s2)
-            overlap_dict[(id1, id2)] = overlap_len
-            overlap_items_list.append((id1, id2, overlap_len))
+    strings_dict = get_strings_with_id_dict(strings)  # str_id: str
+    desc = 'Greedy SCS + heap. Initialization.'
+
+    cache = DiskCache(cache_dir) if cache_dir is not None else None
+    state = None
+    if cache is not None:
+        reads_key = f'{strings_digest(strings)}-{overlaps}-{min_overlap}'
+        overlaps_key = f'overlaps-v{GREEDY_CACHE_VERSION}-{reads_key}'
+        checkpoint_key = f'greedy-heap-v{GREEDY_CACHE_VERSION}-{reads_key}'
+        state = cache.load_object(checkpoint_key)
+
+    if state is not None:
+        # resume: contigs, their overlaps and the next contig id from the checkpoint
+        layouts_state, overlap_dict, next_id = state
+        layouts = ContigLayouts.from_state(strings_dict, layouts_state)
+        overlap_items_list = [(id1, id2, overlap_len) for (id1, id2), overlap_len in overlap_dict.items()]
     else:
-        overlap_items_list = calc_pairwise_overlaps_parallel_heap(strings_dict, num_cpu)
-        overlap_dict = {(el[0], el[1]): el[2] for el in overlap_items_list}
+        # Initial pairwise overlap calculation
+        # tuple(str_id1, str_id2, overlap_len), missing pairs have overlap 0
+        if cache is not None:
+            overlap_items_list = cached_pairwise_overlaps(strings_dict, overlaps, num_cpu, min_overlap, cache,
+                                                          overlaps_key, desc)
+        else:
+            overlap_items_list = calc_pairwise_overlaps(strings_dict, overlaps, num_cpu, min_overlap, desc=desc)
+        overlap_dict = {(el[0], el[1]): el[2] for el in overlap_items_list}  # (str_id1, str_id2): overlap_len
+        # contigs as layouts of reads, at the beginning every read is a contig
+        layouts = ContigLayouts(strings_dict)
+        next_id = len(strings)  # id of the next merged contig
 
     # construct heap
-    heap = create_max_heap(overlap_items_list)
+    if queue == 'heap':
+        heap = create_max_heap(overlap_items_list)
+    elif queue == 'bucket':
+        heap = create_bucket_queue(overlap_items_list)
+    else:
+        raise RuntimeError(f'Wrong queue value {queue}')
 
     # Find two strings with the biggest overlap and merge them. Repeat.
-    # At each iteration number of strings in strings_dict decreases by 1, so, (len(strings) - 1) iterations.
-    for _ in tqdm(range(len(strings) - 1),
+    # At each iteration number of contigs decreases by 1, so, (len(layouts) - 1) iterations.
+    last_checkpoint = time.perf_counter()
+    for _ in tqdm(range(len(layouts) - 1),
                   desc='Greedy SCS + heap. String merging.'):
+        if heap.is_empty():  # no overlaps left, remaining strings are concatenated
+            break
+
+        if cache is not None and time.perf_counter() - last_checkpoint > checkpoint_interval:
+            cache.save_object(checkpoint_key, (layouts.state(), overlap_dict, next_id))
+            last_checkpoint = time.perf_counter()
+
         # Find max overlap and corresponding string IDs.
         (merge_id1, merge_id2, max_overlap) = heap.pop_max()
 
-        # create new string
-        new_string = strings_dict[merge_id1] + strings_dict[merge_id2][max_overlap:]
-        new_id = next(id_counter)
-
-        # Delete two strings that were merged and their overlaps
-        del strings_dict[merge_id1]
-        del strings_dict[merge_id2]
-        heap.delete((merge_id1, merge_id2)) \
-            .delete((merge_id2, merge_id1))
-        for id_ in strings_dict.keys():
-            heap.delete((id_, merge_id1)) \
-                .delete((merge_id1, id_)) \
-                .delete((id_, merge_id2)) \
-                .delete((merge_id2, id_))
+        # merge the layouts of two contigs (no string concatenation)
+        new_id = next_id
+        next_id += 1
+        layouts.merge(merge_id1, merge_id2, max_overlap, new_id)
+        new_tail = layouts.tail(new_id)
+        new_head = layouts.head(new_id)
+        remaining_ids = [id_ for id_ in layouts.ids() if id_ != new_id]
 
-        # calculate overlaps between new string and the old ones
+        # calculate overlaps between new contig and the old ones (on heads and tails)
         new_overlaps_list = []
-        for (id_, s_) in strings_dict.items():
+        for id_ in remaining_ids:
+            # old overlaps are lower bounds for the new ones
+            min_length1 = max(overlap_dict.get((merge_id2, id_), 0), min_overlap)
+            min_length2 = max(overlap_dict.get((id_, merge_id1), 0), min_overlap)
             new_overlaps_list.append((new_id, id_,
-                                      find_overlap_length(new_string, s_, min_length=overlap_dict[merge_id2, id_]))
+                                      find_overlap_length(new_tail, layouts.head(id_), min_length=min_length1))
                                      )
             new_overlaps_list.append((id_, new_id,
-                                      find_overlap_length(s_, new_string, min_length=overlap_dict[id_, merge_id1]))
+                                      find_overlap_length(layouts.tail(id_), new_head, min_length=min_length2))
                                      )
 
+        # Delete overlap history of merged strings
+        # (the popped item is not in the heap anymore, other items only if they were pushed)
+        del overlap_dict[(merge_id1, merge_id2)]
+        old_keys = [(merge_id2, merge_id1)]
+        for id_ in remaining_ids:
+            old_keys += [(id_, merge_id1), (merge_id1, id_), (id_, merge_id2), (merge_id2, id_)]
+        for key in old_keys:
+            if overlap_dict.pop(key, None) is not None:
+                heap.delete(key)
+
         # add new overlaps to the storage
         for item in new_overlaps_list:
             overlap_dict[(item[0], item[1])] = item[2]
             heap.push(item)
 
-        # Add new string to the string set
-        strings_dict[new_id] = new_string
+    if cache is not None:
+        cache.save_object(checkpoint_key, (layouts.state(), overlap_dict, next_id))
+
+    # contig sequences are built once, at the end
+    return ''.join(layouts.sequence(id_) for id_ in layouts.ids())
+
+
+def greedy_scs_heap_both_strands(strings: List[str], min_overlap: int = 1, queue: str = 'heap',
+                                 drop_contained: bool = True) -> str:
+    """
+    Greedy shortest common superstring algorithm for reads from both DNA strands.
+    (Correct solution NOT guaranteed, but takes reasonable time).
+
+    Each contig is kept in both orientations (oriented ids 2 * contig_id and 2 * contig_id + 1,
+    see strand_utils), overlaps are stored once per mirrored pair (strand_utils.canonical_pair).
+    Merging u and v also merges their reverse complements v^1 and u^1.
+    Initial overlaps are found with canonical k-mer seeds (strand_utils.calc_pairwise_overlaps_both_strands).
+
+    min_overlap: int, default=1
+        Minimum overlap length, shorter overlaps are treated as 0.
+
+    queue: str, default='heap'
+        'heap': heap_utils.MaxHeap, 'bucket': heap_utils.BucketQueue (O(1) operations).
+
+    drop_contained: bool, default=True
+        Remove reads contained in other reads or their reverse complements before the overlap calculation.
+    """
+    strings = list(dict.fromkeys(canonical_kmer(s) for s in strings))  # one strand of each read
+    if drop_contained:
+        strings = drop_contained_reads_both_strands(strings)
+    min_overlap = max(min_overlap, 1)
+
+    strings_dict = get_strings_with_id_dict(strings)  # str_id: str
+    contig_ids = set(strings_dict.keys())
+    id_counter = itertools.count(start=len(strings))  # used to get new id for new merged contig
+    layouts = ContigLayouts(oriented_strings(strings_dict))
+
+    # Initial pairwise overlap calculation
+    # tuple(oriented_id1, oriented_id2, overlap_len), missing pairs have overlap 0
+    overlap_items_list = calc_pairwise_overlaps_both_strands(strings_dict, min_overlap)
+    overlap_dict = {(el[0], el[1]): el[2] for el in overlap_items_list}
+
+    if queue == 'heap':
+        heap = create_max_heap(overlap_items_list)
+    elif queue == 'bucket':
+        heap = create_bucket_queue(overlap_items_list)
+    else:
+        raise RuntimeError(f'Wrong queue value {queue}')
+
+    for _ in tqdm(range(len(strings) - 1),
+                  desc='Greedy SCS + heap, both strands. String merging.'):
+        if heap.is_empty():  # no overlaps left, remaining contigs are concatenated
+            break
+
+        (u, v, max_overlap) = heap.pop_max()
+        del overlap_dict[(u, v)]
+        contig1, contig2 = u >> 1, v >> 1
+        contig_ids -= {contig1, contig2}
 
-    assert len(strings_dict) == 1
-    return list(strings_dict.values())[0]
+        # merge both orientations
+        new_id = next(id_counter)
+        layouts.merge(u, v, max_overlap, 2 * new_id)
+        layouts.merge(v ^ 1, u ^ 1, max_overlap, 2 * new_id + 1)
+
+        new_overlaps_list = []
+        old_keys = {canonical_pair(2 * contig1 + strand1, 2 * contig2 + strand2)
+                    for strand1 in (0, 1) for strand2 in (0, 1)}
+        for id_ in contig_ids:
+            # 4 oriented pairs, the other 4 are their mirrors
+            for x, y in [(2 * new_id, 2 * id_), (2 * new_id, 2 * id_ + 1),
+                         (2 * id_, 2 * new_id), (2 * id_ + 1, 2 * new_id)]:
+                new_overlaps_list.append((x, y, find_overlap_length(layouts.tail(x), layouts.head(y),
+                                                                    min_length=min_overlap)))
+            for contig in (contig1, contig2):
+                for strand1 in (0, 1):
+                    for strand2 in (0, 1):
+                        old_keys.add(canonical_pair(2 * contig + strand1, 2 * id_ + strand2))
+                        old_keys.add(canonical_pair(2 * id_ + strand2, 2 * contig + strand1))
+
+        # Delete overlap history of merged contigs
+        for key in old_keys:
+            if overlap_dict.pop(key, None) is not None:
+                heap.delete(key)
+
+        # add new overlaps to the storage
+        for x, y, overlap_len in new_overlaps_list:
+            if overlap_len > 0:
+                key = canonical_pair(x, y)
+                overlap_dict[key] = overlap_len
+                heap.push((key[0], key[1], overlap_len))
+
+        contig_ids.add(new_id)
+
+    return ''.join(layouts.sequence(2 * id_) for id_ in sorted(contig_ids))
 
 
-def greedy_scs_matrix(strings: List[str]):
+def greedy_scs_matrix(strings: List[str], overlaps: str = 'naive', min_overlap: int = 1,
+                      drop_contained: bool = True):
     """
     Greedy shortest common superstring algorithm.
     (Correct solution NOT guaranteed, but takes reasonable time).
+
+    Overlaps are stored in a fixed (n_strings x n_strings) uint16 matrix, updated in place:
+    a merged contig takes the row and column of its first string, the row and column
+    of the second string are zeroed. The maximum of each row is maintained, so the best pair
+    is found in O(n_strings). Contigs are stored as read layouts (layout_utils.ContigLayouts),
+    so overlaps are at most as long as the longest read.
+
+    overlaps: str, default='naive'
+        Method for the initial pairwise overlap calculation ('naive', 'suffix_array', 'seed'),
+        see scs_utils.calc_pairwise_overlaps.
+
+    min_overlap: int, default=1
+        Minimum overlap length, shorter overlaps are treated as 0.
+
+    drop_contained: bool, default=True
+        Remove reads contained in other reads before the overlap calculation, see scs_utils.drop_contained_reads.
     """
 
     strings = list(set(strings))
+    if drop_contained:
+        strings = drop_contained_reads(strings)
+    n = len(strings)
 
-    strings_dict = get_strings_with_id_dict(strings)  # str_id: str
-    overlap_matrix = np.full((len(strings), len(strings)), fill_value=-1, dtype=int)
+    strings_dict = get_strings_with_id_dict(strings)  # str_id: str, str_id is the row/column index
+    layouts = ContigLayouts(strings_dict)
+    dtype = np.uint16 if layouts.window <= np.iinfo(np.uint16).max else np.uint32
+    overlap_matrix = np.zeros((n, n), dtype=dtype)  # diagonal and merged strings: 0
 
     # Initial pairwise overlap calculation
-    for (id1, s1), (id2, s2) in tqdm(itertools.permutations(strings_dict.items(), r=2),
-                                     desc='Greedy SCS. Initialization.',
-                                     total=len(strings) ** 2 - len(strings)):
-        overlap_len = find_overlap_length(s1, s2)
+    for id1, id2, overlap_len in calc_pairwise_overlaps(strings_dict, overlaps, min_overlap=min_overlap,
+                                                        desc='Greedy SCS. Initialization.'):
         overlap_matrix[id1, id2] = overlap_len
 
-    # Find two strings with biggest overlap and merge them. Repeat.
-    # At each iteration number of strings in strings_dict decreases by 1, so, (len(strings) - 1) iterations.
+    # maximum of each row and its column, -1 for merged strings
+    row_max = overlap_matrix.max(axis=1, initial=0).astype(np.int64)
+    row_arg = overlap_matrix.argmax(axis=1) if n > 0 else np.zeros(0, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
 
+    # Find two strings with biggest overlap and merge them. Repeat.
+    # At each iteration number of strings decreases by 1, so, (len(strings) - 1) iterations.
     for _ in tqdm(range(len(strings) - 1),
-                  desc='Greesy SCS. String merging.'):
-        len_strings = len(strings_dict)
+                  desc='Greedy SCS. String merging.'):
         # Find max overlap and corresponding string IDs.
-        merge_id1, merge_id2 = np.unravel_index(overlap_matrix.argmax(), overlap_matrix.shape)
-        max_overlap = overlap_matrix[merge_id1, merge_id2]
+        merge_id1 = int(row_max.argmax())
+        max_overlap = int(row_max[merge_id1])
+        if max_overlap <= 0:  # no overlaps left, remaining strings are concatenated
+            break
+        merge_id2 = int(row_arg[merge_id1])
+
+        # merged contig takes the place of merge_id1
+        layouts.merge(merge_id1, merge_id2, max_overlap, merge_id1)
+        new_tail = layouts.tail(merge_id1)
+        new_head = layouts.head(merge_id1)
+
+        # calculate overlaps between new contig and the old ones
+        # (old overlaps are lower bounds for the new ones)
+        for id_ in layouts.ids():
+            if id_ == merge_id1:
+                continue
+            min_length1 = max(int(overlap_matrix[merge_id2, id_]), min_overlap)
+            min_length2 = max(int(overlap_matrix[id_, merge_id1]), min_overlap)
+            overlap_matrix[merge_id1, id_] = find_overlap_length(new_tail, layouts.head(id_), min_length=min_length1)
+            overlap_matrix[id_, merge_id1] = find_overlap_length(layouts.tail(id_), new_head, min_length=min_length2)
+
+        # Delete overlap history of the second merged string
+        overlap_matrix[merge_id2, :] = 0
+        overlap_matrix[:, merge_id2] = 0
+        overlap_matrix[merge_id1, merge_id1] = 0
+        active[merge_id2] = False
+
+        # update row maxima: the new row, rows that pointed to the deleted column,
+        # column of the new contig (its overlaps can only grow)
+        new_col = overlap_matrix[:, merge_id1].astype(np.int64)
+        grown = active & ((new_col > row_max) | (row_arg == merge_id1))
+        row_max[grown] = new_col[grown]
+        row_arg[grown] = merge_id1
+        for id_ in np.flatnonzero(active & (row_arg == merge_id2)).tolist() + [merge_id1]:
+            row_arg[id_] = overlap_matrix[id_].argmax()
+            row_max[id_] = overlap_matrix[id_, row_arg[id_]]
+        row_max[merge_id2] = -1
+
+    return ''.join(layouts.sequence(id_) for id_ in layouts.ids())
+
+
+def greedy_scs_numba(strings: List[str], overlaps: str = 'naive', min_overlap: int = 1,
+                     drop_contained: bool = True) -> str:
+    """
+    Greedy shortest common superstring algorithm, the merge loop runs in numba
+    (see greedy_numba_utils.greedy_merge).
+    (Correct solution NOT guaranteed, but takes reasonable time).
 
-        new_string = strings_dict[merge_id1] + strings_dict[merge_id2][max_overlap:]
+    overlaps: str, default='naive'
+        Method for the initial pairwise overlap calculation.
+        'naive' is compiled with numba too, other methods: see scs_utils.calc_pairwise_overlaps.
 
-        print(strings_dict[merge_id1], strings_dict[merge_id2], max_overlap)
+    min_overlap: int, default=1
+        Minimum overlap length, shorter overlaps are treated as 0.
 
-        # calculate overlaps between new string and the old ones
-        new_overlaps_list1 = np.full(len_strings - 1, -1, dtype=int)
-        new_overlaps_list2 = np.full(len_strings - 2, -1, dtype=int)
+    drop_contained: bool, default=True
+        Remove reads contained in other reads before the overlap calculation, see scs_utils.drop_contained_reads.
+    """
+    strings = list(dict.fromkeys(strings))
+    if drop_contained:
+        strings = drop_contained_reads(strings)
+    text, offsets = encode_strings(strings)
+    min_overlap = max(min_overlap, 1)
+
+    if overlaps == 'naive':
+        overlap_array = naive_overlaps(text, offsets, min_overlap)
+    else:
+        overlap_items_list = calc_pairwise_overlaps(get_strings_with_id_dict(strings), overlaps,
+                                                    min_overlap=min_overlap)
+        overlap_array = np.array(overlap_items_list, dtype=np.int64).reshape(-1, 3)
+        overlap_array = overlap_array[overlap_array[:, 2] > 0]
 
-        j = 0
-        for (id_, s_) in strings_dict.items():
-            if id_ in (merge_id1, merge_id2):
-                continue
-            new_overlaps_list1[j] = find_overlap_length(new_string, s_, min_length=overlap_matrix[merge_id2, id_])
-            new_overlaps_list2[j] = find_overlap_length(s_, new_string, min_length=overlap_matrix[id_, merge_id1])
-            j += 1
+    return greedy_merge(text, offsets, overlap_array, min_overlap).tobytes().decode('ascii')
 
-        # Delete two strings that were merged
-        del strings_dict[merge_id1]
-        del strings_dict[merge_id2]
-        # rename the indexes/IDs
-        for j in range(min(merge_id1, merge_id2) + 1, max(merge_id1, merge_id2)):
-            strings_dict[j - 1] = strings_dict[j]
-        for j in range(max(merge_id1, merge_id2) + 1, len_strings):
-            strings_dict[j - 2] = strings_dict[j]
-        for k in [len_strings - 1, len_strings - 2]:
-            if k in strings_dict:
-                del strings_dict[k]
 
-        # Delete overlap history of merged strings
-        overlap_matrix = remove_rows_cols(overlap_matrix, [merge_id1, merge_id2])
+def assemble_components(strings: List[str], assemble: Callable[[List[str]], Union[str, List[str]]] = greedy_scs_heap,
+                        min_overlap: int = 20, overlaps: str = 'suffix_array', num_cpu: int = 1) -> List[str]:
+    """
+    Split reads into connected components of the overlap graph (see component_utils)
+    and assemble each component independently.
 
-        # add new overlaps
-        overlap_matrix = add_row_col_to_end(overlap_matrix, new_overlaps_list1, new_overlaps_list2)
+    Parameters
+    ----------
+    strings: list of str
+        Input strings (reads).
 
-        # Add new string to the string set
-        strings_dict[len(strings_dict)] = new_string
+    assemble: callable, default=greedy_scs_heap
+        Assembly of one component (list of str -> str or list of str), must be picklable if num_cpu != 1
+        (f.e. functools.partial of a function from this module).
 
-    assert len(strings_dict) == 1
-    return list(strings_dict.values())[0]
+    min_overlap: int, default=20
+        Minimum overlap length for the reads to be in the same component.
+
+    overlaps: str, default='suffix_array'
+        Method for the overlap graph calculation, see scs_utils.calc_pairwise_overlaps.
+
+    num_cpu: int, default=1
+        Number of processes assembling components, -1: all CPUs.
+
+    Returns
+    -------
+    contigs: list of str
+        One contig per component, the longest first.
+    """
+    components = split_into_components(list(dict.fromkeys(strings)), min_overlap, overlaps)
+    contigs = [c[0] for c in components if len(c) == 1]  # single reads, nothing to assemble
+    components = [c for c in components if len(c) > 1]
+
+    if num_cpu == -1:
+        num_cpu = mp.cpu_count()
+    if num_cpu != 1 and len(components) > 1:
+        with mp.Pool(min(num_cpu, len(components))) as pool:
+            results = pool.map(assemble, components, chunksize=1)
+    else:
+        results = [assemble(c) for c in components]
+    for result in results:
+        contigs += [result] if isinstance(result, str) else result
+    return sorted(contigs, key=len, reverse=True)
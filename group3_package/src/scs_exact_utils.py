@@ -0,0 +1,194 @@
+import time
+import numpy as np
+from numba import njit
+from typing import Tuple
+
+"""
+Exact shortest common superstring of a substring-free set of strings.
+
+The shortest superstring is the string order with the maximum sum of overlaps of neighbours
+(maximum weight Hamiltonian path in the overlap graph).
+Small sets are solved with Held-Karp bitmask dynamic programming (O(2^n n^2) time, O(2^n n) memory),
+larger sets with branch-and-bound, started from the greedy order.
+"""
+
+
+@njit
+def greedy_path(overlap):
+    """
+    Greedy order: join pairs with the largest overlap first, skipping pairs that would close a cycle.
+    """
+    n = len(overlap)
+    succ = np.full(n, -1, dtype=np.int64)
+    pred = np.full(n, -1, dtype=np.int64)
+    for flat in np.argsort(-overlap.ravel(), kind='mergesort'):
+        i = flat // n
+        j = flat % n
+        if i == j or succ[i] != -1 or pred[j] != -1:
+            continue
+        # j -> ... must not lead back to i
+        k = j
+        while succ[k] != -1:
+            k = succ[k]
+        if k == i:
+            continue
+        succ[i] = j
+        pred[j] = i
+
+    path = np.empty(n, dtype=np.int64)
+    pos = 0
+    for start in range(n):
+        if pred[start] != -1:
+            continue
+        k = start
+        while k != -1:
+            path[pos] = k
+            pos += 1
+            k = succ[k]
+    return path
+
+
+@njit
+def held_karp(overlap):
+    """
+    Order of strings with the maximum sum of overlaps (bitmask dynamic programming).
+
+    dp[mask, last]: maximum overlap sum of a path through the strings of mask, ending with last.
+    """
+    n = len(overlap)
+    full = 1 << n
+    dp = np.full((full, n), -1, dtype=np.int32)
+    parent = np.full((full, n), -1, dtype=np.int8)
+    for i in range(n):
+        dp[1 << i, i] = 0
+    for mask in range(1, full):
+        for last in range(n):
+            current = dp[mask, last]
+            if current < 0:
+                continue
+            for nxt in range(n):
+                if mask & (1 << nxt):
+                    continue
+                new_mask = mask | (1 << nxt)
+                value = current + overlap[last, nxt]
+                if value > dp[new_mask, nxt]:
+                    dp[new_mask, nxt] = value
+                    parent[new_mask, nxt] = last
+
+    path = np.empty(n, dtype=np.int64)
+    mask = full - 1
+    last = np.argmax(dp[mask])
+    for pos in range(n - 1, -1, -1):
+        path[pos] = last
+        prev = parent[mask, last]
+        mask ^= 1 << last
+        last = prev
+    return path
+
+
+@njit
+def _branch_and_bound(overlap, order, best_in, path, next_child, used, best_path, state, node_budget):
+    """
+    Depth-first branch-and-bound over string orders, at most node_budget nodes per call.
+    The search is resumed by calling again with the same arrays.
+
+    order[i]: strings sorted by overlap with string i (largest first), tried in this order after i.
+    best_in[j]: largest overlap of any string with j, the sum over unused strings bounds the remaining gain.
+    state: [depth, current overlap sum, best overlap sum, bound of the remaining gain].
+
+    Returns True when the search is complete (best_path is optimal).
+    """
+    n = len(overlap)
+    depth, current, best, remaining = state[0], state[1], state[2], state[3]
+    nodes = 0
+    finished = False
+    while nodes < node_budget:
+        if depth == n or next_child[depth] >= n:
+            if depth == n and current > best:
+                best = current
+                best_path[:] = path
+            if depth == 0:
+                finished = True
+                break
+            # backtrack
+            depth -= 1
+            c = path[depth]
+            used[c] = False
+            remaining += best_in[c]
+            if depth > 0:
+                current -= overlap[path[depth - 1], c]
+            continue
+
+        if depth == 0:
+            c = next_child[0]
+        else:
+            c = order[path[depth - 1], next_child[depth]]
+        next_child[depth] += 1
+        if used[c]:
+            continue
+        gain = overlap[path[depth - 1], c] if depth > 0 else 0
+        if current + gain + remaining - best_in[c] <= best:
+            continue
+
+        path[depth] = c
+        used[c] = True
+        current += gain
+        remaining -= best_in[c]
+        depth += 1
+        if depth < n:
+            next_child[depth] = 0
+        nodes += 1
+
+    state[0], state[1], state[2], state[3] = depth, current, best, remaining
+    return finished
+
+
+def path_overlap(overlap: np.ndarray, path: np.ndarray) -> int:
+    """Sum of overlaps of neighbours in the order."""
+    return int(overlap[path[:-1], path[1:]].sum()) if len(path) > 1 else 0
+
+
+def branch_and_bound(overlap: np.ndarray, time_limit: float = None,
+                     node_budget: int = 100000) -> Tuple[np.ndarray, bool]:
+    """
+    Order of strings with the maximum sum of overlaps, the greedy order is the initial solution.
+
+    Parameters
+    ----------
+    overlap: np.ndarray, shape (n, n)
+        overlap[i, j]: overlap of string i with string j.
+
+    time_limit: float, default=None
+        Seconds, the best order found so far is returned when the time is over. None: no limit.
+
+    node_budget: int, default=100000
+        Search nodes between two time checks.
+
+    Returns
+    -------
+    path: np.ndarray of int64
+        String order.
+
+    optimal: bool
+        False if the search was stopped by the time limit.
+    """
+    n = len(overlap)
+    overlap = overlap.astype(np.int64)
+    best_path = greedy_path(overlap)
+    if n < 2:
+        return best_path, True
+
+    masked = overlap.copy()
+    np.fill_diagonal(masked, -1)
+    order = np.argsort(-masked, axis=1, kind='mergesort')
+    best_in = masked.max(axis=0)
+    path = np.zeros(n, dtype=np.int64)
+    next_child = np.zeros(n, dtype=np.int64)
+    used = np.zeros(n, dtype=np.bool_)
+    state = np.array([0, 0, path_overlap(overlap, best_path), best_in.sum()], dtype=np.int64)
+
+    start = time.perf_counter()
+    while not _branch_and_bound(overlap, order, best_in, path, next_child, used, best_path, state, node_budget):
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            return best_path, False
+    return best_path, True
@@ -1,6 +1,10 @@
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Tuple
+import itertools
 import multiprocessing as mp
+from multiprocessing import shared_memory
 import numpy as np
+from tqdm import tqdm
+from .sa_utils import calc_pairwise_overlaps_suffix_array, remove_contained
 
 
 def find_overlap_length(a: str, b: str, min_length: int = 1) -> int:
@@ -43,67 +47,348 @@ def get_strings_with_id_dict(strings: List[str]) -> Dict[int, str]:
     return {i: s for i, s in enumerate(strings)}
 
 
-def do_overlaps(strings_start_end: Tuple[list, int, int]) -> List[Tuple[int, int, int]]:
+def drop_contained_reads(strings: List[str]) -> List[str]:
     """
-    Calculate overlaps between strings.
+    Remove duplicates and reads contained in other reads (with a suffix array, see sa_utils.find_contained).
+    Contained reads do not change the superstring, but take part in the quadratic overlap calculation.
+    The number of removed reads is reported.
+    """
+    n_strings = len(strings)
+    strings = remove_contained(strings)
+    tqdm.write(f'Removed {n_strings - len(strings)} duplicate or contained reads of {n_strings}.')
+    return strings
+
+
+# Worker state of calc_pairwise_overlaps_parallel_heap, set once per process by the pool initializer
+_shared_state = {}
 
-    First string is selected so that its index is between start and end,
-    the second string will be each from the string list.
 
+def _init_overlap_worker(text_name: str, offsets: np.ndarray, matrix_name: str, dtype: str, min_length: int):
     """
-    strings, start, end = strings_start_end
-    overlap_sublist = []
+    Attach to shared memory: reads (ASCII bytes) and the result matrix.
+    """
+    text_shm = shared_memory.SharedMemory(name=text_name)
+    matrix_shm = shared_memory.SharedMemory(name=matrix_name)
+    text = bytes(text_shm.buf[:offsets[-1]]).decode('ascii')
+    n = len(offsets) - 1
+    _shared_state.update(
+        shm=(text_shm, matrix_shm),  # keep the segments mapped
+        strings=[text[offsets[i]:offsets[i + 1]] for i in range(n)],
+        matrix=np.ndarray((n, n), dtype=dtype, buffer=matrix_shm.buf),
+        min_length=min_length
+    )
+
+
+def _overlap_rows(start_end: Tuple[int, int]) -> int:
+    """
+    Fill rows start..end of the shared overlap matrix: matrix[i, j] = overlap of string i with string j.
+    """
+    start, end = start_end
+    strings = _shared_state['strings']
+    matrix = _shared_state['matrix']
+    min_length = _shared_state['min_length']
     for i in range(start, end):
-        (id1, s1) = strings[i]
-        for (id2, s2) in strings:
-            if id1 != id2:
-                overlap_len = find_overlap_length(s1, s2)
-                overlap_sublist.append((id1, id2, overlap_len))
-    return overlap_sublist
+        s1 = strings[i]
+        row = matrix[i]
+        for j, s2 in enumerate(strings):
+            if i != j:
+                row[j] = find_overlap_length(s1, s2, min_length=min_length)
+    return end - start
 
 
-def calc_pairwise_overlaps_parallel_heap(strings_dict: Dict[int, str], num_cpu: int) -> List[Tuple[int, int, int]]:
+def calc_pairwise_overlaps_parallel_heap(strings_dict: Dict[int, str], num_cpu: int,
+                                         min_length: int = 1, chunk_size: int = None,
+                                         desc: str = 'Greedy SCS. Initialization.') -> List[Tuple[int, int, int]]:
     """
-    Initial pairwise overlap calculation
+    Initial pairwise overlap calculation in parallel
     (most suitable for heap implementation)
 
+    Reads are placed in shared memory once, workers write overlaps into a shared
+    (n_strings x n_strings) matrix, only row ranges are sent to the workers.
+    Rows are handed out in small chunks, so that faster workers take more of them.
+
     Parameters
     ----------
     strings_dict: dict of (int: str)
         Key: string id, value: string.
 
     num_cpu: int
-    """
-    id_strings_list = list(strings_dict.items())
+        Number of processes, -1: all CPUs.
 
+    min_length: int, default=1
+        Minimum length of the overlap.
+
+    chunk_size: int, default=None
+        Number of rows per task. Default: about 16 tasks per process.
+
+    desc: str
+        Progress bar description.
+
+    Returns
+    -------
+    overlap_list: list of tuples of int
+        Each item is (str_id_1, str_id_2, overlap_length), only pairs with overlap > 0.
+    """
     if num_cpu == -1:
         num_cpu = mp.cpu_count()
 
-    # divide interval [0, len(strings)] into num_cpu parts
-    # f.e. len=10, num_cpu=3: [0, 3, 6, 10]
-    index_list = [0]
-    for j in range(num_cpu):
-        m = int(len(id_strings_list) * (j + 1) / num_cpu)
-        index_list.append(m)
-
-    def iterator(index_list):
-        """
-        returns id_strings_list, start and end indexes
-        """
-        for i in range(len(index_list) - 1):
-            yield id_strings_list, index_list[i], index_list[i + 1]
-
-    # Initial pairwise overlap calculation
-    with mp.Pool(num_cpu) as pool:
-        result = pool.map(do_overlaps, iterator(index_list))  # list of lists
-
-    # Unite the results from different processes
+    ids = np.array(list(strings_dict.keys()), dtype=np.int64)
+    strings = list(strings_dict.values())
+    n = len(strings)
+    if n < 2:
+        return []
+    if chunk_size is None:
+        chunk_size = max(1, n // (16 * num_cpu))
+
+    lengths = np.array([len(s) for s in strings], dtype=np.int64)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    dtype = np.dtype(np.uint16 if lengths.max() <= np.iinfo(np.uint16).max else np.uint32)
+
+    text_shm = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+    matrix_shm = shared_memory.SharedMemory(create=True, size=n * n * dtype.itemsize)
+    try:
+        text_shm.buf[:offsets[-1]] = ''.join(strings).encode('ascii')
+        matrix = np.ndarray((n, n), dtype=dtype, buffer=matrix_shm.buf)
+        matrix[:] = 0
+
+        chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        with mp.Pool(num_cpu, initializer=_init_overlap_worker,
+                     initargs=(text_shm.name, offsets, matrix_shm.name, dtype.str, min_length)) as pool:
+            with tqdm(total=n, desc=desc) as progress:
+                for n_rows in pool.imap_unordered(_overlap_rows, chunks):
+                    progress.update(n_rows)
+
+        rows, cols = np.nonzero(matrix)
+        overlap_list = list(zip(ids[rows].tolist(), ids[cols].tolist(), matrix[rows, cols].tolist()))
+        del matrix  # release the buffer before closing the segment
+    finally:
+        text_shm.close()
+        text_shm.unlink()
+        matrix_shm.close()
+        matrix_shm.unlink()
+    return overlap_list
+
+
+def calc_pairwise_overlaps_seed(strings_dict: Dict[int, str], min_overlap: int,
+                                seed_length: int = None) -> List[Tuple[int, int, int]]:
+    """
+    Initial pairwise overlap calculation, only for candidate pairs found with a k-mer seed index.
+
+    The prefix k-mer (seed) of each string is stored in a hash table.
+    Every suffix (of length >= min_overlap) of the first string is looked up in the table,
+    find_overlap_length is called only for strings whose prefix seed was hit.
+    Work is linear in the total string length plus the number of candidate pairs.
+
+    Parameters
+    ----------
+    strings_dict: dict of (int: str)
+        Key: string id, value: string.
+
+    min_overlap: int
+        Minimum length of the overlap (smaller overlaps are not reported).
+
+    seed_length: int, default=None
+        k-mer length, at most min_overlap (used if None).
+
+    Returns
+    -------
+    overlap_list: list of tuples of int
+        Each item is (str_id_1, str_id_2, overlap_length), only pairs with overlap >= min_overlap.
+    """
+    k = min_overlap if seed_length is None else min(seed_length, min_overlap)
+    if k < 1:
+        raise ValueError(f'Seed length must be positive, got {k}')
+
+    # prefix seed: list of str ids
+    seed_index = {}
+    for id_, s_ in strings_dict.items():
+        if len(s_) >= min_overlap:
+            seed_index.setdefault(s_[:k], []).append(id_)
+
     overlap_list = []
-    for sublist in result:
-        overlap_list += sublist
+    for id1, s1 in strings_dict.items():
+        candidates = set()
+        for start in range(len(s1) - min_overlap + 1):
+            candidates.update(seed_index.get(s1[start:start + k], ()))
+        candidates.discard(id1)
+        for id2 in candidates:
+            overlap_len = find_overlap_length(s1, strings_dict[id2], min_length=min_overlap)
+            if overlap_len > 0:
+                overlap_list.append((id1, id2, overlap_len))
     return overlap_list
 
 
+# base of the polynomial hash of reads (odd, arithmetic modulo 2^64)
+HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _join_equal(keys1: np.ndarray, keys2: np.ndarray,
+                max_pairs: int = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    All index pairs (i, j) with keys1[i] == keys2[j] (sort/join), in chunks of at most max_pairs pairs
+    (a chunk has all pairs of at least one i).
+    """
+    order = np.argsort(keys2, kind='stable')
+    sorted_keys = keys2[order]
+    lo = np.searchsorted(sorted_keys, keys1, side='left')
+    counts = np.searchsorted(sorted_keys, keys1, side='right') - lo
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(keys1):
+        if max_pairs is None:
+            end = len(keys1)
+        else:
+            end = max(int(np.searchsorted(ends, ends[start] - counts[start] + max_pairs, side='right')), start + 1)
+        chunk_counts = counts[start:end]
+        idx1 = np.repeat(np.arange(start, end), chunk_counts)
+        # position inside the group of equal keys
+        group_starts = np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        idx2 = order[np.repeat(lo[start:end], chunk_counts) + np.arange(chunk_counts.sum()) - group_starts]
+        yield idx1, idx2
+        start = end
+
+
+def _longest_per_pair(pairs: np.ndarray, lens: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Last (longest, lengths are increasing) overlap of each pair."""
+    _, last = np.unique(pairs[::-1], return_index=True)
+    last = len(pairs) - 1 - last
+    return pairs[last], lens[last]
+
+
+def calc_pairwise_overlaps_fixed_length(strings_dict: Dict[int, str], min_length: int = 1,
+                                        max_pairs: int = 1 << 22) -> List[Tuple[int, int, int]]:
+    """
+    Initial pairwise overlap calculation for strings of the same length, vectorized.
+
+    Strings are rows of one 2d uint8 array. For each overlap length from min_length, suffixes and prefixes
+    of all strings are hashed (polynomial hash, updated from the previous length) and joined by sorting,
+    candidate pairs are verified by comparing the slices. The longest overlap of each pair is kept.
+
+    Parameters
+    ----------
+    strings_dict: dict of (int: str)
+        Key: string id, value: string. All strings have the same length, no duplicates.
+
+    min_length: int, default=1
+        Minimum length of the overlap.
+
+    max_pairs: int, default=2^22
+        Bases compared at once: candidate pairs are verified in chunks of max_pairs // overlap length.
+        Found pairs are reduced to the longest overlap per pair when they exceed max_pairs and twice the
+        reduced size, so the memory is bounded by the number of overlapping pairs (the output, large for
+        a small min_length) and max_pairs.
+
+    Returns
+    -------
+    overlap_list: list of tuples of int
+        Each item is (str_id_1, str_id_2, overlap_length), only pairs with overlap > 0.
+    """
+    ids = np.array(list(strings_dict.keys()), dtype=np.int64)
+    strings = list(strings_dict.values())
+    if len(strings) < 2:
+        return []
+    length = len(strings[0])
+    if any(len(s) != length for s in strings):
+        raise ValueError('All strings must have the same length')
+    reads = np.frombuffer(''.join(strings).encode('ascii'), dtype=np.uint8).reshape(len(strings), length)
+    reads_hash = reads.astype(np.uint64)
+    min_length = max(min_length, 1)
+
+    powers = np.ones(length, dtype=np.uint64)  # powers[i] = HASH_BASE ** i
+    powers[1:] = np.cumprod(np.full(length - 1, HASH_BASE, dtype=np.uint64))
+    # hashes of the prefixes and suffixes of length min_length - 1
+    prefix_hash = np.zeros(len(strings), dtype=np.uint64)
+    suffix_hash = np.zeros(len(strings), dtype=np.uint64)
+    for i in range(min(min_length, length) - 1):
+        prefix_hash = prefix_hash * HASH_BASE + reads_hash[:, i]
+        suffix_hash = suffix_hash + reads_hash[:, length - 1 - i] * powers[i]
+
+    found_pairs, found_lens = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    new_pairs, new_lens, n_new = [], [], 0
+    # an overlap of the full length would be a duplicate
+    for overlap_len in range(min_length, length):
+        prefix_hash = prefix_hash * HASH_BASE + reads_hash[:, overlap_len - 1]
+        suffix_hash = reads_hash[:, length - overlap_len] * powers[overlap_len - 1] + suffix_hash
+        # the verification compares overlap_len bases per pair
+        for idx1, idx2 in _join_equal(suffix_hash, prefix_hash, max(1, max_pairs // overlap_len)):
+            keep = idx1 != idx2
+            idx1, idx2 = idx1[keep], idx2[keep]
+            # hash collisions
+            keep = (reads[idx1, length - overlap_len:] == reads[idx2, :overlap_len]).all(axis=1)
+            new_pairs.append(idx1[keep] * len(strings) + idx2[keep])
+            new_lens.append(np.full(len(new_pairs[-1]), overlap_len, dtype=np.int64))
+            n_new += len(new_pairs[-1])
+        if n_new > max(max_pairs, 2 * len(found_pairs)):
+            found_pairs, found_lens = _longest_per_pair(np.concatenate([found_pairs] + new_pairs),
+                                                        np.concatenate([found_lens] + new_lens))
+            new_pairs, new_lens, n_new = [], [], 0
+
+    pairs, overlap_lens = _longest_per_pair(np.concatenate([found_pairs] + new_pairs),
+                                            np.concatenate([found_lens] + new_lens))
+    idx1, idx2 = pairs // len(strings), pairs % len(strings)
+    return list(zip(ids[idx1].tolist(), ids[idx2].tolist(), overlap_lens.tolist()))
+
+
+def calc_pairwise_overlaps(strings_dict: Dict[int, str], overlaps: str = 'naive', num_cpu: int = 1,
+                           min_overlap: int = 1,
+                           desc: str = 'Greedy SCS. Initialization.') -> List[Tuple[int, int, int]]:
+    """
+    Initial pairwise overlap calculation.
+
+    Parameters
+    ----------
+    strings_dict: dict of (int: str)
+        Key: string id, value: string.
+
+    overlaps: str, default='naive'
+        'naive': find_overlap_length for each pair of strings (all pairs are returned, also with overlap 0;
+        with num_cpu != 1 only pairs with overlap > 0, see calc_pairwise_overlaps_parallel_heap).
+        If all strings have the same length and num_cpu == 1, 'fixed_length' is used instead.
+        'fixed_length': vectorized, for strings of the same length, see calc_pairwise_overlaps_fixed_length
+        (only pairs with overlap > 0 are returned).
+        'suffix_array': all pairs suffix-prefix matching on a suffix array
+        (only pairs with overlap > 0 are returned).
+        'seed': find_overlap_length only for pairs sharing a k-mer seed, see calc_pairwise_overlaps_seed
+        (only pairs with overlap > 0 are returned).
+
+    num_cpu: int, default=1
+        Number of processes for the 'naive' method.
+
+    min_overlap: int, default=1
+        Minimum length of the overlap (smaller overlaps are reported as 0).
+
+    desc: str
+        Progress bar description.
+
+    Returns
+    -------
+    overlap_list: list of tuples of int
+        Each item is (str_id_1, str_id_2, overlap_length).
+    """
+    if overlaps == 'naive' and num_cpu == 1 and len(strings_dict) > 1 \
+            and len(set(map(len, strings_dict.values()))) == 1:
+        overlaps = 'fixed_length'
+
+    if overlaps == 'naive':
+        if num_cpu != 1:
+            return calc_pairwise_overlaps_parallel_heap(strings_dict, num_cpu, min_length=min_overlap, desc=desc)
+        overlap_list = []
+        for (id1, s1), (id2, s2) in tqdm(itertools.permutations(strings_dict.items(), r=2),
+                                         desc=desc,
+                                         total=len(strings_dict) ** 2 - len(strings_dict)):
+            overlap_list.append((id1, id2, find_overlap_length(s1, s2, min_length=min_overlap)))
+        return overlap_list
+    elif overlaps == 'fixed_length':
+        return calc_pairwise_overlaps_fixed_length(strings_dict, min_length=min_overlap)
+    elif overlaps == 'suffix_array':
+        return calc_pairwise_overlaps_suffix_array(strings_dict, min_length=min_overlap)
+    elif overlaps == 'seed':
+        return calc_pairwise_overlaps_seed(strings_dict, min_overlap)
+    else:
+        raise RuntimeError(f'Wrong overlaps value {overlaps}')
+
+
 def remove_rows_cols(matrix, indexes):
     matrix = np.delete(matrix, indexes, axis=0)
     matrix = np.delete(matrix, indexes, axis=1)
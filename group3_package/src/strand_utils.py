@@ -0,0 +1,123 @@
+from typing import Dict, List, Tuple
+from tqdm import tqdm
+from .sa_utils import find_contained
+from .scs_utils import find_overlap_length
+
+"""
+Overlaps of reads from both DNA strands.
+
+Oriented read (or contig) ids: 2 * str_id is the read as given, 2 * str_id + 1 its reverse complement.
+The end of u overlapping with the start of v is the same overlap as the end of v^1 overlapping with
+the start of u^1 (reverse complements), so only one of the two oriented pairs is stored: canonical_pair.
+For a pair of reads that leaves 4 overlaps instead of 8 with both strands given as separate reads.
+"""
+
+COMPLEMENT = str.maketrans('ACGTNacgtn', 'TGCANtgcan')
+
+
+def reverse_complement(s: str) -> str:
+    return s.translate(COMPLEMENT)[::-1]
+
+
+def canonical_kmer(kmer: str) -> str:
+    """The k-mer or its reverse complement, whichever is smaller (same for both strands)."""
+    return min(kmer, reverse_complement(kmer))
+
+
+def canonical_pair(u: int, v: int) -> Tuple[int, int]:
+    """Representative of the oriented pair (u, v) and its mirror (v^1, u^1)."""
+    return min((u, v), (v ^ 1, u ^ 1))
+
+
+def oriented_strings(strings_dict: Dict[int, str]) -> Dict[int, str]:
+    """Oriented id: string, for both strands of every string."""
+    oriented = {}
+    for id_, s_ in strings_dict.items():
+        oriented[2 * id_] = s_
+        oriented[2 * id_ + 1] = reverse_complement(s_)
+    return oriented
+
+
+def drop_contained_reads_both_strands(strings: List[str]) -> List[str]:
+    """
+    Remove reads that equal or are contained in another read or its reverse complement.
+    The number of removed reads is reported.
+    """
+    n_strings = len(strings)
+    # one strand of each distinct read
+    strings = list(dict.fromkeys(canonical_kmer(s) for s in strings))
+    # reverse complements of palindromes are the reads themselves
+    seen = set(strings)
+    doubled = strings + [rc for rc in map(reverse_complement, strings) if rc not in seen]
+    contained = find_contained(doubled)[:len(strings)]
+    strings = [s for s, is_contained in zip(strings, contained) if not is_contained]
+    tqdm.write(f'Removed {n_strings - len(strings)} duplicate or contained reads (both strands) of {n_strings}.')
+    return strings
+
+
+def calc_pairwise_overlaps_both_strands(strings_dict: Dict[int, str], min_overlap: int,
+                                        seed_length: int = None) -> List[Tuple[int, int, int]]:
+    """
+    Initial pairwise overlap calculation for both strands, only for candidate pairs found with canonical k-mers.
+
+    The canonical prefix and suffix k-mers of each string are stored in a hash table, so each string is indexed
+    once for both strands. Every k-mer of the first string (as given) is looked up:
+    - equal to the prefix of string j: end of the string may overlap with j,
+    - reverse complement of the suffix of j: end of the string may overlap with j reverse complemented,
+    - reverse complement of the prefix of j: end of the reverse complement may overlap with j.
+    The remaining combinations are mirrors of these (found when the other string is scanned).
+
+    Parameters
+    ----------
+    strings_dict: dict of (int: str)
+        Key: string id, value: string.
+
+    min_overlap: int
+        Minimum length of the overlap (smaller overlaps are not reported).
+
+    seed_length: int, default=None
+        k-mer length, at most min_overlap (used if None).
+
+    Returns
+    -------
+    overlap_list: list of tuples of int
+        Each item is (oriented_id_1, oriented_id_2, overlap_length), see canonical_pair,
+        only pairs with overlap >= min_overlap.
+    """
+    k = min_overlap if seed_length is None else min(seed_length, min_overlap)
+    if k < 1:
+        raise ValueError(f'Seed length must be positive, got {k}')
+    oriented = oriented_strings(strings_dict)
+
+    # canonical k-mer: list of (str_id, k-mer, is_prefix)
+    seed_index = {}
+    for id_, s_ in strings_dict.items():
+        if len(s_) >= min_overlap:
+            seed_index.setdefault(canonical_kmer(s_[:k]), []).append((id_, s_[:k], True))
+            seed_index.setdefault(canonical_kmer(s_[-k:]), []).append((id_, s_[-k:], False))
+
+    overlap_dict = {}
+    for id1, s1 in strings_dict.items():
+        candidates = set()
+        rc_s1 = oriented[2 * id1 + 1]
+        for start in range(len(s1) - k + 1):
+            kmer = s1[start:start + k]
+            rc_kmer = rc_s1[len(s1) - start - k:len(s1) - start]
+            hits = seed_index.get(min(kmer, rc_kmer), ())
+            if not hits:
+                continue
+            overlap_from_start = len(s1) - start >= min_overlap  # overlap would start here
+            overlap_to_end = start + k >= min_overlap  # overlap of the reverse complement would end here
+            for id2, seed, is_prefix in hits:
+                if id2 == id1:
+                    continue
+                if is_prefix and seed == kmer and overlap_from_start:
+                    candidates.add(canonical_pair(2 * id1, 2 * id2))
+                if not is_prefix and seed == rc_kmer and overlap_from_start:
+                    candidates.add(canonical_pair(2 * id1, 2 * id2 + 1))
+                if is_prefix and seed == rc_kmer and overlap_to_end:
+                    candidates.add(canonical_pair(2 * id1 + 1, 2 * id2))
+        for u, v in candidates:
+            if (u, v) not in overlap_dict:
+                overlap_dict[(u, v)] = find_overlap_length(oriented[u], oriented[v], min_length=min_overlap)
+    return [(u, v, overlap_len) for (u, v), overlap_len in overlap_dict.items() if overlap_len > 0]
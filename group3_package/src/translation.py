@@ -3,25 +3,52 @@
 import re
 from Bio.Blast import NCBIWWW
 import time
+from typing import Iterable, Iterator, Tuple
+from .blast_cache import BlastCache, blast_key
 
 #input = merged sequence
 #dna = "AAAGGCCCTCTCTTTGAGAACCTCTCTAGCCCCATTTCGC"
 
+# DNA (IUPAC codes, upper or lower case) -> complementary RNA strand and same strand RNA
+# ambiguity codes are complemented as sets: R = A/G <-> Y = C/T, K = G/T <-> M = A/C,
+# B = not A <-> V = not T, D = not C <-> H = not G, S, W and N are their own complements
+IUPAC_DNA = "ACGTRYSWKMBDHVN"
+TO_RNA_COMP = str.maketrans(IUPAC_DNA + IUPAC_DNA.lower(), "UGCAYRSWMKVHDBN" + "UGCAYRSWMKVHDBN".lower())
+TO_RNA = str.maketrans("Tt", "Uu")
+INVALID_DNA = str.maketrans("", "", IUPAC_DNA + IUPAC_DNA.lower())  # deletes all valid characters
+
+
 def transcribe(dna):
     #transcribe dna to rna
-    #input: dna as str
-    #output: two str
+    #input: dna as str (IUPAC codes)
+    #output: two str, complementary strand (not reversed) and same strand
+    #str.translate makes one pass over the sequence for each strand (linear time)
 
-    to_rna = {"A": "U", "T": "A", "C": "G", "G": "C"}  # for complimentary strand
-    rna_comp = ""  # empty string
-    for base in dna:  # for each base find complimentary base and add to rna string
-        rna_comp = rna_comp + to_rna[base]
+    invalid = dna.translate(INVALID_DNA)
+    if invalid:
+        raise ValueError(f"Not a DNA sequence, unknown bases {sorted(set(invalid))}")
 
-    rna = dna.replace("T", "U")  # for same strand
+    rna_comp = dna.translate(TO_RNA_COMP)  # for complimentary strand
+    rna = dna.translate(TO_RNA)  # for same strand
 
     return rna_comp, rna
 
 
+def transcribe_chunks(dna_chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    #streaming transcribe for genome-scale sequences, f.e. lines of a FASTA record
+    #input: dna chunks (str)
+    #output: (rna_comp, rna) for each chunk, concatenated they are transcribe of the whole sequence
+
+    for chunk in dna_chunks:
+        yield transcribe(chunk)
+
+
+def iter_chunks(seq: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    #split a sequence into chunks of chunk_size characters (for transcribe_chunks)
+    for start in range(0, len(seq), chunk_size):
+        yield seq[start:start + chunk_size]
+
+
 def translate(mrna):
     #translate mrna to protein (open reading frame)
     #input: mrna str
@@ -65,11 +92,16 @@ def translate(mrna):
 # sequence = "MALWMRLLPLLALLALWGPDPAAAFVNQHLCGSHLVEALYLVCGERGFFYTPKTRREAEDLQVGQVELGGGPGAGSLQPLALEGSLQKRGIVEQCCTSICSLYQLENYCN"
 # 'insulin isoform UB [Homo sapiens]'
 
-def request_blastp(sequence):
+def request_blastp(sequence, cache: BlastCache = None):
     # input: amino acid sequence: str
+    #        cache: BLAST results of previous queries, consulted before the remote search
     # output: predicted protein: str
     # this function requests results in BLAST
 
+    if cache is not None:
+        return cache.get_or_fetch(blast_key(sequence, program="blastp", database="nr"),
+                                  lambda: request_blastp(sequence))
+
     # limit requests to once every 10 seconds, because in the blast API documentation: "Do not contact the server more often than once every 10 seconds."
     time.sleep(11)
     result_handle = NCBIWWW.qblast("blastp", "nr", sequence)
@@ -79,4 +111,3 @@ def request_blastp(sequence):
         return data
     except:
         return -1
-
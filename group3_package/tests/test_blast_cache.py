@@ -0,0 +1,84 @@
+"""Tests for the BLAST result cache."""
+
+import pytest
+from src import blast_cache, translation
+
+
+class TestBlastCache:
+
+    def test_get_put(self, tmp_path):
+        """results are stored as JSON, hits and misses are counted"""
+        cache = blast_cache.BlastCache(str(tmp_path / "blast.sqlite"))
+        key = blast_cache.blast_key("MKV", program="blastp", database="nr")
+        assert key != blast_cache.blast_key("MKV", program="blastp", database="pdb")
+        assert cache.get(key) is None
+        cache.put(key, ["protein a", "protein b"], seconds=12.5)
+        assert cache.get(key) == ["protein a", "protein b"]
+
+        # shared by all cache objects of the same file
+        stats = blast_cache.BlastCache(str(tmp_path / "blast.sqlite")).stats()
+        assert stats == {"hits": 1, "misses": 1, "saved_seconds": 12.5, "entries": 1}
+
+    def test_ttl_and_size(self, tmp_path):
+        """expired entries are not used, least recently used entries are removed"""
+        cache = blast_cache.BlastCache(str(tmp_path / "blast.sqlite"), ttl=-1)
+        cache.put("a", "protein a")
+        assert cache.get("a") is None
+
+        cache = blast_cache.BlastCache(str(tmp_path / "blast2.sqlite"), max_entries=2)
+        cache.put("a", "protein a")
+        cache.put("b", "protein b")
+        cache.get("a")
+        cache.put("c", "protein c")
+        assert cache.get("b") is None
+        assert cache.get("a") == "protein a" and cache.get("c") == "protein c"
+
+    def test_request_blastp_cached(self, tmp_path, monkeypatch):
+        """cached results are returned without a remote search"""
+        cache = blast_cache.BlastCache(str(tmp_path / "blast.sqlite"))
+        calls = []
+
+        def qblast(program, database, sequence):
+            calls.append(sequence)
+            raise ConnectionError
+        monkeypatch.setattr(translation.time, "sleep", lambda seconds: None)
+        monkeypatch.setattr(translation.NCBIWWW, "qblast", qblast)
+        with pytest.raises(ConnectionError):  # errors are not cached
+            translation.request_blastp("MKV", cache=cache)
+
+        cache.put(blast_cache.blast_key("MKV", program="blastp", database="nr"), "protein MKV")
+        assert translation.request_blastp("MKV", cache=cache) == "protein MKV"
+        assert calls == ["MKV"]
+
+    def test_blast_website_cached_per_query(self, tmp_path, monkeypatch):
+        """only sequences missing in the cache are searched, in any batch and order"""
+        from src import blast
+        searched = []
+
+        def search_website(seqs, docker=True):
+            searched.append(list(seqs))
+            return [[f"hit of {seq}"] for seq in seqs]
+
+        monkeypatch.setattr(blast, "search_website", search_website)
+        cache = blast_cache.BlastCache(str(tmp_path / "blast.sqlite"))
+        assert blast.blast_website(["MKV", "MAA"], cache=cache) == ["hit of MKV", "hit of MAA"]
+        assert blast.blast_website(["MAA", "MWW", "MKV", "MWW"], cache=cache) == \
+            ["hit of MAA", "hit of MWW", "hit of MKV", "hit of MWW"]
+        assert searched == [["MKV", "MAA"], ["MWW"]]
+        assert blast.blast_website(["MKV"], cache=cache) == ["hit of MKV"]
+        assert len(searched) == 2
+
+    def test_blast_website_failed_lookup_not_cached(self, tmp_path, monkeypatch):
+        """a query without a valid report has no hits and is searched again next time"""
+        from src import blast
+        searched = []
+
+        def search_website(seqs, docker=True):
+            searched.append(list(seqs))
+            return [None if seq == "MAA" and len(searched) == 1 else [f"hit of {seq}"] for seq in seqs]
+
+        monkeypatch.setattr(blast, "search_website", search_website)
+        cache = blast_cache.BlastCache(str(tmp_path / "blast.sqlite"))
+        assert blast.blast_website(["MKV", "MAA"], cache=cache) == ["hit of MKV"]
+        assert blast.blast_website(["MKV", "MAA"], cache=cache) == ["hit of MKV", "hit of MAA"]
+        assert searched == [["MKV", "MAA"], ["MAA"]]
@@ -0,0 +1,125 @@
+"""Tests for the asynchronous BLAST client, against a local mock of the BLAST URL API."""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from src import blast_client
+from src.blast_cache import BlastCache
+
+
+HITS = {"MALWMRLLPLLALLALWGPD": "insulin [Homo sapiens]", "MKTAYIAKQRQISFVKSHFS": "protein one [Mus musculus]"}
+
+
+def report(queries):
+    iterations = []
+    for i, query in enumerate(queries):
+        hits = ""
+        if query in HITS:
+            hits = (f"<Hit><Hit_def>{HITS[query]}</Hit_def><Hit_accession>NP_{i}</Hit_accession>"
+                    "<Hit_hsps><Hsp><Hsp_bit-score>42.5</Hsp_bit-score><Hsp_evalue>1e-10</Hsp_evalue></Hsp>"
+                    "</Hit_hsps></Hit>")
+        iterations.append(f"<Iteration><Iteration_query-def>q{i}</Iteration_query-def>"
+                          f"<Iteration_hits>{hits}</Iteration_hits></Iteration>")
+    # iterations in reverse order, queries are matched by name
+    return ("<?xml version=\"1.0\"?><BlastOutput><BlastOutput_iterations>"
+            + "".join(reversed(iterations)) + "</BlastOutput_iterations></BlastOutput>")
+
+
+class MockBlast(BaseHTTPRequestHandler):
+    jobs = {}  # RID: [queries, number of status polls]
+    requests = []
+
+    def _send(self, text):
+        body = text.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        params = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        MockBlast.requests.append((time.monotonic(), "Put"))
+        queries = params["QUERY"][0].split("\n")[1::2]
+        rid = f"RID{len(MockBlast.jobs)}"
+        MockBlast.jobs[rid] = [queries, 0]
+        self._send(f"<!--QBlastInfoBegin\n    RID = {rid}\n    RTOE = 0\nQBlastInfoEnd\n-->")
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        MockBlast.requests.append((time.monotonic(), params.get("FORMAT_OBJECT", "XML")))
+        job = MockBlast.jobs[params["RID"]]
+        if params.get("FORMAT_OBJECT") == "SearchInfo":
+            job[1] += 1
+            status = "READY" if job[1] >= 2 else "WAITING"  # ready at the second poll
+            if "FAIL" in job[0]:
+                status = "FAILED"
+            self._send(f"QBlastInfoBegin\n    Status={status}\nQBlastInfoEnd")
+        else:
+            self._send(report(job[0]))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_url():
+    MockBlast.jobs, MockBlast.requests = {}, []
+    server = HTTPServer(("127.0.0.1", 0), MockBlast)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/Blast.cgi"
+    server.shutdown()
+
+
+def fast_client(url, rate=1000.):
+    return blast_client.BlastClient(url=url, rate_limit=blast_client.TokenBucket(rate), batch_size=2,
+                                    poll_interval=0.01, max_poll_interval=0.05)
+
+
+class TestBlastClient:
+
+    def test_search(self, mock_url):
+        """batches are submitted as jobs, polled until ready, hits are parsed from XML"""
+        queries = ["MALWMRLLPLLALLALWGPD", "AAAA", "MKTAYIAKQRQISFVKSHFS"]
+        hits = asyncio.run(fast_client(mock_url).search(queries))
+        assert [[hit.definition for hit in query_hits] for query_hits in hits] == \
+               [["insulin [Homo sapiens]"], [], ["protein one [Mus musculus]"]]
+        assert hits[0][0].evalue == 1e-10 and hits[0][0].accession == "NP_0"
+        assert len(MockBlast.jobs) == 2
+        assert [request for _, request in MockBlast.requests].count("SearchInfo") == 4
+
+    def test_rate_limit(self, mock_url):
+        """requests of concurrent jobs are spaced by the shared token bucket"""
+        asyncio.run(fast_client(mock_url, rate=50.).search(["AAAA"] * 6))
+        times = sorted(t for t, _ in MockBlast.requests)
+        assert len(times) == 12
+        assert times[-1] - times[0] >= 11 / 50 * 0.9
+
+    def test_shared_rate_limit(self, tmp_path):
+        """buckets with the same file (f.e. in different processes) share the tokens"""
+        path = str(tmp_path / "limits" / "ncbi_rate_limit")
+        first, second = blast_client.TokenBucket(rate=1., path=path), blast_client.TokenBucket(rate=1., path=path)
+        assert first.reserve() == 0.
+        assert 0.9 < second.reserve() <= 1.
+        assert 1.9 < first.reserve() <= 2.
+        assert blast_client.TokenBucket(rate=1.).reserve() == 0.
+
+    def test_blast_proteins_cached(self, mock_url, tmp_path):
+        """best hit or -1 like request_blastp, cached queries are not searched"""
+        cache = BlastCache(str(tmp_path / "blast.sqlite"))
+        queries = ["MALWMRLLPLLALLALWGPD", "AAAA", "MALWMRLLPLLALLALWGPD"]
+        assert blast_client.blast_proteins(queries, cache, fast_client(mock_url)) == \
+               ["insulin [Homo sapiens]", -1, "insulin [Homo sapiens]"]
+        assert len(MockBlast.jobs) == 1
+        assert blast_client.blast_proteins(queries[:2], cache, fast_client(mock_url)) == \
+               ["insulin [Homo sapiens]", -1]
+        assert len(MockBlast.jobs) == 1
+        assert cache.stats()["hits"] == 2
+
+    def test_failed_job(self, mock_url):
+        """a failed job is an error"""
+        with pytest.raises(RuntimeError):
+            asyncio.run(fast_client(mock_url).search(["FAIL"]))
@@ -0,0 +1,40 @@
+"""Tests for the disk cache."""
+
+import os
+import numpy as np
+from src import cache_utils
+
+
+class TestCacheUtils:
+
+    def test_save_load(self, tmp_path):
+        """arrays are loaded memory-mapped"""
+        cache = cache_utils.DiskCache(str(tmp_path))
+        assert cache.load('a') is None
+        cache.save('a', {'x': np.arange(5), 'y': np.empty(0, dtype=np.uint8)})
+        arrays = cache.load('a')
+        assert isinstance(arrays['x'], np.memmap)
+        assert arrays['x'].tolist() == [0, 1, 2, 3, 4]
+        assert arrays['y'].dtype == np.uint8 and len(arrays['y']) == 0
+
+    def test_lru_eviction(self, tmp_path):
+        """least recently used entries are removed above max_bytes, the new entry is kept"""
+        cache = cache_utils.DiskCache(str(tmp_path), max_bytes=2500)
+        for key, mtime in [('a', 1), ('b', 2)]:
+            cache.save(key, {'x': np.zeros(1000, dtype=np.uint8)})
+            os.utime(tmp_path / key, (mtime, mtime))
+        cache.load('a')  # b is now the least recently used
+        cache.save('c', {'x': np.zeros(1000, dtype=np.uint8)})
+        assert 'a' in cache and 'c' in cache and 'b' not in cache
+
+        cache.save('d', {'x': np.zeros(5000, dtype=np.uint8)})
+        assert list(cache.entries()) == ['d']
+
+    def test_file_digest(self, tmp_path):
+        """digest changes with the content"""
+        path_x = tmp_path / "reads.fa"
+        path_x.write_text(">a\nACGT\n")
+        digest = cache_utils.file_digest(str(path_x), chunk_size=3)
+        assert digest == cache_utils.file_digest(str(path_x))
+        path_x.write_text(">a\nACGA\n")
+        assert digest != cache_utils.file_digest(str(path_x))
@@ -0,0 +1,16 @@
+import numpy as np
+from src import component_utils
+
+
+class TestComponentUtils:
+    def test_connected_components(self):
+        edges = np.array([[0, 2], [3, 4], [2, 5]], dtype=np.int64)
+
+        labels = component_utils.connected_components(6, edges)
+        assert labels.tolist() == [0, 1, 0, 2, 2, 0]
+
+    def test_split_into_components(self):
+        strings = ['ABCDEF', 'XYZUVW', 'DEFGHI', 'UVWRST', 'QQQQQQ']
+
+        result = component_utils.split_into_components(strings, min_overlap=3)
+        assert result == [['ABCDEF', 'DEFGHI'], ['XYZUVW', 'UVWRST'], ['QQQQQQ']]
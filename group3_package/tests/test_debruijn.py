@@ -0,0 +1,51 @@
+import random
+from src import debruijn
+from src import read_store
+
+
+class TestDebruijn:
+    def test_encode_decode(self):
+        codes, offsets = debruijn.encode_reads(['ACGT', 'TTGCA'])
+        assert codes.tolist() == [0, 1, 2, 3, 3, 3, 2, 1, 0]
+        assert offsets.tolist() == [0, 4, 9]
+        assert debruijn.decode(codes) == 'ACGTTTGCA'
+
+    def test_count_kmers(self):
+        codes, offsets = debruijn.encode_reads(['ACGAC', 'ACGNA'])
+        keys, counts = debruijn.count_kmers(codes, offsets, 3)
+        kmer_counts = {debruijn.decode([(key >> 4) & 3, (key >> 2) & 3, key & 3]): count
+                       for key, count in zip(keys, counts) if key != debruijn.EMPTY}
+        assert kmer_counts == {'ACG': 2, 'CGA': 1, 'GAC': 1}
+
+    def test_count_kmers_grows(self, monkeypatch):
+        """the table grows from a small start and is sized by the distinct k-mers, not the coverage"""
+        monkeypatch.setattr(debruijn, 'INITIAL_KEYS', 4)
+        rng = random.Random(0)
+        genome = ''.join(rng.choice('ACGT') for _ in range(2000))
+        reads = [genome[i: i + 100] for i in range(0, 1901, 5)]  # coverage 20
+        codes, offsets = debruijn.encode_reads(reads)
+        keys, counts = debruijn.count_kmers(codes, offsets, 21)
+        n_distinct = (keys != debruijn.EMPTY).sum()
+        assert n_distinct == len(set(genome[i: i + 21] for i in range(len(genome) - 20)))
+        assert counts.sum() == len(reads) * 80
+        assert len(keys) <= 2 * debruijn._table_capacity(n_distinct)
+
+    def test_assemble_debruijn(self):
+        assert debruijn.assemble_debruijn(['ACGTTGCA', 'GTTGCAAT'], k=4) == ['ACGTTGCAAT']
+
+    def test_assemble_debruijn_genome(self):
+        rng = random.Random(0)
+        genome = ''.join(rng.choice('ACGT') for _ in range(2000))
+        reads = [genome[i: i + 100] for i in range(0, 1901, 10)]
+
+        assert debruijn.assemble_debruijn(reads, k=31) == [genome]
+
+    def test_assemble_debruijn_min_count(self):
+        reads = ['ACGTTGCA', 'ACGTTGCA', 'GGGGCCCC']
+
+        assert debruijn.assemble_debruijn(reads, k=4, min_count=2) == ['ACGTTGCA']
+
+    def test_assemble_debruijn_read_store(self):
+        store = read_store.ReadStore.from_strings(['ACGTTGCA', 'GTTGCAAT'])
+
+        assert debruijn.assemble_debruijn(store, k=4) == ['ACGTTGCAAT']
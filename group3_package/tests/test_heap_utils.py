@@ -26,3 +26,43 @@ class TestHeapUtils:
         heap = heap_utils.create_max_heap(items)
         heap.push((5, 6, 7))
         assert heap.pop_max() == (5, 6, 7)
+
+    def test_is_empty(self):
+        items = [(1, 2, 2), (2, 3, 4)]
+
+        heap = heap_utils.create_max_heap(items)
+        heap.delete((2, 3)).delete((1, 2))
+        assert heap.is_empty()
+        assert heap_utils.create_max_heap([]).is_empty()
+
+    def test_bucket_queue(self):
+        items = [(1, 2, 2), (2, 3, 4), (3, 4, 3), (4, 2, 1)]
+
+        queue = heap_utils.create_bucket_queue(items)
+        assert queue.pop_max() == (2, 3, 4)
+        queue.delete((3, 4))
+        assert queue.pop_max() == (1, 2, 2)
+        queue.push((5, 6, 7))
+        assert queue.pop_max() == (5, 6, 7)
+        assert queue.pop_max() == (4, 2, 1)
+        assert queue.is_empty()
+
+    def test_compaction(self):
+        items = [(i, i + 1, i) for i in range(10)]
+
+        heap = heap_utils.create_max_heap(items, compaction_fraction=0.5)
+        for i in range(5):
+            heap.delete((i, i + 1))
+        assert heap.n_live() == 5 and heap.n_dead == 5
+        heap.delete((5, 6))
+        assert len(heap.heap) == 4 and heap.n_dead == 0
+        assert heap.pop_max() == (9, 10, 9)
+
+    def test_bucket_queue_compaction(self):
+        items = [(i, i + 1, i) for i in range(10)]
+
+        queue = heap_utils.create_bucket_queue(items, compaction_fraction=0.5)
+        for i in range(6):
+            queue.delete((i, i + 1))
+        assert queue.n_live() == 4 and queue.n_dead == 0
+        assert queue.pop_max() == (9, 10, 9)
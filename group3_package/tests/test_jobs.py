@@ -0,0 +1,127 @@
+"""Tests for the background jobs of the API."""
+
+import os
+import time
+import numpy as np
+import pytest
+from src import protein_index
+from src.api import jobs
+
+
+# one codon per amino acid
+CODONS = {'A': 'GCT', 'C': 'TGT', 'D': 'GAT', 'E': 'GAA', 'F': 'TTT', 'G': 'GGT', 'H': 'CAT', 'I': 'ATT',
+          'K': 'AAA', 'L': 'CTT', 'M': 'ATG', 'N': 'AAT', 'P': 'CCT', 'Q': 'CAA', 'R': 'CGT', 'S': 'TCT',
+          'T': 'ACT', 'V': 'GTT', 'W': 'TGG', 'Y': 'TAT'}
+
+
+def wait(job, timeout=120.):
+    start = time.monotonic()
+    while job.final_status is None:
+        assert time.monotonic() - start < timeout
+        time.sleep(0.05)
+    return job
+
+
+@pytest.fixture
+def reads_and_index(tmp_path):
+    """reads of a gene coding a 150 aa protein and a protein index with it"""
+    rng = np.random.default_rng(0)
+    protein = 'M' + ''.join(rng.choice(list(CODONS), size=149))
+    gene = 'CCGCC' + ''.join(CODONS[amino_acid] for amino_acid in protein) + 'TAACCGCC'
+    reads = [gene[i:i + 60] for i in range(0, len(gene) - 40, 20)]
+    index = protein_index.ProteinIndex.build([('sp|P1|GENE the protein', protein)])
+    index.save(str(tmp_path / 'index'))
+
+    def write_reads(name='reads.fa'):
+        path = tmp_path / name
+        path.write_text(''.join(f'>r{i}\n{read}\n' for i, read in enumerate(reads)))
+        return str(path)
+    return gene, protein, write_reads, str(tmp_path / 'index')
+
+
+class TestJobManager:
+
+    def test_job(self, reads_and_index):
+        """job assembles the reads, transcribes the contig and identifies the protein, the upload is removed"""
+        gene, protein, write_reads, index_path = reads_and_index
+        manager = jobs.JobManager(max_running=1, min_overlap=20, protein_index=index_path)
+        try:
+            path = write_reads()
+            job = wait(manager.submit(path))
+        finally:
+            manager.shutdown()
+        assert job.status == 'done' and job.error is None
+        assert job.result['contigs'] == [gene]
+        assert job.result['mRNA'] == gene.replace('T', 'U')
+        assert protein in job.result['amino_acids']
+        # nested ORFs (from the internal M) get the protein of the whole ORF
+        found = job.result['amino_acids_and_proteins']
+        assert found[protein] == 'sp|P1|GENE the protein'
+        assert all(len(amino_acid) > jobs.MIN_PROTEIN_LENGTH for amino_acid in found)
+        assert all(name == found[protein] for amino_acid, name in found.items() if protein.endswith(amino_acid))
+        assert all(name == -1 for amino_acid, name in found.items() if not protein.endswith(amino_acid))
+        assert 'contigs' not in job.to_dict() and job.to_dict()['status'] == 'done'
+        assert manager.get(job.id) is job
+        assert not os.path.exists(path)
+
+    def test_failed_job(self, tmp_path):
+        """error of a stage is stored in the job"""
+        path = tmp_path / 'reads.txt'
+        path.write_text('not a FASTA or FASTQ file\n')
+        manager = jobs.JobManager(max_running=1)
+        try:
+            job = wait(manager.submit(str(path)))
+        finally:
+            manager.shutdown()
+        assert job.status == 'failed'
+        assert 'ValueError' in job.error
+        assert 'assembled_dna' not in job.result
+
+    def test_queue_full(self, reads_and_index):
+        """more unfinished jobs than max_running + max_queued are rejected, queued jobs can be cancelled"""
+        _, _, write_reads, index_path = reads_and_index
+        manager = jobs.JobManager(max_running=1, max_queued=1, min_overlap=20, protein_index=index_path)
+        try:
+            first = manager.submit(write_reads('first.fa'))
+            second = manager.submit(write_reads('second.fa'))
+            with pytest.raises(jobs.QueueFull):
+                manager.submit(write_reads('third.fa'))
+            manager.cancel(second.id)
+            wait(first)
+            wait(second)
+            assert first.status == 'done'
+            assert second.status in ('cancelled', 'done')
+            manager.submit(write_reads('fourth.fa'))
+        finally:
+            manager.shutdown()
+
+    def test_cancel_removes_upload(self, reads_and_index):
+        """a job cancelled before it runs removes its uploaded file"""
+        _, _, write_reads, index_path = reads_and_index
+        manager = jobs.JobManager(max_running=1, max_queued=2, min_overlap=20, protein_index=index_path)
+        try:
+            # the first two jobs may already be handed to the worker, the third one waits in the executor
+            first = manager.submit(write_reads('first.fa'))
+            manager.submit(write_reads('second.fa'))
+            path = write_reads('third.fa')
+            third = manager.submit(path)
+            assert manager.cancel(third.id)
+            wait(third)
+            assert third.status == 'cancelled'
+            assert not os.path.exists(path)
+            wait(first)
+        finally:
+            manager.shutdown()
+
+    def test_forget_finished(self, tmp_path):
+        """only the latest max_kept finished jobs are kept"""
+        manager = jobs.JobManager(max_running=1, max_kept=2)
+        try:
+            finished = []
+            for i in range(4):
+                path = tmp_path / f'reads{i}.txt'
+                path.write_text('not reads\n')
+                finished.append(wait(manager.submit(str(path))))
+        finally:
+            manager.shutdown()
+        assert list(manager.jobs) == [job.id for job in finished[1:]]
@@ -0,0 +1,28 @@
+from src import layout_utils
+
+
+class TestLayoutUtils:
+    def test_merge(self):
+        layouts = layout_utils.ContigLayouts({0: 'ABCD', 1: 'CDEF', 2: 'EFGH'})
+        layouts.merge(0, 1, 2, 3)
+        layouts.merge(3, 2, 2, 4)
+
+        assert layouts.ids() == [4]
+        assert layouts.sequence(4) == 'ABCDEFGH'
+        assert list(layouts.layout(4)) == [(0, 0), (1, 2), (2, 4)]
+
+    def test_head_tail(self):
+        layouts = layout_utils.ContigLayouts({0: 'ABCD', 1: 'CDEF', 2: 'XY'})
+        layouts.merge(0, 1, 2, 3)
+        layouts.merge(3, 2, 0, 4)
+
+        assert layouts.head(4) == 'ABCD'
+        assert layouts.tail(4) == 'EFXY'
+
+    def test_contained_read(self):
+        layouts = layout_utils.ContigLayouts({0: 'ABCDE', 1: 'DE', 2: 'EFG'})
+        layouts.merge(0, 1, 2, 3)
+        layouts.merge(3, 2, 1, 4)
+
+        assert layouts.sequence(4) == 'ABCDEFG'
+        assert layouts.tail(4) == 'CDEFG'
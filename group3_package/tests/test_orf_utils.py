@@ -0,0 +1,60 @@
+"""Tests for the six-frame ORF finder."""
+
+from src import orf_utils
+from src.translation import translate
+
+
+class TestOrfUtils:
+
+    def test_find_orfs(self):
+        """ORFs on both strands, coordinates on the given sequence"""
+        seq = "CCATGAAATAGATGCCCTTTGGGCATN"
+        orfs = orf_utils.find_orfs(seq)
+        assert orfs == [
+            orf_utils.ORF("MK", "+", 2, 2, 8, True),
+            orf_utils.ORF("MPFGH", "+", 2, 11, 26, False),
+            orf_utils.ORF("MPKGHLFH", "-", 1, 2, 26, False),
+            orf_utils.ORF("M", "-", 2, 1, 4, False),
+        ]
+        assert seq[2:5] == "ATG" and seq[8:11] == "TAG"
+        assert [orf.protein for orf in orf_utils.find_orfs(seq, min_length=5)] == ["MPFGH", "MPKGHLFH"]
+
+    def test_nested_orfs(self):
+        """every in-frame start codon starts an ORF, same proteins as translate (which drops the M)"""
+        rna = "UAUGAAUAUCAAUGCUUGAAUCUGAGAAUUGA"
+        orfs = orf_utils.find_orfs(rna, strands="+")
+        assert [orf.protein[1:] for orf in orfs] == translate(rna)
+        assert all(orf.protein.startswith("M") for orf in orfs)
+
+        orfs = orf_utils.find_orfs("ATGGCAATGTTTTAA", strands="+")
+        assert [(orf.protein, orf.start, orf.end) for orf in orfs] == [("MAMF", 0, 12), ("MF", 6, 12)]
+
+    def test_unknown_bases(self):
+        """codons with unknown bases are X, they never start or stop an ORF"""
+        orfs = orf_utils.find_orfs("ATGNAATGA", strands="+")
+        assert [(orf.protein, orf.frame) for orf in orfs] == [("MX", 0), ("M", 2)]
+
+    def test_collapse_orfs(self):
+        """nested, duplicate and nearly identical proteins are represented by the longest one"""
+        protein = "MALWMRLLPLLALLALWGPDPAAAFVNQHLCGSHLVEALYLVCGERGFF"
+        similar = protein[:20] + "K" + protein[21:]
+        orfs = [orf_utils.ORF(protein[10:], "+", 0, 30, 147, True),
+                orf_utils.ORF(protein, "+", 0, 0, 147, True),
+                orf_utils.ORF("MKKKKKKKK", "+", 1, 0, 27, True),
+                orf_utils.ORF(similar, "-", 2, 0, 147, True),
+                orf_utils.ORF(protein, "+", 0, 0, 147, True)]
+        representatives, members = orf_utils.collapse_orfs(orfs)
+        assert representatives == [orfs[1], orfs[2]]
+        assert members == [[0, 1, 3, 4], [2]]
+
+        representatives, members = orf_utils.collapse_orfs(orfs, min_similarity=2)
+        assert members == [[0, 1, 4], [3], [2]]
+        assert sorted(i for orf_indexes in members for i in orf_indexes) == list(range(len(orfs)))
+
+    def test_collapse_orfs_equal_length_heads(self):
+        """a head of the same length which already has members is not absorbed (no nested clusters)"""
+        proteins = ["M" + "A" * 20, "M" + "A" * 18 + "WW", "M" + "A" * 19]
+        orfs = [orf_utils.ORF(protein, "+", 0, 0, 3 * len(protein), True) for protein in proteins]
+        representatives, members = orf_utils.collapse_orfs(orfs)
+        assert sorted(i for orf_indexes in members for i in orf_indexes) == [0, 1, 2]
+        assert representatives[0] == orfs[0] and 2 in members[0]
@@ -1,5 +1,6 @@
 """Tests for the PARSER."""
 
+import os
 from src import parser
 
 
@@ -12,3 +13,65 @@ class TestParser:
         assert (type(out) is list) is True
         allowed = set(["A", "C", "G", "T"])
         assert (set(out[-1]) <= allowed) is True
+
+    def test_parse_packed(self):
+        """packed reads are the same as the parsed strings"""
+        path_x = "../tests/test.fastq"
+        out = parser.parse(path=path_x, packed=True)
+        assert list(out) == parser.parse(path=path_x)
+
+    def test_gzip_and_extension(self, tmp_path):
+        """gzip compression and the format are detected from the content"""
+        import gzip
+        path_x = "../tests/test.fastq"
+        with open(path_x, 'rb') as file:
+            content = file.read()
+        gz_path = tmp_path / "reads.fq.gz"
+        with gzip.open(gz_path, 'wb') as file:
+            file.write(content)
+        plain_path = tmp_path / "reads.txt"
+        plain_path.write_bytes(content)
+        assert parser.parse(str(gz_path)) == parser.parse(path_x)
+        assert parser.parse(str(plain_path)) == parser.parse(path_x)
+
+    def test_fasta_records(self, tmp_path):
+        """multi-line FASTA records, small chunks split lines"""
+        path_x = tmp_path / "reads.fa"
+        path_x.write_text("> seq0\nACGT\nAC\r\n\n>seq1 x\nGGGA\n>seq2\nTTT")
+        records = list(parser.iter_records(str(path_x), chunk_size=3))
+        assert records == [("seq0", "ACGTAC"), ("seq1 x", "GGGA"), ("seq2", "TTT")]
+
+    def test_non_ascii_header_and_long_line(self, tmp_path):
+        """headers may have other bytes than ASCII, a line spanning many chunks is joined once"""
+        path_x = tmp_path / "reads.fa"
+        genome = "ACGT" * 1000
+        path_x.write_bytes(">chr1 \xe9t\xc3\xa9 latin-1 and UTF-8\n".encode("latin-1") + genome.encode("ascii"))
+        records = list(parser.iter_records(str(path_x), chunk_size=7))
+        assert records == [("chr1 \ufffdt\ufffd\ufffd latin-1 and UTF-8", genome)]
+
+        path_x.write_bytes(">seq0\nAC\xc3\xa9GT\n".encode("latin-1"))
+        import pytest
+        with pytest.raises(UnicodeDecodeError):
+            list(parser.iter_records(str(path_x)))
+
+    def test_unknown_format(self, tmp_path):
+        """neither FASTA nor FASTQ"""
+        import pytest
+        path_x = tmp_path / "reads.fa"
+        path_x.write_text("ACGT\n")
+        with pytest.raises(ValueError):
+            parser.parse(str(path_x))
+
+    def test_read_cache(self, tmp_path):
+        """cached reads are the parsed reads, a changed file is parsed again"""
+        path_x = tmp_path / "reads.fa"
+        path_x.write_text(">a\nACGTNACG\n>b\nTTGCA\n")
+        cache_dir = str(tmp_path / "cache")
+        first = parser.parse(str(path_x), packed=True, cache_dir=cache_dir)
+        cached = parser.parse(str(path_x), packed=True, cache_dir=cache_dir)
+        assert list(first) == list(cached) == ["ACGTNACG", "TTGCA"]
+        assert len(os.listdir(cache_dir)) == 1
+
+        path_x.write_text(">a\nACGT\n")
+        assert parser.parse(str(path_x), cache_dir=cache_dir) == ["ACGT"]
+        assert len(os.listdir(cache_dir)) == 2
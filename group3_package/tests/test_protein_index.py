@@ -0,0 +1,45 @@
+"""Tests for the local protein index."""
+
+import numpy as np
+from src import protein_index
+
+
+PROTEINS = [
+    ("sp|P1|ONE first protein", "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQ*"),
+    ("sp|P2|TWO second protein", "MSDNELQLAHWLGVSRQTVSRLLNRLEAEGLIHRQGRDGGWLLNPTEHLPALLGEL"),
+    ("sp|P3|THREE third protein", "MAHHHHHHVDDDDKMGSSHHHHHHSSGLVPRGSHM"),
+]
+
+
+class TestProteinIndex:
+
+    def test_search(self):
+        """query with a substitution finds its protein and the aligned region"""
+        index = protein_index.ProteinIndex.build(PROTEINS)
+        query = "QISFVKSHFSRQLEERLGLIEVQAPILSRVGDWTQDNLSG"  # P1[10:50], G -> W
+        hits = index.search(query)
+        assert hits[0].name == "sp|P1|ONE first protein"
+        assert (hits[0].query_start, hits[0].query_end) == (0, 40)
+        assert (hits[0].subject_start, hits[0].subject_end) == (10, 50)
+        assert index.identify(query) == "sp|P1|ONE first protein"
+        assert index.identify("WWWWWWWWWW") == -1
+
+    def test_kmers_inside_proteins(self):
+        """every indexed k-mer is inside one protein, the stop symbol is removed"""
+        index = protein_index.ProteinIndex.build(PROTEINS, k=3)
+        assert index.protein(0) == PROTEINS[0][1][:-1]
+        proteins = np.searchsorted(index.seq_offsets, index.kmer_positions, side='right') - 1
+        assert (index.kmer_positions + 3 <= index.seq_offsets[proteins + 1]).all()
+        assert len(index.kmer_positions) == sum(len(p.rstrip("*")) - 2 for _, p in PROTEINS)
+
+    def test_save_load(self, tmp_path):
+        """loaded index is memory-mapped and gives the same hits, FASTA input"""
+        fasta = tmp_path / "proteins.fa"
+        fasta.write_text("".join(f">{name}\n{seq[:30]}\n{seq[30:]}\n" for name, seq in PROTEINS))
+        index = protein_index.ProteinIndex.build(str(fasta))
+        index.save(str(tmp_path / "index"))
+        loaded = protein_index.ProteinIndex.load(str(tmp_path / "index"))
+        assert isinstance(loaded.kmer_positions, np.memmap)
+        query = "LAHWLGVSRQTVSRLLNRLEAEG"
+        assert loaded.search(query) == index.search(query)
+        assert loaded.names == [name for name, _ in PROTEINS]
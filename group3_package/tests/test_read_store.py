@@ -0,0 +1,41 @@
+import numpy as np
+from src import read_store
+
+
+class TestReadStore:
+    def test_from_strings(self):
+        reads = ['ACGTA', 'TTGCANNG', '', 'GGG']
+
+        store = read_store.ReadStore.from_strings(iter(reads), batch_size=2)
+        assert len(store) == 4
+        assert list(store) == reads
+        assert store.offsets.tolist() == [0, 2, 4, 4, 5]
+
+    def test_decode(self):
+        """ranges of reads are decoded at once, upper case with N for other bases"""
+        reads = ['ACGTA', 'ttgcaRYg', '', 'GGG', 'NACGTN']
+        store = read_store.ReadStore.from_strings(reads)
+        assert store.decode() == ['ACGTA', 'TTGCANNG', '', 'GGG', 'NACGTN']
+        assert store.decode(1, 4) == ['TTGCANNG', '', 'GGG']
+        assert store.decode(3, 3) == []
+        assert [store[i] for i in range(len(store))] == store.decode()
+
+    def test_packed_view(self):
+        store = read_store.ReadStore.from_strings(['ACGT', 'TTTTA'])
+
+        view = store.packed_view(1)
+        assert view.base is store.packed or np.shares_memory(view, store.packed)
+        assert view.tolist() == [0b11111111, 0b00000000]
+
+    def test_to_codes(self):
+        store = read_store.ReadStore.from_strings(['ACG', 'TNA'])
+
+        codes, offsets = store.to_codes()
+        assert codes.tolist() == [0, 1, 2, 3, read_store.N_CODE, 0]
+        assert offsets.tolist() == [0, 3, 6]
+
+    def test_nbytes(self):
+        reads = ['ACGT' * 25] * 100
+
+        store = read_store.ReadStore.from_strings(reads)
+        assert store.packed.nbytes == 25 * 100
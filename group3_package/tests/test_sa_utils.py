@@ -0,0 +1,59 @@
+import itertools
+import os
+import numpy as np
+from src import sa_utils
+from src import scs_utils
+from src import read_store
+
+
+class TestSaUtils:
+    def test_find_all_overlaps(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'DEFGHI', 'FGA', 'ABC']
+
+        result = {(i, j): overlap_len for i, j, overlap_len in sa_utils.find_all_overlaps(strings).tolist()}
+        for (i, a), (j, b) in itertools.permutations(enumerate(strings), r=2):
+            assert result.get((i, j), 0) == scs_utils.find_overlap_length(a, b)
+
+    def test_find_all_overlaps_min_length(self):
+        strings = ['AACGT', 'CGTTA', 'TAACG']
+
+        result = {(i, j): overlap_len for i, j, overlap_len in sa_utils.find_all_overlaps(strings, 3).tolist()}
+        assert result == {(0, 1): 3, (2, 0): 4}
+
+    def test_calc_pairwise_overlaps_suffix_array(self):
+        strings_dict = {5: 'ABCD', 7: 'CDEF', 9: 'XYZ'}
+
+        result = sa_utils.calc_pairwise_overlaps_suffix_array(strings_dict)
+        assert result == [(5, 7, 2)]
+
+    def test_find_all_overlaps_read_store(self):
+        strings = ['ACGTT', 'GTTAC', 'TACCA']
+        store = read_store.ReadStore.from_strings(strings)
+
+        assert sa_utils.find_all_overlaps(store).tolist() == sa_utils.find_all_overlaps(strings).tolist()
+
+    def test_lcp_array(self):
+        """Kasai's lcp equals the direct comparison of neighbouring suffixes, also with equal suffixes"""
+        rng = np.random.default_rng(0)
+        for n_strings in [2, 5, 30]:
+            strings = [''.join(rng.choice(list('AC'), size=rng.integers(1, 9))) for _ in range(n_strings)]
+            strings += strings[:2]  # duplicates
+            text, offsets = sa_utils.encode_strings(strings)
+            sa, str_index, rank = sa_utils.build_suffix_array(text, offsets, return_rank=True)
+            str_end = offsets[1:][str_index]
+            lcp = sa_utils._lcp_array(text, sa, rank, str_end)
+            suffixes = [text[p:str_end[p]].tobytes() for p in sa.tolist()]
+            assert suffixes == sorted(suffixes)
+            expected = [0] + [len(os.path.commonprefix([a, b])) for a, b in zip(suffixes, suffixes[1:])]
+            assert lcp.tolist() == expected
+
+    def test_find_contained(self):
+        strings = ['ABCDEF', 'CDE', 'EFG', 'ABCDEF'[:4], 'XYZ', 'XY']
+
+        result = sa_utils.find_contained(strings)
+        assert result.tolist() == [False, True, False, True, False, True]
+
+    def test_remove_contained(self):
+        strings = ['ABCD', 'BC', 'XYZ', 'ABCD', 'YZ']
+
+        assert sa_utils.remove_contained(strings) == ['ABCD', 'XYZ']
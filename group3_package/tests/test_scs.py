@@ -1,3 +1,5 @@
+import os
+import pytest
 from src import scs
 
 
@@ -26,6 +28,12 @@ class TestScs:
         result = scs.greedy_scs_heap(strings, num_cpu=4)
         assert result == 'ABCDEFGHIJKL'
 
+    def test_greedy_scs_heap_parallel_mixed_lengths(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGHI', 'CDEFGHI', 'DEFGH']
+
+        result = scs.greedy_scs_heap(strings, num_cpu=4)
+        assert result == 'ABCDEFGHIJKL'
+
     def test_greedy_scs_matrix(self):
         strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
 
@@ -38,3 +46,91 @@ class TestScs:
         not_greedy = scs.scs(strings)
         assert len(greedy) == 9
         assert len(not_greedy) == 8
+
+    def test_greedy_scs_suffix_array(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
+
+        assert scs.greedy_scs_heap(strings, overlaps='suffix_array') == 'ABCDEFGHIJKL'
+        assert scs.greedy_scs_dict(strings, overlaps='suffix_array') == 'ABCDEFGHIJKL'
+        assert scs.greedy_scs_matrix(strings, overlaps='suffix_array') == 'ABCDEFGHIJKL'
+
+    def test_greedy_scs_heap_no_overlaps(self):
+        strings = ['ABC', 'XYZ']
+
+        result = scs.greedy_scs_heap(strings, overlaps='suffix_array')
+        assert sorted([result[:3], result[3:]]) == strings
+
+    def test_greedy_scs_heap_seed(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
+
+        result = scs.greedy_scs_heap(strings, overlaps='seed', min_overlap=3)
+        assert result == 'ABCDEFGHIJKL'
+
+    def test_greedy_scs_heap_bucket_queue(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
+
+        result = scs.greedy_scs_heap(strings, queue='bucket')
+        assert result == 'ABCDEFGHIJKL'
+
+    def test_greedy_scs_numba(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
+
+        assert scs.greedy_scs_numba(strings) == 'ABCDEFGHIJKL'
+        assert scs.greedy_scs_numba(strings, overlaps='suffix_array') == 'ABCDEFGHIJKL'
+        assert scs.greedy_scs_numba(['ABC', 'XYZ']) == 'ABCXYZ'
+
+    def test_greedy_scs_matrix_no_overlaps(self):
+        strings = ['ABC', 'XYZ']
+
+        result = scs.greedy_scs_matrix(strings)
+        assert sorted([result[:3], result[3:]]) == strings
+
+    def test_assemble_components(self):
+        strings = ['GHIJKL', 'ABCDEF', 'XYZUVW', 'CDEFGH', 'UVWRST', 'DEFGHI', 'QQQQQQ']
+
+        result = scs.assemble_components(strings, min_overlap=3)
+        assert result == ['ABCDEFGHIJKL', 'XYZUVWRST', 'QQQQQQ']
+        assert scs.assemble_components(strings, min_overlap=3, num_cpu=2) == result
+
+    def test_scs_branch_and_bound(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
+
+        assert scs.scs(strings, max_dp_strings=0) == 'ABCDEFGHIJKL'
+        assert len(scs.scs(['ABCD', 'CDBC', 'BCDA'], max_dp_strings=0, time_limit=10)) == 8
+
+    def test_greedy_scs_heap_contained(self):
+        strings = ['GHIJKL', 'ABCDEF', 'BCD', 'CDEFGH', 'HIJ', 'DEFGHI']
+
+        assert scs.greedy_scs_heap(strings) == 'ABCDEFGHIJKL'
+        result = scs.greedy_scs_heap(strings, drop_contained=False)
+        assert all(s in result for s in strings)
+
+    def test_greedy_scs_heap_both_strands(self):
+        # 'TGGCAAC' and 'GGTTAA' are reverse complements of 'GTTGCCA' and 'TTAACC'
+        strings = ['AACGTTG', 'TGGCAAC', 'CCATTAA', 'GGTTAA']
+
+        result = scs.greedy_scs_heap(strings, min_overlap=3, both_strands=True)
+        assert result in ('AACGTTGCCATTAACC', 'GGTTAATGGCAACGTT')
+
+    def test_greedy_scs_heap_cache(self, tmp_path, monkeypatch):
+        strings = ['GHIJKL', 'ABCDEF', 'BCDEFG', 'CDEFGH', 'CDEFGH', 'DEFGHI']
+        cache_dir = str(tmp_path)
+
+        # the run is killed after the first checkpoint (checkpoint before every merge)
+        save_object = scs.DiskCache.save_object
+
+        def save_and_kill(self, key, obj):
+            save_object(self, key, obj)
+            raise KeyboardInterrupt
+        monkeypatch.setattr(scs.DiskCache, 'save_object', save_and_kill)
+        with pytest.raises(KeyboardInterrupt):
+            scs.greedy_scs_heap(strings, cache_dir=cache_dir, checkpoint_interval=0)
+        monkeypatch.undo()
+
+        # resumed from the checkpoint, the overlaps are not calculated again
+        def fail(*args, **kwargs):
+            raise AssertionError('overlaps calculated again')
+        monkeypatch.setattr(scs, 'calc_pairwise_overlaps', fail)
+        assert scs.greedy_scs_heap(strings, cache_dir=cache_dir, checkpoint_interval=0) == 'ABCDEFGHIJKL'
+        assert scs.greedy_scs_heap(strings, cache_dir=cache_dir) == 'ABCDEFGHIJKL'
+        assert len(os.listdir(cache_dir)) == 2  # overlaps and the final checkpoint
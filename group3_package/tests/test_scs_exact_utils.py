@@ -0,0 +1,20 @@
+import numpy as np
+from src import scs_exact_utils
+
+
+class TestScsExactUtils:
+    # overlaps of 'ABCD', 'CDBC', 'BCDA'
+    overlap = np.array([[0, 2, 3],
+                        [0, 0, 2],
+                        [0, 0, 0]], dtype=np.int64)
+
+    def test_greedy_path(self):
+        assert scs_exact_utils.greedy_path(self.overlap).tolist() == [1, 0, 2]
+
+    def test_held_karp(self):
+        assert scs_exact_utils.held_karp(self.overlap).tolist() == [0, 1, 2]
+
+    def test_branch_and_bound(self):
+        path, optimal = scs_exact_utils.branch_and_bound(self.overlap)
+        assert path.tolist() == [0, 1, 2]
+        assert optimal
@@ -1,3 +1,4 @@
+import numpy as np
 from src import scs_utils
 
 
@@ -7,3 +8,47 @@ class TestScsUtils:
         assert scs_utils.find_overlap_length('ABC', 'CDE', 1) == 1
         assert scs_utils.find_overlap_length('ABC', 'CDE', 2) == 0
         assert scs_utils.find_overlap_length('ABC', 'BCD', 1) == 2
+
+    def test_calc_pairwise_overlaps_seed(self):
+        strings_dict = {0: 'AACGTTG', 1: 'GTTGCCA', 2: 'CCATTAA', 3: 'TTTTTTT'}
+
+        result = scs_utils.calc_pairwise_overlaps_seed(strings_dict, min_overlap=3)
+        assert sorted(result) == [(0, 1, 4), (1, 2, 3)]
+
+    def test_calc_pairwise_overlaps_min_overlap(self):
+        strings_dict = {0: 'AACGTTG', 1: 'GTTGCCA', 2: 'CCATTAA'}
+
+        naive = scs_utils.calc_pairwise_overlaps(strings_dict, 'naive', min_overlap=4)
+        seed = scs_utils.calc_pairwise_overlaps(strings_dict, 'seed', min_overlap=4)
+        assert [el for el in naive if el[2] > 0] == seed == [(0, 1, 4)]
+
+    def test_calc_pairwise_overlaps_parallel_heap(self):
+        strings_dict = {3: 'AACGTTG', 5: 'GTTGCCA', 7: 'CCATTAA', 9: 'TTTTTTT'}
+
+        naive = scs_utils.calc_pairwise_overlaps(strings_dict, 'naive')
+        parallel = scs_utils.calc_pairwise_overlaps_parallel_heap(strings_dict, num_cpu=2, chunk_size=1)
+        assert sorted(parallel) == sorted(el for el in naive if el[2] > 0)
+
+    def test_calc_pairwise_overlaps_fixed_length(self):
+        strings_dict = {0: 'AACGTTG', 1: 'GTTGCCA', 2: 'CCATTAA', 3: 'TTTTTTT'}
+
+        result = scs_utils.calc_pairwise_overlaps_fixed_length(strings_dict)
+        expected = [(id1, id2, scs_utils.find_overlap_length(s1, s2))
+                    for id1, s1 in strings_dict.items() for id2, s2 in strings_dict.items() if id1 != id2]
+        assert sorted(result) == sorted(el for el in expected if el[2] > 0)
+
+    def test_calc_pairwise_overlaps_fixed_length_bounded(self):
+        """small chunks and reductions of the found pairs, min_length"""
+        rng = np.random.default_rng(0)
+        strings_dict = {i: ''.join(rng.choice(list('AC'), size=8)) for i in range(40)}
+        strings_dict = {i: s for s, i in {s: i for i, s in strings_dict.items()}.items()}
+        for min_length in [1, 3]:
+            result = scs_utils.calc_pairwise_overlaps_fixed_length(strings_dict, min_length=min_length, max_pairs=7)
+            expected = [(id1, id2, scs_utils.find_overlap_length(s1, s2, min_length=min_length))
+                        for id1, s1 in strings_dict.items() for id2, s2 in strings_dict.items() if id1 != id2]
+            assert sorted(result) == sorted(el for el in expected if el[2] > 0)
+
+    def test_calc_pairwise_overlaps_auto_fixed_length(self):
+        strings_dict = {0: 'AACGTTG', 1: 'GTTGCCA', 2: 'CCATTAA'}
+
+        assert sorted(scs_utils.calc_pairwise_overlaps(strings_dict)) == [(0, 1, 4), (1, 0, 1), (1, 2, 3), (2, 0, 2)]
@@ -0,0 +1,24 @@
+from src import strand_utils
+
+
+class TestStrandUtils:
+    def test_reverse_complement(self):
+        assert strand_utils.reverse_complement('AACGTN') == 'NACGTT'
+        assert strand_utils.canonical_kmer('TTG') == 'CAA'
+
+    def test_canonical_pair(self):
+        assert strand_utils.canonical_pair(4, 2) == (3, 5)
+        assert strand_utils.canonical_pair(3, 5) == (3, 5)
+
+    def test_calc_pairwise_overlaps_both_strands(self):
+        # 1 is the reverse complement of 'GTTGCCA', 2 overlaps with 1 as given
+        strings_dict = {0: 'AACGTTG', 1: 'TGGCAAC', 2: 'CAACTTT'}
+
+        result = strand_utils.calc_pairwise_overlaps_both_strands(strings_dict, min_overlap=3)
+        assert sorted(result) == [(0, 3, 4), (1, 3, 3), (2, 4, 4)]
+
+    def test_drop_contained_reads_both_strands(self):
+        # 'CGTT' and 'AACG' are reverse complements, 'CAACGTT' is the reverse complement of the first read
+        strings = ['AACGTTG', 'CGTT', 'AACG', 'CAACGTT', 'GGGG']
+
+        assert strand_utils.drop_contained_reads_both_strands(strings) == ['AACGTTG', 'CCCC']
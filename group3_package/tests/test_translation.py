@@ -1,5 +1,6 @@
 """Tests for the TRANSLATION and protein prediction."""
 
+import pytest
 from src import translation
 
 class TestTranslation:
@@ -13,6 +14,23 @@ class TestTranslation:
         assert (rna_comp == check_rna_comp) is True
         assert (rna == check_rna) is True
 
+    def test_transcribe_iupac(self):
+        """ambiguity codes are complemented, unknown characters are rejected"""
+        check_rna_comp, check_rna = translation.transcribe("ACNRYKMBVDHSWacgtn")
+        assert check_rna_comp == "UGNYRMKVBHDSWugcan"
+        assert check_rna == "ACNRYKMBVDHSWacgun"
+        with pytest.raises(ValueError):
+            translation.transcribe("ACGU")
+
+    def test_transcribe_chunks(self):
+        """chunked transcription is the transcription of the whole sequence"""
+        dna = "AAAGGCCCTCTCTTTGAGAACCTCTCTAGCCCCATTTCGC"
+        chunks = list(translation.transcribe_chunks(translation.iter_chunks(dna, chunk_size=7)))
+        assert len(chunks) == 6
+        rna_comp, rna = translation.transcribe(dna)
+        assert "".join(c[0] for c in chunks) == rna_comp
+        assert "".join(c[1] for c in chunks) == rna
+
     def test_translate(self):
         """check if protein is correct"""
         rna = "UAUGAAUAUCAAUGCUUGAAUCUGAGAAUUGA"